@@ -1,8 +1,13 @@
 import random
-from collections import deque
-import heapq
-from typing import List, Tuple, Set, Optional
+from typing import Callable, List, Optional, Tuple, Set, Union
 from models import Position, Direction, GameStateInput
+from board import Board, OFF_BOARD, QueueFrontier, StackFrontier, PriorityFrontier
+from hamiltonian import hamiltonian_cycle
+from minimax import minimax_direction
+from jps import LARGE_GRID_SIZE, jump_first_step
+
+# Algorithms accept a request's game state or a board already compiled from it
+GameInput = Union[GameStateInput, Board]
 
 class PathfindingAlgorithms:
     """Collection of pathfinding algorithms for the Snake AI."""
@@ -41,19 +46,12 @@ class PathfindingAlgorithms:
         return safe_directions
 
     @staticmethod
-    def random_move(game_state: GameStateInput) -> Direction:
+    def random_move(game_state: GameInput) -> Direction:
         """Random movement algorithm."""
-        head = game_state.ai_snake[0]
-        
-        # Create obstacles set
-        obstacles = set()
-        for pos in game_state.ai_snake[:-1]:  # Exclude tail as it will move
-            obstacles.add((pos.x, pos.y))
-        for pos in game_state.player_snake:
-            obstacles.add((pos.x, pos.y))
+        board = Board.of(game_state)
         
         # Get safe directions
-        safe_directions = PathfindingAlgorithms.get_safe_directions(head, game_state.grid_size, obstacles)
+        safe_directions = board.safe_directions(*board.head)
         
         if safe_directions:
             return random.choice(safe_directions)
@@ -79,27 +77,21 @@ class PathfindingAlgorithms:
         return closest_food
 
     @staticmethod
-    def greedy_move(game_state: GameStateInput) -> Direction:
+    def greedy_move(game_state: GameInput) -> Direction:
         """Greedy algorithm - always move towards the closest food."""
-        head = game_state.ai_snake[0]
-        food = PathfindingAlgorithms.get_closest_food(head, game_state.food)
-        
-        # Create obstacles set
-        obstacles = set()
-        for pos in game_state.ai_snake[:-1]:
-            obstacles.add((pos.x, pos.y))
-        for pos in game_state.player_snake:
-            obstacles.add((pos.x, pos.y))
+        board = Board.of(game_state)
+        head_x, head_y = board.head
+        food_x, food_y = board.closest_food()
         
         # Get safe directions
-        safe_directions = PathfindingAlgorithms.get_safe_directions(head, game_state.grid_size, obstacles)
+        safe_directions = board.safe_directions(head_x, head_y)
         
         if not safe_directions:
             return random.choice(list(PathfindingAlgorithms.DIRECTIONS.keys()))
         
         # Calculate direction towards food, but only from safe directions
-        dx = food.x - head.x
-        dy = food.y - head.y
+        dx = food_x - head_x
+        dy = food_y - head_y
         
         # Prioritize the axis with larger difference
         preferred_directions = []
@@ -129,115 +121,77 @@ class PathfindingAlgorithms:
             return random.choice(safe_directions)
     
     @staticmethod
-    def bfs_move(game_state: GameStateInput) -> Direction:
+    def shortest_first_step(board: Board, target: Tuple[int, int], frontier) -> Optional[Direction]:
+        """First move of a shortest path to ``target``: ``board.first_step`` with
+        ``frontier``, or jump point search on large grids, where it finds a path
+        of the same length much faster."""
+        if board.grid_size >= LARGE_GRID_SIZE:
+            return jump_first_step(board, target)
+        return board.first_step(target, frontier)
+
+    @staticmethod
+    def fallback_move(game_state: GameInput) -> Direction:
+        """Move toward the nearest reachable food, or greedily when none can be reached."""
+        board = Board.of(game_state)
+        board.fallbacks += 1
+        return board.nearest_food_step() or PathfindingAlgorithms.greedy_move(board)
+
+    @staticmethod
+    def avoid_traps(game_state: GameInput, direction: Direction) -> Direction:
+        """Swap a move into a pocket smaller than the snake for the roomiest safe move.
+
+        The chosen move is checked with a flood fill that stops once it has
+        counted enough cells. Only when it fails are the candidates' region
+        sizes compared, using the board's shared connected-components
+        labelling: at most one flood fill per region rather than one per
+        candidate.
+        """
+        board = Board.of(game_state)
+        if board.has_room(board.step(direction), len(board.ai_snake)):
+            return direction
+        room = board.room_after(direction)
+        roomiest = max(board.safe_directions(*board.head), key=board.room_after, default=None)
+        if roomiest is not None and board.room_after(roomiest) > room:
+            return roomiest
+        return direction
+
+    @staticmethod
+    def distance_field_move(game_state: GameInput) -> Direction:
+        """Follow a distance field built from every food at once.
+
+        One multi-source BFS from all food cells labels each free cell with
+        the steps to its nearest food, so the snake heads for the food that
+        is truly closest instead of the Manhattan-closest one.
+        """
+        board = Board.of(game_state)
+        return board.nearest_food_step() or PathfindingAlgorithms.greedy_move(board)
+    
+    @staticmethod
+    def bfs_move(game_state: GameInput) -> Direction:
         """Breadth-First Search pathfinding."""
-        head = game_state.ai_snake[0]
-        food = PathfindingAlgorithms.get_closest_food(head, game_state.food)
-        grid_size = game_state.grid_size
-        
-        # Create obstacles set (all snake positions except AI tail)
-        obstacles = set()
-        for pos in game_state.ai_snake[:-1]:  # Exclude tail as it will move
-            obstacles.add((pos.x, pos.y))
-        for pos in game_state.player_snake:
-            obstacles.add((pos.x, pos.y))
-        
-        # BFS
-        queue = deque([(head, [])])
-        visited = {(head.x, head.y)}
+        board = Board.of(game_state)
+        direction = PathfindingAlgorithms.shortest_first_step(board, board.closest_food(), QueueFrontier())
         
-        while queue:
-            current_pos, path = queue.popleft()
-            
-            if current_pos.x == food.x and current_pos.y == food.y:
-                return path[0] if path else "UP"
-            
-            for direction, next_pos in PathfindingAlgorithms.get_neighbors(current_pos):
-                if (PathfindingAlgorithms.is_valid_position(next_pos, grid_size, obstacles) and
-                    (next_pos.x, next_pos.y) not in visited):
-                    
-                    visited.add((next_pos.x, next_pos.y))
-                    new_path = path + [direction]
-                    queue.append((next_pos, new_path))
-        
-        # No path found, use greedy
-        return PathfindingAlgorithms.greedy_move(game_state)
+        # No path found, head for any food that can be reached
+        return direction or PathfindingAlgorithms.fallback_move(board)
     
     @staticmethod
-    def dfs_move(game_state: GameStateInput) -> Direction:
+    def dfs_move(game_state: GameInput) -> Direction:
         """Depth-First Search pathfinding."""
-        head = game_state.ai_snake[0]
-        food = PathfindingAlgorithms.get_closest_food(head, game_state.food)
-        grid_size = game_state.grid_size
-        
-        # Create obstacles set
-        obstacles = set()
-        for pos in game_state.ai_snake[:-1]:
-            obstacles.add((pos.x, pos.y))
-        for pos in game_state.player_snake:
-            obstacles.add((pos.x, pos.y))
-        
-        # DFS
-        stack = [(head, [])]
-        visited = {(head.x, head.y)}
+        board = Board.of(game_state)
+        direction = board.first_step(board.closest_food(), StackFrontier())
         
-        while stack:
-            current_pos, path = stack.pop()
-            
-            if current_pos.x == food.x and current_pos.y == food.y:
-                return path[0] if path else "UP"
-            
-            for direction, next_pos in PathfindingAlgorithms.get_neighbors(current_pos):
-                if (PathfindingAlgorithms.is_valid_position(next_pos, grid_size, obstacles) and
-                    (next_pos.x, next_pos.y) not in visited):
-                    
-                    visited.add((next_pos.x, next_pos.y))
-                    new_path = path + [direction]
-                    stack.append((next_pos, new_path))
-        
-        # No path found, use greedy
-        return PathfindingAlgorithms.greedy_move(game_state)
+        # No path found, head for any food that can be reached
+        return direction or PathfindingAlgorithms.fallback_move(board)
     
     @staticmethod
-    def dijkstra_move(game_state: GameStateInput) -> Direction:
+    def dijkstra_move(game_state: GameInput) -> Direction:
         """Dijkstra's algorithm pathfinding."""
-        head = game_state.ai_snake[0]
-        food = PathfindingAlgorithms.get_closest_food(head, game_state.food)
-        grid_size = game_state.grid_size
-        
-        # Create obstacles set
-        obstacles = set()
-        for pos in game_state.ai_snake[:-1]:
-            obstacles.add((pos.x, pos.y))
-        for pos in game_state.player_snake:
-            obstacles.add((pos.x, pos.y))
+        board = Board.of(game_state)
+        direction = PathfindingAlgorithms.shortest_first_step(board, board.closest_food(), PriorityFrontier())
         
-        # Dijkstra's algorithm
-        # Priority queue: (distance, position_tuple, position, path)
-        pq = [(0, (head.x, head.y), head, [])]
-        distances = {(head.x, head.y): 0}
-        
-        while pq:
-            current_dist, pos_tuple, current_pos, path = heapq.heappop(pq)
-            
-            if current_pos.x == food.x and current_pos.y == food.y:
-                return path[0] if path else "UP"
-            
-            # Skip if we've found a shorter path to this position
-            if current_dist > distances.get((current_pos.x, current_pos.y), float('inf')):
-                continue
-            
-            for direction, next_pos in PathfindingAlgorithms.get_neighbors(current_pos):
-                if PathfindingAlgorithms.is_valid_position(next_pos, grid_size, obstacles):
-                    new_dist = current_dist + 1  # All edges have weight 1
-                    
-                    if new_dist < distances.get((next_pos.x, next_pos.y), float('inf')):
-                        distances[(next_pos.x, next_pos.y)] = new_dist
-                        new_path = path + [direction]
-                        heapq.heappush(pq, (new_dist, (next_pos.x, next_pos.y), next_pos, new_path))
-        
-        # No path found, use greedy
-        return PathfindingAlgorithms.greedy_move(game_state)
+        # No path found, head for any food that can be reached
+        return direction or PathfindingAlgorithms.fallback_move(board)
     
     @staticmethod
     def manhattan_distance(pos1: Position, pos2: Position) -> int:
@@ -245,44 +199,114 @@ class PathfindingAlgorithms:
         return abs(pos1.x - pos2.x) + abs(pos1.y - pos2.y)
     
     @staticmethod
-    def astar_move(game_state: GameStateInput) -> Direction:
+    def astar_move(game_state: GameInput) -> Direction:
         """A* pathfinding algorithm."""
-        head = game_state.ai_snake[0]
-        food = PathfindingAlgorithms.get_closest_food(head, game_state.food)
-        grid_size = game_state.grid_size
-        
-        # Create obstacles set
-        obstacles = set()
-        for pos in game_state.ai_snake[:-1]:
-            obstacles.add((pos.x, pos.y))
-        for pos in game_state.player_snake:
-            obstacles.add((pos.x, pos.y))
-        
-        # A* algorithm
-        # Priority queue: (f_score, g_score, position_tuple, position, path)
-        pq = [(PathfindingAlgorithms.manhattan_distance(head, food), 0, (head.x, head.y), head, [])]
-        g_scores = {(head.x, head.y): 0}
+        board = Board.of(game_state)
+        food = board.closest_food()
+        direction = PathfindingAlgorithms.shortest_first_step(
+            board, food, PriorityFrontier(board.manhattan_to(food)))
         
-        while pq:
-            f_score, g_score, pos_tuple, current_pos, path = heapq.heappop(pq)
-            
-            if current_pos.x == food.x and current_pos.y == food.y:
-                return path[0] if path else "UP"
-            
-            # Skip if we've found a shorter path to this position
-            if g_score > g_scores.get((current_pos.x, current_pos.y), float('inf')):
+        # No path found, head for any food that can be reached
+        return direction or PathfindingAlgorithms.fallback_move(board)
+    
+    @staticmethod
+    def hamiltonian_move(game_state: GameInput) -> Direction:
+        """Follow a Hamiltonian cycle, cutting ahead toward food when it is safe.
+
+        A shortcut may skip forward along the cycle but never past the
+        snake's own body, and is only taken while the snake fills less than
+        half the grid. The player's snake can cut the cycle anywhere, so
+        every candidate must also lead into a region at least as large as
+        the snake. Grids without a cycle (odd sizes) use the distance field
+        with the trap check instead.
+        """
+        board = Board.of(game_state)
+        cycle = hamiltonian_cycle(board.grid_size)
+        head = board.cell(*board.head)
+        if cycle is None or head == OFF_BOARD:
+            direction = PathfindingAlgorithms.fallback_move(board)
+            return PathfindingAlgorithms.avoid_traps(board, direction)
+        order, index = cycle
+        size = len(order)
+        position = index[head]
+
+        # Cycle distance to the nearest body cell ahead of the head
+        ahead = size
+        for x, y in board.ai_snake[1:]:
+            cell = board.cell(x, y)
+            if cell != OFF_BOARD:
+                distance = (index[cell] - position) % size
+                if 0 < distance < ahead:
+                    ahead = distance
+        food = [index[cell] for cell in (board.cell(x, y) for x, y in board.food) if cell != OFF_BOARD]
+        shortcuts = len(board.ai_snake) < size // 2
+
+        best, best_distance = None, size
+        for offset in board.offsets:
+            neighbor = head + offset
+            # The other snake can cut the cycle; never follow it into a pocket
+            if not board.has_room(neighbor, len(board.ai_snake)):
                 continue
-            
-            for direction, next_pos in PathfindingAlgorithms.get_neighbors(current_pos):
-                if PathfindingAlgorithms.is_valid_position(next_pos, grid_size, obstacles):
-                    tentative_g_score = g_score + 1
-                    
-                    if tentative_g_score < g_scores.get((next_pos.x, next_pos.y), float('inf')):
-                        g_scores[(next_pos.x, next_pos.y)] = tentative_g_score
-                        h_score = PathfindingAlgorithms.manhattan_distance(next_pos, food)
-                        f_score = tentative_g_score + h_score
-                        new_path = path + [direction]
-                        heapq.heappush(pq, (f_score, tentative_g_score, (next_pos.x, next_pos.y), next_pos, new_path))
-        
-        # No path found, use greedy
-        return PathfindingAlgorithms.greedy_move(game_state)
+            step = (index[neighbor] - position) % size
+            # Keep one spare cell before the obstacle for the growth from eating
+            if step != 1 and not (shortcuts and step < ahead - 1):
+                continue
+            distance = min(((target - index[neighbor]) % size for target in food), default=0)
+            if best is None or distance < best_distance:
+                best, best_distance = offset, distance
+        if best is not None:
+            return board.moves[best]
+
+        # Knocked off the cycle (usually by the player): get back to open space
+        direction = PathfindingAlgorithms.fallback_move(board)
+        return PathfindingAlgorithms.avoid_traps(board, direction)
+    
+    @staticmethod
+    def minimax_move(game_state: GameInput) -> Direction:
+        """Look a few ticks ahead over both snakes' moves with alpha-beta
+        search (see minimax.py); the player is assumed to play its best reply."""
+        board = Board.of(game_state)
+        direction = minimax_direction(board)
+        return direction or PathfindingAlgorithms.fallback_move(board)
+
+# Algorithm ids accepted by the API, with their move functions
+ALGORITHM_MAP = {
+    "random": PathfindingAlgorithms.random_move,
+    "greedy": PathfindingAlgorithms.greedy_move,
+    "bfs": PathfindingAlgorithms.bfs_move,
+    "dfs": PathfindingAlgorithms.dfs_move,
+    "dijkstra": PathfindingAlgorithms.dijkstra_move,
+    "astar": PathfindingAlgorithms.astar_move,
+    "field": PathfindingAlgorithms.distance_field_move,
+    "hamiltonian": PathfindingAlgorithms.hamiltonian_move,
+    "minimax": PathfindingAlgorithms.minimax_move,
+}
+
+# Called with the reason ("unsafe", "no_safe_move" or "trap"), the algorithm's
+# move and the move that replaces it
+OverrideHook = Callable[[str, Direction, Direction], None]
+
+def ensure_safe(board: Board, direction: Direction, avoid_traps: bool = False,
+                on_override: Optional[OverrideHook] = None) -> Direction:
+    """Replace a move that would cause an immediate collision with a safe one,
+    and with avoid_traps, one into a pocket smaller than the snake."""
+    safe_directions = board.safe_directions(*board.head)
+    replacement = direction
+    if direction not in safe_directions and safe_directions:
+        replacement = safe_directions[0]
+        reason = "unsafe"
+    elif not safe_directions:
+        # Keep the calculated direction as a last resort
+        reason = "no_safe_move"
+    else:
+        reason = None
+    if reason and on_override:
+        on_override(reason, direction, replacement)
+
+    if avoid_traps:
+        roomier = PathfindingAlgorithms.avoid_traps(board, replacement)
+        if roomier != replacement:
+            if on_override:
+                on_override("trap", replacement, roomier)
+            replacement = roomier
+    return replacement
@@ -0,0 +1,112 @@
+from typing import List, Optional
+
+import numpy as np
+
+from board import Board, DIRECTION_VECTORS, OFF_BOARD
+from models import Direction
+
+# Algorithms whose moves the wavefront reproduces exactly
+VECTORIZED_ALGORITHMS = {"bfs", "dijkstra"}
+
+DIRECTION_NAMES: List[Direction] = [name for name, _, _ in DIRECTION_VECTORS]
+
+
+def wavefront_moves(boards: List[Board], algorithm: str) -> List[Optional[Direction]]:
+    """First move toward the closest food on many same-sized boards at once.
+
+    All boards are stacked into one flat ``(N * stride * stride)`` occupancy
+    array and searched level by level, so each BFS layer of every board is
+    expanded with a handful of NumPy calls instead of a Python loop per
+    cell. The frontier is kept in the order the scalar search would pop it
+    (queue order for BFS, ``(x, y)`` order for Dijkstra) and each cell keeps
+    the first parent that reached it, so the chosen move is identical to
+    ``PathfindingAlgorithms.bfs_move``/``dijkstra_move``. Like
+    ``Board.search``, level k may enter body cells vacated by move k.
+
+    Returns None for boards where the food is unreachable; callers fall
+    back to the greedy move for those, like the scalar algorithms do.
+    """
+    if algorithm not in VECTORIZED_ALGORITHMS:
+        raise ValueError(f"No vectorized search for algorithm: {algorithm}")
+    if len({board.grid_size for board in boards}) > 1:
+        raise ValueError("All boards in a wavefront batch must have the same grid size")
+
+    moves: List[Optional[Direction]] = [None] * len(boards)
+    if not boards:
+        return moves
+
+    area = boards[0].stride * boards[0].stride
+    offsets = np.array(boards[0].offsets, dtype=np.int64)
+    free = np.frombuffer(b"".join(bytes(board.blocked) for board in boards), dtype=np.uint8) == 0
+    free_at = np.full(len(free), np.iinfo(np.int64).max, dtype=np.int64)
+    for row, board in enumerate(boards):
+        if board.vacate:
+            free_at[row * area + np.fromiter(board.vacate.keys(), np.int64, len(board.vacate))] = \
+                np.fromiter(board.vacate.values(), np.int64, len(board.vacate))
+    seen = np.zeros(len(free), dtype=bool)
+    first_move = np.zeros(len(free), dtype=np.int8)
+
+    starts, goals, rows = [], [], []
+    for row, board in enumerate(boards):
+        target = board.closest_food()
+        if board.head == target:
+            moves[row] = "UP"
+            continue
+        start, goal = board.cell(*board.head), board.cell(*target)
+        if start == OFF_BOARD or goal == OFF_BOARD:
+            continue
+        starts.append(row * area + start)
+        goals.append(row * area + goal)
+        rows.append(row)
+    if not rows:
+        return moves
+
+    frontier = np.array(starts, dtype=np.int64)
+    frontier_moves = None
+    goals = np.array(goals, dtype=np.int64)
+    pending = np.ones(len(goals), dtype=bool)
+    seen[frontier] = True
+    level = 0
+
+    while len(frontier) and pending.any():
+        level += 1
+        if algorithm == "dijkstra":
+            # Dijkstra pops each level in (x, y) order, which is cell order
+            order = np.argsort(frontier, kind="stable")
+            frontier = frontier[order]
+            if frontier_moves is not None:
+                frontier_moves = frontier_moves[order]
+
+        # Candidates come out in (parent pop order, direction) order, which is
+        # exactly the order the scalar search discovers them in
+        candidates = (frontier[:, None] + offsets[None, :]).ravel()
+        keep = np.flatnonzero((free[candidates] | (free_at[candidates] <= level)) & ~seen[candidates])
+        if not len(keep):
+            break
+        # Keep the first candidate per cell, in discovery order
+        _, first = np.unique(candidates[keep], return_index=True)
+        keep = keep[np.sort(first)]
+
+        parents = keep // len(offsets)
+        if frontier_moves is None:
+            children_moves = (keep % len(offsets)).astype(np.int8)
+        else:
+            children_moves = frontier_moves[parents]
+        frontier = candidates[keep]
+        frontier_moves = children_moves
+        seen[frontier] = True
+        first_move[frontier] = children_moves
+
+        # Drop boards whose food has been reached
+        reached = pending & seen[goals]
+        if reached.any():
+            pending &= ~reached
+            active = np.zeros(len(boards), dtype=bool)
+            active[np.array(rows)[pending]] = True
+            alive = active[frontier // area]
+            frontier, frontier_moves = frontier[alive], frontier_moves[alive]
+
+    for row, goal in zip(rows, goals):
+        if seen[goal]:
+            moves[row] = DIRECTION_NAMES[first_move[goal]]
+    return moves
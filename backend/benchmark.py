@@ -0,0 +1,365 @@
+"""Reproducible latency benchmarks for the pathfinding algorithms.
+
+Usage:
+    python benchmark.py --output results.json
+    python benchmark.py --stress --output results.json --compare baseline.json
+
+Every fixture is generated from a fixed seed, so runs on different commits
+time exactly the same boards.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from algorithms import PathfindingAlgorithms
+from board import Board, Coord
+from movecache import MoveCache, board_hash
+from models import AIRequest, GameStateInput, Position
+from wire import MoveRequest, decode_binary, decode_compact_json, encode_binary, encode_compact_json
+
+GRID_SIZES = [20, 30, 40]
+STRESS_GRID_SIZES = [80, 160]
+# Arenas where BFS, Dijkstra and A* switch to jump point search
+LARGE_GRID_SIZES = [200, 400]
+
+ALGORITHMS: Dict[str, Callable] = {
+    "random": PathfindingAlgorithms.random_move,
+    "greedy": PathfindingAlgorithms.greedy_move,
+    "bfs": PathfindingAlgorithms.bfs_move,
+    "dfs": PathfindingAlgorithms.dfs_move,
+    "dijkstra": PathfindingAlgorithms.dijkstra_move,
+    "astar": PathfindingAlgorithms.astar_move,
+    "field": PathfindingAlgorithms.distance_field_move,
+    "hamiltonian": PathfindingAlgorithms.hamiltonian_move,
+    "minimax": PathfindingAlgorithms.minimax_move,
+}
+
+# Request body encodings of /api/ai-move: encoder and decoder into a compiled board
+WIRE_FORMATS: Dict[str, Tuple[Callable[[AIRequest], bytes], Callable[[bytes], MoveRequest]]] = {
+    "json": (lambda request: request.model_dump_json().encode(),
+             lambda body: MoveRequest.from_ai_request(AIRequest.model_validate_json(body))),
+    "compact_json": (encode_compact_json, decode_compact_json),
+    "binary": (encode_binary, decode_binary),
+}
+
+
+def random_walk(rng: random.Random, grid_size: int, length: int, occupied: set) -> List[Coord]:
+    """A contiguous snake body grown from a random free cell."""
+    while True:
+        head = (rng.randrange(grid_size), rng.randrange(grid_size))
+        if head not in occupied:
+            break
+    body = [head]
+    occupied.add(head)
+    while len(body) < length:
+        x, y = body[-1]
+        options = [(x + dx, y + dy) for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0))
+                   if 0 <= x + dx < grid_size and 0 <= y + dy < grid_size
+                   and (x + dx, y + dy) not in occupied]
+        if not options:
+            break
+        body.append(rng.choice(options))
+        occupied.add(body[-1])
+    return body
+
+
+def serpentine_wall(grid_size: int) -> List[Coord]:
+    """A player body folded into vertical walls with alternating gaps, like a maze."""
+    body = []
+    columns = list(range(2, grid_size - 2, 4))
+    for index, x in enumerate(columns):
+        rows = range(0, grid_size - 2) if index % 2 == 0 else range(grid_size - 1, 1, -1)
+        body.extend((x, y) for y in rows)
+        if index + 1 < len(columns):
+            y = rows[-1]
+            body.extend((x + dx, y) for dx in range(1, 4))
+    return body
+
+
+def make_fixture(grid_size: int, layout: str, snake_length: str, seed: int) -> GameStateInput:
+    rng = random.Random(f"{grid_size}-{layout}-{snake_length}-{seed}")
+    length = 3 if snake_length == "short" else grid_size * 2
+    occupied: set = set()
+
+    if layout == "maze":
+        player = serpentine_wall(grid_size)
+        occupied.update(player)
+    elif layout == "unreachable":
+        # A body cell frees up once its snake has moved on, so the seal only
+        # holds if the player is longer than the AI's way around to it
+        player = []
+        while len(player) < grid_size * 3:
+            player = random_walk(rng, grid_size, grid_size * 3, set(occupied))
+        occupied.update(player)
+    else:
+        player = random_walk(rng, grid_size, length, occupied)
+    ai = random_walk(rng, grid_size, length, occupied)
+
+    if layout == "unreachable":
+        # Food in a corner sealed off by the head end of the player's body
+        food = [(grid_size - 1, grid_size - 1)]
+        seal = [(grid_size - 2, grid_size - 1), (grid_size - 2, grid_size - 2), (grid_size - 1, grid_size - 2)]
+        occupied.difference_update(seal)
+        player = seal + [cell for cell in player if cell not in seal and cell != food[0]]
+        ai = [cell for cell in ai if cell not in seal and cell != food[0]] or [(0, 0)]
+    else:
+        free = [(x, y) for x in range(grid_size) for y in range(grid_size) if (x, y) not in occupied]
+        food = rng.sample(free, 3)
+
+    return GameStateInput(
+        ai_snake=[Position(x=x, y=y) for x, y in ai],
+        player_snake=[Position(x=x, y=y) for x, y in player],
+        food=[Position(x=x, y=y) for x, y in food],
+        grid_size=grid_size,
+    )
+
+
+def build_fixtures(grid_sizes: List[int], boards_per_fixture: int) -> Dict[str, List[GameStateInput]]:
+    fixtures = {}
+    for grid_size in grid_sizes:
+        for layout in ("open", "maze", "unreachable"):
+            for snake_length in ("short", "long"):
+                name = f"{grid_size}x{grid_size}/{layout}/{snake_length}"
+                fixtures[name] = [make_fixture(grid_size, layout, snake_length, seed)
+                                  for seed in range(boards_per_fixture)]
+    return fixtures
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        "p50_ms": at(0.50) * 1000,
+        "p95_ms": at(0.95) * 1000,
+        "p99_ms": at(0.99) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+    }
+
+
+def measure(call: Callable[[], object], states: List[GameStateInput], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        for state in states:
+            started = time.perf_counter()
+            call(state)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def allocations(call: Callable[[], object], state: GameStateInput) -> Dict[str, int]:
+    """Peak traced memory and the number of blocks still allocated after one call."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        call(state)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "lineno") if stat.count_diff > 0)
+    return {"peak_alloc_bytes": peak, "retained_blocks": retained}
+
+
+def trap_check(state: GameStateInput) -> str:
+    return PathfindingAlgorithms.avoid_traps(Board.from_game_state(state), "UP")
+
+
+def bench_algorithms(fixtures: Dict[str, List[GameStateInput]], repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for name, states in fixtures.items():
+        for algorithm, move in ALGORITHMS.items():
+            move(states[0])  # Warm up
+            boards = [Board.from_game_state(state) for state in states]
+            for board in boards:
+                move(board)
+            entry = percentiles(measure(move, states, repeat))
+            entry["node_expansions"] = statistics.fmean(board.expanded for board in boards)
+            entry.update(allocations(move, states[0]))
+            results[f"{algorithm}/{name}"] = entry
+
+        # Cost of the opt-in trap check, next to the board compile it runs on
+        results[f"compile/{name}"] = percentiles(measure(Board.from_game_state, states, repeat))
+        results[f"avoid_traps/{name}"] = percentiles(measure(trap_check, states, repeat))
+        # A repeated board: compile, hash and a cache hit instead of a search
+        cache = MoveCache()
+        for state in states:
+            board = Board.from_game_state(state)
+            cache.put(board_hash(board, "astar"), PathfindingAlgorithms.astar_move(board))
+        results[f"cache_hit/{name}"] = percentiles(measure(
+            lambda state: cache.get(board_hash(Board.from_game_state(state), "astar")), states, repeat))
+    return results
+
+
+def bench_decode(fixtures: Dict[str, List[GameStateInput]], repeat: int) -> Dict[str, Dict]:
+    """Size of each request body encoding and the time to decode it into a board."""
+    results = {}
+    for name, states in fixtures.items():
+        if "open" not in name:
+            continue  # The maze and sealed-corner bodies are not chains of steps
+        requests = [AIRequest(game_state=state, algorithm="astar") for state in states]
+        for wire_format, (encode, decode) in WIRE_FORMATS.items():
+            try:
+                bodies = [encode(request) for request in requests]
+            except ValueError:
+                continue  # Grids too large for the binary format
+            entry = percentiles(measure(decode, bodies, repeat))
+            entry["request_bytes"] = statistics.fmean(len(body) for body in bodies)
+            results[f"decode/{wire_format}/{name}"] = entry
+    return results
+
+
+class InProcessClient:
+    """Minimal ASGI client: drives the app directly, without sockets or threads."""
+
+    def __init__(self, app):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+
+    def post(self, path: str, body: bytes) -> Tuple[int, bytes]:
+        return self.loop.run_until_complete(self._request("POST", path, body))
+
+    async def _request(self, method: str, path: str, body: bytes) -> Tuple[int, bytes]:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode())],
+            "client": ("127.0.0.1", 0),
+            "server": ("benchmark", 80),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        status, chunks = 0, []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+    def close(self) -> None:
+        self.loop.close()
+
+
+def bench_endpoint(fixtures: Dict[str, List[GameStateInput]], repeat: int) -> Dict[str, Dict]:
+    """Time full /api/ai-move requests: parsing, validation, search and serialization."""
+    import main
+
+    # Per-request INFO logging would dominate the timings
+    logger = logging.getLogger("main")
+    level, max_entries = logger.level, main.move_cache.max_entries
+    logger.setLevel(logging.ERROR)
+    # Repeated bodies would otherwise be answered from the move cache;
+    # restored afterwards, since the app is shared with whoever imported it
+    main.move_cache.max_entries = 0
+    app = main.app
+    client = InProcessClient(app)
+    results = {}
+    try:
+        for name, states in fixtures.items():
+            for algorithm in ("bfs", "astar"):
+                bodies = [json.dumps({"game_state": state.model_dump(), "algorithm": algorithm}).encode()
+                          for state in states]
+                client.post("/api/ai-move", bodies[0])  # Warm up
+                samples = []
+                for _ in range(repeat):
+                    for body in bodies:
+                        started = time.perf_counter()
+                        status, _ = client.post("/api/ai-move", body)
+                        samples.append(time.perf_counter() - started)
+                        assert status == 200, status
+                entry = percentiles(samples)
+                entry["request_bytes"] = statistics.fmean(len(body) for body in bodies)
+                results[f"endpoint/{algorithm}/{name}"] = entry
+    finally:
+        client.close()
+        main.move_cache.max_entries = max_entries
+        logger.setLevel(level)
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Names of benchmarks whose p50 grew by more than ``threshold`` times."""
+    regressions = []
+    for name, entry in results.items():
+        previous = baseline.get(name)
+        if previous and previous["p50_ms"] > 0 and entry["p50_ms"] > previous["p50_ms"] * threshold:
+            regressions.append(f"{name}: p50 {previous['p50_ms']:.3f}ms -> {entry['p50_ms']:.3f}ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Snake AI pathfinding algorithms.")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="flag benchmarks whose p50 grew by more than this factor")
+    parser.add_argument("--repeat", type=int, default=20, help="timed passes over each fixture")
+    parser.add_argument("--boards", type=int, default=5, help="boards per fixture")
+    parser.add_argument("--stress", action="store_true",
+                        help=f"also run {', '.join(map(str, STRESS_GRID_SIZES))} grids")
+    parser.add_argument("--large", action="store_true",
+                        help=f"also run {', '.join(map(str, LARGE_GRID_SIZES))} grids")
+    parser.add_argument("--skip-endpoint", action="store_true", help="only time the algorithm functions")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    args = parser.parse_args(argv)
+
+    grid_sizes = (GRID_SIZES + (STRESS_GRID_SIZES if args.stress else [])
+                  + (LARGE_GRID_SIZES if args.large else []))
+    fixtures = {name: states for name, states in build_fixtures(grid_sizes, args.boards).items()
+                if args.filter in name}
+
+    results = bench_algorithms(fixtures, args.repeat)
+    results.update(bench_decode(fixtures, args.repeat))
+    if not args.skip_endpoint:
+        results.update(bench_endpoint(fixtures, args.repeat))
+
+    for name, entry in results.items():
+        print(f"{name:<45} p50 {entry['p50_ms']:8.3f}ms  p95 {entry['p95_ms']:8.3f}ms  "
+              f"p99 {entry['p99_ms']:8.3f}ms  nodes {entry.get('node_expansions', 0):8.0f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,541 @@
+import copy
+import heapq
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from models import Direction, GameStateInput
+
+Coord = Tuple[int, int]
+
+# Cell id for coordinates that fall outside the padded grid
+OFF_BOARD = -1
+
+# Cost of a cell the search has not reached yet
+UNSEEN = 1 << 30
+
+# Expansions between budget checks; reading the clock every pop would cost more
+# than the check saves
+BUDGET_CHECK_INTERVAL = 64
+
+# Same order as PathfindingAlgorithms.DIRECTIONS; searches depend on it for tie-breaking
+DIRECTION_VECTORS: Tuple[Tuple[Direction, int, int], ...] = (
+    ("UP", 0, -1),
+    ("DOWN", 0, 1),
+    ("LEFT", -1, 0),
+    ("RIGHT", 1, 0),
+)
+
+
+@lru_cache(maxsize=32)
+def grid_layout(grid_size: int) -> Tuple[bytes, Tuple[int, ...], Dict[int, Direction]]:
+    """Wall template, neighbor offsets and offset-to-direction map for a grid size.
+
+    Cells are numbered column-major on a grid padded with a one-cell wall
+    border: ``cell = (x + 1) * stride + (y + 1)``. Column-major order keeps
+    integer cell order identical to ``(x, y)`` tuple order, which the
+    heap-based searches rely on when breaking ties.
+    """
+    stride = grid_size + 2
+    template = bytearray(b"\x01") * (stride * stride)
+    for x in range(grid_size):
+        start = (x + 1) * stride + 1
+        template[start:start + grid_size] = bytes(grid_size)
+    offsets = tuple(dx * stride + dy for _, dx, dy in DIRECTION_VECTORS)
+    moves = {offset: name for offset, (name, _, _) in zip(offsets, DIRECTION_VECTORS)}
+    return bytes(template), offsets, moves
+
+
+class QueueFrontier:
+    """FIFO frontier: breadth-first expansion order."""
+
+    relaxes = False
+
+    def __init__(self):
+        self._items = deque()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def push(self, cell: int, cost: int) -> None:
+        self._items.append((cell, cost))
+
+    def pop(self) -> Tuple[int, int]:
+        return self._items.popleft()
+
+    def cells(self) -> List[int]:
+        return [cell for cell, _ in self._items]
+
+
+class StackFrontier:
+    """LIFO frontier: depth-first expansion order."""
+
+    relaxes = False
+
+    def __init__(self):
+        self._items = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def push(self, cell: int, cost: int) -> None:
+        self._items.append((cell, cost))
+
+    def pop(self) -> Tuple[int, int]:
+        return self._items.pop()
+
+    def cells(self) -> List[int]:
+        return [cell for cell, _ in self._items]
+
+
+class PriorityFrontier:
+    """Binary-heap frontier ordered by (cost + heuristic, cost, cell)."""
+
+    relaxes = True
+
+    def __init__(self, heuristic: Optional[Callable[[int], int]] = None):
+        self._items = []
+        self._heuristic = heuristic
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def push(self, cell: int, cost: int) -> None:
+        estimate = cost + self._heuristic(cell) if self._heuristic else cost
+        heapq.heappush(self._items, (estimate, cost, cell))
+
+    def pop(self) -> Tuple[int, int]:
+        _, cost, cell = heapq.heappop(self._items)
+        return cell, cost
+
+    def cells(self) -> List[int]:
+        return [cell for _, _, cell in self._items]
+
+
+Frontier = Union[QueueFrontier, StackFrontier, PriorityFrontier]
+
+
+class Budget:
+    """Time and node allowance shared by every search on one board.
+
+    Searches charge their expansions in chunks and stop with their best
+    answer so far once either limit is reached; ``exhausted`` then records
+    that the move was budget-limited.
+    """
+
+    __slots__ = ("deadline", "nodes", "exhausted")
+
+    def __init__(self, seconds: Optional[float] = None, nodes: Optional[int] = None):
+        self.deadline = time.perf_counter() + seconds if seconds is not None else None
+        self.nodes = nodes
+        self.exhausted = False
+
+    def allowance(self) -> int:
+        """Expansions a search may make before charging them."""
+        if self.nodes is None:
+            return BUDGET_CHECK_INTERVAL
+        return max(1, min(BUDGET_CHECK_INTERVAL, self.nodes))
+
+    def spend(self, nodes: int) -> bool:
+        """Charge ``nodes`` expansions; returns False once the budget is used up."""
+        if self.nodes is not None:
+            self.nodes -= nodes
+            if self.nodes <= 0:
+                self.exhausted = True
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.exhausted = True
+        return not self.exhausted
+
+
+class Board:
+    """Occupancy grid compiled once per request and shared by every algorithm."""
+
+    __slots__ = ("grid_size", "stride", "blocked", "offsets", "moves",
+                 "ai_snake", "player_snake", "food", "expanded", "fallbacks",
+                 "budget", "labels", "region_sizes", "_vacate")
+
+    def __init__(self, grid_size: int, ai_snake: List[Coord],
+                 player_snake: List[Coord], food: List[Coord]):
+        size = max(grid_size, 0)
+        template, offsets, moves = grid_layout(size)
+        self.grid_size = grid_size
+        self.stride = size + 2
+        self.blocked = bytearray(template)
+        self.offsets = offsets
+        self.moves = moves
+        self.ai_snake = ai_snake
+        self.player_snake = player_snake
+        self.food = food
+        # Cells expanded by searches on this board, for benchmarks and metrics
+        self.expanded = 0
+        # Moves on this board where the algorithm's own search failed
+        self.fallbacks = 0
+        # Optional limit on the searches run on this board
+        self.budget: Optional[Budget] = None
+        # Connected region of each free cell, labelled on demand by region_size
+        self.labels: Optional[List[int]] = None
+        self.region_sizes: List[int] = [0]
+
+        # Built by the first search that needs it
+        self._vacate: Optional[Dict[int, int]] = None
+
+        # Everything except the AI tail is a wall, as the tail will move
+        blocked = self.blocked
+        for x, y in ai_snake[:-1]:
+            cell = self.cell(x, y)
+            if cell != OFF_BOARD:
+                blocked[cell] = 1
+        for x, y in player_snake:
+            cell = self.cell(x, y)
+            if cell != OFF_BOARD:
+                blocked[cell] = 1
+
+    @classmethod
+    def from_game_state(cls, game_state: GameStateInput) -> "Board":
+        """Compile a request's game state."""
+        return cls(
+            game_state.grid_size,
+            [(pos.x, pos.y) for pos in game_state.ai_snake],
+            [(pos.x, pos.y) for pos in game_state.player_snake],
+            [(pos.x, pos.y) for pos in game_state.food],
+        )
+
+    @classmethod
+    def of(cls, state: Union[GameStateInput, "Board"]) -> "Board":
+        """Return ``state`` if it is already compiled, otherwise compile it."""
+        return state if isinstance(state, cls) else cls.from_game_state(state)
+
+    @classmethod
+    def after_player_moves(cls, game_state: GameStateInput) -> Dict[Direction, "Board"]:
+        """The AI's board after each move the player can make from ``game_state``.
+
+        The player can't turn back into its neck, which leaves up to three
+        moves. Both snakes are compiled once, without the player's tail,
+        which every move leaves; each board then adds only the new head.
+        """
+        player = [(pos.x, pos.y) for pos in game_state.player_snake]
+        shared = cls(
+            game_state.grid_size,
+            [(pos.x, pos.y) for pos in game_state.ai_snake],
+            player[:-1],
+            [(pos.x, pos.y) for pos in game_state.food],
+        )
+        head_x, head_y = player[0]
+        boards = {}
+        for name, dx, dy in DIRECTION_VECTORS:
+            head = (head_x + dx, head_y + dy)
+            if len(player) < 2 or head != player[1]:
+                boards[name] = shared.with_player_head(head)
+        return boards
+
+    def with_player_head(self, head: Coord) -> "Board":
+        """Copy of this board with ``head`` added to the front of the player snake."""
+        board = copy.copy(self)
+        board.blocked = bytearray(self.blocked)
+        board.player_snake = [head] + self.player_snake
+        board.expanded = board.fallbacks = 0
+        board.budget = board.labels = board._vacate = None
+        board.region_sizes = [0]
+        cell = self.cell(*head)
+        if cell != OFF_BOARD:
+            board.blocked[cell] = 1
+        return board
+
+    @property
+    def head(self) -> Coord:
+        return self.ai_snake[0]
+
+    @property
+    def limited(self) -> bool:
+        """Whether a search on this board ran out of budget."""
+        return self.budget is not None and self.budget.exhausted
+
+    @property
+    def vacate(self) -> Dict[int, int]:
+        """Move from which each body cell on the board is free again.
+
+        The segment i places from the head of an n-long snake leaves its
+        cell after n - i moves. The player has already made this tick's
+        move, so its cells stay taken one move longer. A repeated cell (a
+        tail that just grew) is free once its segment nearest the head has
+        left. Walls and free cells have no entry.
+        """
+        if self._vacate is None:
+            vacate = self._vacate = {}
+            size, stride = self.grid_size, self.stride
+            # Walked tail first, so the segment nearest the head has the last
+            # word. The AI's last blocked cell and the player's tail both free
+            # up on the second move
+            for snake in (self.ai_snake[:-1], self.player_snake):
+                moves = 2
+                for x, y in reversed(snake):
+                    if 0 <= x < size and 0 <= y < size:
+                        vacate[(x + 1) * stride + y + 1] = moves
+                    moves += 1
+        return self._vacate
+
+    def cell(self, x: int, y: int) -> int:
+        """Cell id of an in-grid coordinate, or OFF_BOARD."""
+        if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
+            return (x + 1) * self.stride + y + 1
+        return OFF_BOARD
+
+    def xy(self, cell: int) -> Coord:
+        x, y = divmod(cell, self.stride)
+        return x - 1, y - 1
+
+    def is_free(self, x: int, y: int) -> bool:
+        cell = self.cell(x, y)
+        return cell != OFF_BOARD and not self.blocked[cell]
+
+    def safe_directions(self, x: int, y: int) -> List[Direction]:
+        """Directions from (x, y) that stay in the grid and avoid obstacles."""
+        return [name for name, dx, dy in DIRECTION_VECTORS if self.is_free(x + dx, y + dy)]
+
+    def closest_food(self) -> Coord:
+        """Food closest to the AI head by Manhattan distance."""
+        if not self.food:
+            return (0, 0)  # Fallback
+        hx, hy = self.head
+        return min(self.food, key=lambda f: abs(hx - f[0]) + abs(hy - f[1]))
+
+    def manhattan_to(self, target: Coord) -> Callable[[int], int]:
+        """Heuristic measuring Manhattan distance from a cell to ``target``."""
+        stride = self.stride
+        tx, ty = target[0] + 1, target[1] + 1
+
+        def heuristic(cell: int) -> int:
+            x, y = divmod(cell, stride)
+            return abs(x - tx) + abs(y - ty)
+
+        return heuristic
+
+    def search(self, start: int, goal: int, frontier: Frontier) -> Optional[List[int]]:
+        """Search from ``start`` to ``goal`` in the order given by ``frontier``.
+
+        A body cell is passable once the search reaches it no earlier than
+        the move its snake leaves it (see ``vacate``), so a path may run
+        through where a tail is now. Returns the cells after ``start`` up to
+        and including ``goal``, rebuilt from the parent-pointer array, or
+        None if the goal is unreachable. If the board's budget runs out first, returns the path
+        to the reached cell closest to ``goal`` instead (None if the search
+        got nowhere).
+        """
+        budget = self.budget
+        if budget is not None and budget.exhausted:
+            return None
+        blocked = self.blocked
+        vacate = self.vacate
+        offsets = self.offsets
+        relaxes = frontier.relaxes
+        push, pop = frontier.push, frontier.pop
+        cost = [UNSEEN] * len(blocked)
+        parent = [OFF_BOARD] * len(blocked)
+
+        cost[start] = 0
+        push(start, 0)
+        expanded = 0
+        charged = 0
+        check_at = budget.allowance() if budget is not None else -1
+        while frontier:
+            current, current_cost = pop()
+            if current == goal:
+                self.expanded += expanded
+                path = []
+                while current != start:
+                    path.append(current)
+                    current = parent[current]
+                path.reverse()
+                return path
+
+            # Skip if we've found a shorter path to this cell
+            if current_cost > cost[current]:
+                continue
+
+            expanded += 1
+            if expanded == check_at:
+                if not budget.spend(expanded - charged):
+                    self.expanded += expanded
+                    return self._closest_path(start, goal, [current] + frontier.cells(), parent)
+                charged = expanded
+                check_at = expanded + budget.allowance()
+            next_cost = current_cost + 1  # All edges have weight 1
+            for offset in offsets:
+                neighbor = current + offset
+                if blocked[neighbor] and vacate.get(neighbor, UNSEEN) > next_cost:
+                    continue
+                if relaxes:
+                    if next_cost >= cost[neighbor]:
+                        continue
+                elif cost[neighbor] != UNSEEN:
+                    continue
+                cost[neighbor] = next_cost
+                parent[neighbor] = current
+                push(neighbor, next_cost)
+        self.expanded += expanded
+        if budget is not None:
+            budget.spend(expanded - charged)
+        return None
+
+    def _closest_path(self, start: int, goal: int, reached: List[int],
+                      parent: List[int]) -> Optional[List[int]]:
+        """Path to whichever of the ``reached`` cells is nearest ``goal`` by Manhattan distance."""
+        gx, gy = divmod(goal, self.stride)
+
+        def remaining(cell: int) -> Tuple[int, int]:
+            x, y = divmod(cell, self.stride)
+            return abs(x - gx) + abs(y - gy), cell
+
+        best = min(reached, key=remaining)
+        if best == start:
+            return None
+        path = []
+        while best != start:
+            path.append(best)
+            best = parent[best]
+        path.reverse()
+        return path
+
+    def first_step(self, target: Coord, frontier: Frontier) -> Optional[Direction]:
+        """First move of the path the frontier finds from the AI head to ``target``.
+
+        Returns None when the target cannot be reached.
+        """
+        if self.head == tuple(target):
+            return "UP"
+        # An off-grid head has at most one free neighbor, which greedy finds anyway
+        start = self.cell(*self.head)
+        if start == OFF_BOARD:
+            return None
+        path = self.search(start, self.cell(*target), frontier)
+        if path is None:
+            return None
+        return self.moves[path[0] - start] if path else "UP"
+
+    def distance_field(self, stop_at: int = OFF_BOARD) -> List[int]:
+        """Steps from every free cell to its nearest food, in one multi-source BFS.
+
+        Unreachable cells stay UNSEEN. When ``stop_at`` is given (normally the
+        head, which is itself blocked) the sweep ends after the level that
+        reaches it, so its neighbors on a shortest route are already labelled.
+        """
+        blocked = self.blocked
+        offsets = self.offsets
+        distance = [UNSEEN] * len(blocked)
+        frontier = []
+        for x, y in self.food:
+            cell = self.cell(x, y)
+            if cell != OFF_BOARD and not blocked[cell] and distance[cell]:
+                distance[cell] = 0
+                frontier.append(cell)
+
+        budget = self.budget
+        level = 0
+        expanded = 0
+        while frontier:
+            if budget is not None and not budget.spend(len(frontier)):
+                break
+            level += 1
+            expanded += len(frontier)
+            next_frontier = []
+            for current in frontier:
+                for offset in offsets:
+                    neighbor = current + offset
+                    if distance[neighbor] != UNSEEN:
+                        continue
+                    if neighbor == stop_at:
+                        distance[neighbor] = level
+                    elif not blocked[neighbor]:
+                        distance[neighbor] = level
+                        next_frontier.append(neighbor)
+            if stop_at != OFF_BOARD and distance[stop_at] != UNSEEN:
+                break
+            frontier = next_frontier
+        self.expanded += expanded
+        return distance
+
+    def region_size(self, cell: int) -> int:
+        """Number of free cells connected to ``cell``, or 0 if it is blocked.
+
+        Regions are labelled with one flood fill the first time any of their
+        cells is asked about, so every later lookup in the same region (for
+        another candidate move, or by another algorithm) is O(1).
+        """
+        if cell == OFF_BOARD or self.blocked[cell]:
+            return 0
+        labels = self.labels
+        if labels is None:
+            labels = self.labels = [0] * len(self.blocked)
+        if not labels[cell]:
+            blocked = self.blocked
+            offsets = self.offsets
+            label = len(self.region_sizes)
+            labels[cell] = label
+            stack = [cell]
+            size = 0
+            while stack:
+                current = stack.pop()
+                size += 1
+                for offset in offsets:
+                    neighbor = current + offset
+                    if not blocked[neighbor] and not labels[neighbor]:
+                        labels[neighbor] = label
+                        stack.append(neighbor)
+            self.region_sizes.append(size)
+        return self.region_sizes[labels[cell]]
+
+    def has_room(self, cell: int, needed: int) -> bool:
+        """Whether at least ``needed`` free cells are connected to ``cell``.
+
+        Stops flooding as soon as it has counted enough, so checking a large
+        region costs O(needed) rather than O(region).
+        """
+        if cell == OFF_BOARD or self.blocked[cell]:
+            return False
+        if self.labels is not None and self.labels[cell]:
+            return self.region_sizes[self.labels[cell]] >= needed
+        blocked = self.blocked
+        offsets = self.offsets
+        seen = {cell}
+        stack = [cell]
+        while stack and len(seen) < needed:
+            current = stack.pop()
+            for offset in offsets:
+                neighbor = current + offset
+                if not blocked[neighbor] and neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        return len(seen) >= needed
+
+    def step(self, direction: Direction) -> int:
+        """Cell the AI head moves into in ``direction``, or OFF_BOARD."""
+        for name, dx, dy in DIRECTION_VECTORS:
+            if name == direction:
+                x, y = self.head
+                return self.cell(x + dx, y + dy)
+        return OFF_BOARD
+
+    def room_after(self, direction: Direction) -> int:
+        """Free cells the AI head can still reach after moving in ``direction``."""
+        return self.region_size(self.step(direction))
+
+    def nearest_food_step(self) -> Optional[Direction]:
+        """First move toward whichever food is nearest by actual path length.
+
+        Follows the distance field downhill from the head, breaking ties in
+        DIRECTION_VECTORS order. Returns None when no food can be reached.
+        """
+        if self.head in self.food:
+            return "UP"
+        start = self.cell(*self.head)
+        if start == OFF_BOARD:
+            return None
+        distance = self.distance_field(stop_at=start)
+        if distance[start] == UNSEEN:
+            return None
+        for offset in self.offsets:
+            neighbor = start + offset
+            if not self.blocked[neighbor] and distance[neighbor] == distance[start] - 1:
+                return self.moves[offset]
+        return None
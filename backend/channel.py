@@ -0,0 +1,67 @@
+import uuid
+from collections import deque
+from typing import Optional
+
+from board import Board, DIRECTION_VECTORS
+from models import AIRequest, Direction, TickDelta
+
+STEPS = {name: (dx, dy) for name, dx, dy in DIRECTION_VECTORS}
+
+
+class GameChannel:
+    """Server-side copy of one WebSocket game, kept in sync from per-tick deltas.
+
+    The snakes are stored exactly as the frontend stores them, including the
+    duplicated tail cell ``growSnake`` appends, so boards built here match
+    the ones a full ``/api/ai-move`` request would produce.
+    """
+
+    def __init__(self, request: AIRequest):
+        state = request.game_state
+        self.algorithm = request.algorithm
+        self.avoid_traps = request.avoid_traps
+        self.time_budget_ms = request.time_budget_ms
+        self.node_budget = request.node_budget
+        self.game_id = request.game_id or uuid.uuid4().hex
+        self.grid_size = state.grid_size
+        self.ai_snake = deque((pos.x, pos.y) for pos in state.ai_snake)
+        self.player_snake = deque((pos.x, pos.y) for pos in state.player_snake)
+        self.food = [(pos.x, pos.y) for pos in state.food]
+        self.tick = 0
+        # Direction last sent to the client, applied to the AI snake on the next tick
+        self.pending: Optional[Direction] = None
+
+    def board(self) -> Board:
+        return Board(self.grid_size, list(self.ai_snake), list(self.player_snake), list(self.food))
+
+    def reply(self, direction: Direction, complete: bool = True) -> dict:
+        self.pending = direction
+        return {"direction": direction, "tick": self.tick, "complete": complete}
+
+    def apply(self, delta: TickDelta) -> None:
+        """Replay what the client did since the last reply."""
+        if self.pending is None:
+            raise ValueError("No move was sent for the previous tick")
+
+        # AI: moveSnake with the direction we sent, then growSnake if it ate
+        dx, dy = STEPS[self.pending]
+        head_x, head_y = self.ai_snake[0]
+        self.ai_snake.appendleft((head_x + dx, head_y + dy))
+        self.ai_snake.pop()
+        if delta.ai_grew:
+            self.ai_snake.append(self.ai_snake[-1])
+
+        # Player: growSnake from the last tick followed by this tick's moveSnake,
+        # which together leave the tail in place
+        self.player_snake.appendleft(tuple(delta.player_head))
+        if not delta.player_grew:
+            self.player_snake.pop()
+
+        for cell in delta.food_removed:
+            cell = tuple(cell)
+            if cell in self.food:
+                self.food.remove(cell)
+        self.food.extend(tuple(cell) for cell in delta.food_added)
+
+        self.tick += 1
+        self.pending = None
@@ -0,0 +1,94 @@
+"""Measure how long a freshly started server takes to serve its first move.
+
+Usage:
+    python coldstart.py --runs 5
+    python coldstart.py --runs 5 --no-warmup
+
+Each run starts ``uvicorn main:app`` in a new process and polls it. It
+reports the time from spawning the process to the first answered
+``/api/health``, to ``/api/ready``, and to the first successful
+``/api/ai-move``, and how long that first move took on its own.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+
+from warmup import synthetic_requests
+
+POLL_SECONDS = 0.005
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(url: str, body: Optional[bytes] = None) -> Optional[bytes]:
+    """The response body, or None if the server isn't answering yet."""
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, body, headers), timeout=5) as response:
+            return response.read()
+    except (urllib.error.URLError, ConnectionError):
+        return None
+
+
+def wait_for(url: str, started: float, timeout: float, body: Optional[bytes] = None) -> float:
+    """Milliseconds since ``started`` when ``url`` first answers with success."""
+    while time.perf_counter() - started < timeout:
+        reply = request(url, body)
+        if reply is not None and (body is None or json.loads(reply).get("success")):
+            return (time.perf_counter() - started) * 1000
+        time.sleep(POLL_SECONDS)
+    raise TimeoutError(f"{url} did not answer within {timeout}s")
+
+
+def measure(algorithm: str, grid_size: int, warmup: bool, timeout: float) -> Dict[str, float]:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/api"
+    env = dict(os.environ, SNAKE_WARMUP="1" if warmup else "0")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        result = {"health_ms": wait_for(f"{base}/health", started, timeout),
+                  "ready_ms": wait_for(f"{base}/ready", started, timeout)}
+        body = synthetic_requests(grid_size, algorithm)["application/json"]
+        move_started = time.perf_counter()
+        result["first_move_ms"] = wait_for(f"{base}/ai-move", started, timeout, body)
+        result["move_ms"] = (time.perf_counter() - move_started) * 1000
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time a cold server start up to its first move.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--algorithm", default="astar")
+    parser.add_argument("--grid-size", type=int, default=20)
+    parser.add_argument("--no-warmup", action="store_true", help="start the server with SNAKE_WARMUP=0")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for each step")
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.algorithm, args.grid_size, not args.no_warmup, args.timeout) for _ in range(args.runs)]
+    for name in runs[0]:
+        samples = sorted(run[name] for run in runs)
+        print(f"{name:<14} min {samples[0]:8.1f}ms  median {samples[len(samples) // 2]:8.1f}ms  "
+              f"max {samples[-1]:8.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+from board import Board, Coord, DIRECTION_VECTORS
+from models import Direction
+
+# A policy picks a move for the snake stored as ``ai_snake`` on the board
+Policy = Callable[[Board], Direction]
+
+STEPS: Dict[str, Tuple[int, int]] = {name: (dx, dy) for name, dx, dy in DIRECTION_VECTORS}
+
+OPPOSITE_DIRECTIONS: Dict[str, Direction] = {
+    "UP": "DOWN",
+    "DOWN": "UP",
+    "LEFT": "RIGHT",
+    "RIGHT": "LEFT",
+}
+
+
+def get_fruit_count(grid_size: int) -> int:
+    return {20: 1, 30: 2, 40: 3}.get(grid_size, 1)
+
+
+def move_snake(positions: List[Coord], direction: Direction) -> List[Coord]:
+    dx, dy = STEPS[direction]
+    head_x, head_y = positions[0]
+    return [(head_x + dx, head_y + dy)] + positions[:-1]
+
+
+def grow_snake(positions: List[Coord]) -> List[Coord]:
+    return positions + [positions[-1]]
+
+
+def check_collision(position: Coord, grid_size: int) -> bool:
+    x, y = position
+    return x < 0 or x >= grid_size or y < 0 or y >= grid_size
+
+
+def check_self_collision(positions: List[Coord]) -> bool:
+    return positions[0] in positions[1:]
+
+
+def check_snake_collision(positions: List[Coord], other: List[Coord]) -> bool:
+    return positions[0] in other
+
+
+class Game:
+    """Headless game with the frontend's rules.
+
+    Mirrors ``src/utils/gameLogic.ts`` and one iteration of
+    ``useGameLogic.gameLoop``: the player moves first, the AI decides on the
+    board with the player already moved, then both are checked for
+    collisions before either eats.
+    """
+
+    def __init__(self, grid_size: int = 20, rng: Optional[random.Random] = None):
+        self.grid_size = grid_size
+        self.rng = rng or random.Random()
+        player_x = grid_size // 4
+        ai_x = (grid_size * 3) // 4
+        start_y = grid_size // 2
+        self.player_snake: List[Coord] = [(player_x - i, start_y) for i in range(3)]
+        self.player_direction: Direction = "RIGHT"
+        self.ai_snake: List[Coord] = [(ai_x + i, start_y) for i in range(3)]
+        self.ai_direction: Direction = "LEFT"
+        self.food: List[Coord] = []
+        self.spawn_food([])
+        self.score = {"player": 0, "ai": 0}
+        self.game_over = False
+        self.winner: Optional[str] = None
+        self.ticks = 0
+
+    def spawn_food(self, occupied: List[Coord]) -> None:
+        """Top up the food like generateMultipleFruits: up to 100 tries per fruit."""
+        taken = set(occupied)
+        for _ in range(get_fruit_count(self.grid_size) - len(self.food)):
+            attempts = 0
+            while True:
+                fruit = (self.rng.randrange(self.grid_size), self.rng.randrange(self.grid_size))
+                attempts += 1
+                if (fruit not in taken and fruit not in self.food) or attempts >= 100:
+                    break
+            self.food.append(fruit)
+
+    def player_board(self) -> Board:
+        """Board from the player's side, for driving the player with an algorithm."""
+        return Board(self.grid_size, self.player_snake, self.ai_snake, self.food)
+
+    def step(self, player_direction: Direction, ai_policy: Policy) -> None:
+        """Play one tick."""
+        board = self.ai_board(player_direction)
+        self.advance(board, ai_policy(board))
+
+    def ai_board(self, player_direction: Direction) -> Board:
+        """Turn the player and return the board the AI decides this tick's move on,
+        with the player already moved. ``advance`` finishes the tick."""
+        # The player can't reverse into its own neck; the turn is ignored
+        if OPPOSITE_DIRECTIONS[self.player_direction] != player_direction:
+            self.player_direction = player_direction
+        player = move_snake(self.player_snake, self.player_direction)
+        return Board(self.grid_size, self.ai_snake, player, self.food)
+
+    def advance(self, board: Board, ai_direction: Direction) -> None:
+        """Move the AI on a board from ``ai_board`` and settle collisions and food."""
+        player = board.player_snake
+        self.ai_direction = ai_direction
+        ai = move_snake(self.ai_snake, self.ai_direction)
+        self.ticks += 1
+
+        player_died = (check_collision(player[0], self.grid_size)
+                       or check_self_collision(player)
+                       or check_snake_collision(player, ai))
+        ai_died = (check_collision(ai[0], self.grid_size)
+                   or check_self_collision(ai)
+                   or check_snake_collision(ai, player))
+        self.player_snake, self.ai_snake = player, ai
+
+        if player_died or ai_died:
+            self.game_over = True
+            if player_died and ai_died:
+                self.winner = "tie"
+            elif player_died:
+                self.winner = "ai"
+            else:
+                self.winner = "player"
+            return
+
+        player_ate = player[0] in self.food
+        ai_ate = ai[0] in self.food
+        if player_ate:
+            self.player_snake = grow_snake(player)
+            self.score["player"] += 1
+            self.food = [f for f in self.food if f != player[0]]
+        if ai_ate:
+            self.ai_snake = grow_snake(ai)
+            self.score["ai"] += 1
+            self.food = [f for f in self.food if f != ai[0]]
+        if player_ate or ai_ate:
+            self.spawn_food(self.player_snake + self.ai_snake)
+
+    def play(self, player_policy: Policy, ai_policy: Policy, max_ticks: int = 5000) -> Optional[str]:
+        """Play until someone dies or ``max_ticks`` pass; returns the winner, or None on timeout."""
+        while not self.game_over and self.ticks < max_ticks:
+            self.step(player_policy(self.player_board()), ai_policy)
+        return self.winner
@@ -0,0 +1,90 @@
+"""Where the move searches run: on the event loop, in threads or in processes.
+
+Searches are synchronous and CPU-bound, so running them inline stalls every
+other connection on the worker while one runs. ``MoveExecutor`` hands them
+to a thread or process pool instead, behind a bounded queue: when
+``max_pending`` jobs are already queued or running, ``run`` raises
+``Overloaded`` straight away so the caller can answer with a cheap move,
+and a job that misses its deadline raises ``asyncio.TimeoutError`` (a job
+that hasn't started yet is dropped from the queue).
+
+Threads share the server's caches and sessions but hold the GIL while
+searching; processes scale with cores but only get a copy of the board.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from board import Board
+from models import Direction
+
+MODES = ("inline", "thread", "process")
+
+
+class Overloaded(Exception):
+    """Every worker is busy and the queue is full."""
+
+
+def run_search(search: Callable[[Board], Direction], board: Board) -> Tuple[Direction, int, int, bool]:
+    """Worker entry point: run one algorithm and report what the search did,
+    since a process pool works on a copy of the board."""
+    direction = search(board)
+    return direction, board.expanded, board.fallbacks, board.limited
+
+
+class MoveExecutor:
+    def __init__(self, mode: str = "inline", workers: Optional[int] = None, max_pending: Optional[int] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown executor mode: {mode}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[Executor] = None
+
+    @property
+    def pool(self) -> Optional[Executor]:
+        """The worker pool, started on first use; None when running inline."""
+        if self._pool is None and self.mode != "inline":
+            if self.mode == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="move-search")
+            else:
+                # Forking a server with running threads can copy held locks; spawn starts clean
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None):
+        """Run ``fn(*args)`` on the pool, or inline when there is none."""
+        pool = self.pool
+        if pool is None:
+            return fn(*args)
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise Overloaded(f"{self.pending} moves already pending")
+            self.pending += 1
+        # Counted until the job really finishes, even if its caller gave up
+        future = pool.submit(fn, *args)
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise
+        except BrokenExecutor:
+            # A worker died; start a fresh pool for the next move
+            self.shutdown()
+            raise
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,94 @@
+"""Hamiltonian cycles over the game grid, built once per grid size.
+
+A cycle is stored as two arrays over padded board cells (see
+``board.grid_layout``): ``order`` lists the cells in cycle order and
+``index`` maps every cell to its position on the cycle, or -1 for walls.
+Set ``SNAKE_CYCLE_CACHE_DIR`` to also keep cycles on disk between runs.
+"""
+import logging
+import os
+from array import array
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from board import Coord
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get("SNAKE_CYCLE_CACHE_DIR")
+
+# (cells in cycle order, cycle index of each padded cell)
+Cycle = Tuple[array, array]
+
+
+def build_cycle(grid_size: int) -> Optional[List[Coord]]:
+    """Coordinates of a Hamiltonian cycle, or None if the grid has none.
+
+    Runs along the top row, zigzags over the remaining rows in columns
+    1..n-1 and returns up column 0. Grids with an odd number of cells
+    have no Hamiltonian cycle.
+    """
+    if grid_size < 2 or grid_size % 2:
+        return None
+    path = [(x, 0) for x in range(grid_size)]
+    for y in range(1, grid_size):
+        columns = range(grid_size - 1, 0, -1) if y % 2 else range(1, grid_size)
+        path.extend((x, y) for x in columns)
+    path.extend((0, y) for y in range(grid_size - 1, 0, -1))
+    return path
+
+
+def cache_path(grid_size: int) -> Optional[str]:
+    if not CACHE_DIR:
+        return None
+    return os.path.join(CACHE_DIR, f"hamiltonian-{grid_size}.bin")
+
+
+def load_order(grid_size: int) -> Optional[array]:
+    path = cache_path(grid_size)
+    if not path or not os.path.exists(path):
+        return None
+    order = array("i")
+    try:
+        with open(path, "rb") as f:
+            order.frombytes(f.read())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read cycle cache {path}: {str(e)}")
+        return None
+    stride = grid_size + 2
+    in_grid = {(x + 1) * stride + y + 1 for x in range(grid_size) for y in range(grid_size)}
+    if len(order) != len(in_grid) or set(order) != in_grid:
+        logger.warning(f"Ignoring cycle cache {path}: it does not cover a {grid_size}x{grid_size} grid")
+        return None
+    return order
+
+
+def save_order(grid_size: int, order: array) -> None:
+    path = cache_path(grid_size)
+    if not path:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(order.tobytes())
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        logger.warning(f"Could not write cycle cache {path}: {str(e)}")
+
+
+@lru_cache(maxsize=32)
+def hamiltonian_cycle(grid_size: int) -> Optional[Cycle]:
+    """Cycle for a grid size, from memory, then disk, then built from scratch."""
+    order = load_order(grid_size)
+    if order is None:
+        path = build_cycle(grid_size)
+        if path is None:
+            return None
+        stride = grid_size + 2
+        order = array("i", ((x + 1) * stride + y + 1 for x, y in path))
+        save_order(grid_size, order)
+
+    index = array("i", [-1]) * ((grid_size + 2) ** 2)
+    for position, cell in enumerate(order):
+        index[cell] = position
+    return order, index
@@ -0,0 +1,204 @@
+"""Jump point search for large grids.
+
+A* on a big, mostly open board spends nearly all its time pushing and
+popping cells of long straight runs. Jump point search (JPS) keeps only
+the cells where a shortest path may have to turn ("jump points") and jumps
+straight over the rest, so it returns paths exactly as short as A*'s while
+expanding a small fraction of the cells.
+
+This is the 4-connected form of JPS. Moves along a column (y) are the
+"straight" ones: a column run only stops at the goal, a wall, or a cell
+where a side neighbor opens up behind an obstacle (a forced neighbor).
+Moves along a row (x) correspond to the diagonals of classic JPS: a row run
+stops wherever a column run from it would reach a jump point. Columns are
+contiguous in the board's column-major layout, so column runs are found
+with ``bytearray.find`` in C rather than cell by cell.
+
+Only the jump points reached are kept, in dicts, so the memory of a search
+grows with the number of turns in the board rather than with its area.
+"""
+import heapq
+from typing import Dict, List, Optional
+
+from board import OFF_BOARD, Board
+from models import Direction
+
+# From the grid sizes where A*'s per-cell work outweighs the setup of a jump search
+LARGE_GRID_SIZE = 100
+
+WALL = b"\x01"
+# A blocked cell followed by a free one further down / up its column
+OPENS_DOWN = b"\x01\x00"
+OPENS_UP = b"\x00\x01"
+
+# How a jump point was reached; the start is expanded in every direction
+DOWN_BIT, UP_BIT, RIGHT_BIT, LEFT_BIT = 1, 2, 4, 8
+ALL_DIRECTIONS = DOWN_BIT | UP_BIT | RIGHT_BIT | LEFT_BIT
+
+
+def jump_point_search(board: Board, start: int, goal: int) -> Optional[List[int]]:
+    """Jump points of a shortest path from ``start`` to ``goal``.
+
+    Returns the jump points after ``start`` up to and including ``goal``,
+    consecutive points lying on one row or column, or None if the goal is
+    unreachable. Like ``Board.search``, if the board's budget runs out it
+    returns the way to the jump point closest to the goal instead.
+    """
+    budget = board.budget
+    if budget is not None and budget.exhausted:
+        return None
+    blocked, stride = board.blocked, board.stride
+    find, rfind = blocked.find, blocked.rfind
+    goal_x, goal_y = divmod(goal, stride)
+
+    def run_down(cell: int) -> int:
+        """Jump point below ``cell`` in its column, or OFF_BOARD."""
+        wall = find(WALL, cell + 1)
+        stop = goal if cell < goal < wall else wall
+        # Left column: blocked at y - 1, free at y. Right column likewise
+        opening = find(OPENS_DOWN, cell - stride, stop - stride)
+        if opening >= 0:
+            stop = opening + stride + 1
+        opening = find(OPENS_DOWN, cell + stride, stop + stride)
+        if opening >= 0:
+            stop = opening - stride + 1
+        return OFF_BOARD if stop == wall else stop
+
+    def run_up(cell: int) -> int:
+        """Jump point above ``cell`` in its column, or OFF_BOARD."""
+        wall = rfind(WALL, 0, cell)
+        stop = goal if wall < goal < cell else wall
+        opening = rfind(OPENS_UP, stop + 1 - stride, cell - stride + 1)
+        if opening >= 0:
+            stop = opening + stride
+        opening = rfind(OPENS_UP, stop + 1 + stride, cell + stride + 1)
+        if opening >= 0:
+            stop = opening - stride
+        return OFF_BOARD if stop == wall else stop
+
+    def run_across(cell: int, step: int) -> int:
+        """Jump point along the row from ``cell`` (``step`` is ±stride), or OFF_BOARD."""
+        while True:
+            cell += step
+            if blocked[cell]:
+                return OFF_BOARD
+            if cell == goal or run_down(cell) != OFF_BOARD or run_up(cell) != OFF_BOARD:
+                return cell
+
+    def estimate(cell: int) -> int:
+        x, y = divmod(cell, stride)
+        return abs(x - goal_x) + abs(y - goal_y)
+
+    cost: Dict[int, int] = {start: 0}
+    arrived: Dict[int, int] = {start: ALL_DIRECTIONS}
+    parent: Dict[int, int] = {}
+    closed = set()
+    heap = [(estimate(start), 0, start)]
+    closest, closest_estimate = start, estimate(start)
+    expanded = 0
+    charged = 0
+    check_at = budget.allowance() if budget is not None else -1
+    while heap:
+        _, current_cost, current = heapq.heappop(heap)
+        if current == goal:
+            board.expanded += expanded
+            return _jump_points(parent, start, goal)
+        if current_cost > cost[current]:
+            continue
+        closed.add(current)
+
+        expanded += 1
+        if expanded == check_at:
+            if not budget.spend(expanded - charged):
+                board.expanded += expanded
+                return None if closest == start else _jump_points(parent, start, closest)
+            charged = expanded
+            check_at = expanded + budget.allowance()
+
+        # Prune to the directions a shortest path arriving this way may continue in
+        directions = arrived[current]
+        if directions & (DOWN_BIT | UP_BIT):
+            moves = directions & (DOWN_BIT | UP_BIT)
+            for vertical_bit, back in ((DOWN_BIT, -1), (UP_BIT, 1)):
+                if directions & vertical_bit:
+                    # A side opening up behind an obstacle forces a turn
+                    if not blocked[current + stride] and blocked[current + stride + back]:
+                        moves |= RIGHT_BIT
+                    if not blocked[current - stride] and blocked[current - stride + back]:
+                        moves |= LEFT_BIT
+        else:
+            moves = DOWN_BIT | UP_BIT
+        moves |= directions & (RIGHT_BIT | LEFT_BIT)
+
+        for bit in (DOWN_BIT, UP_BIT, RIGHT_BIT, LEFT_BIT):
+            if not moves & bit:
+                continue
+            if bit == DOWN_BIT:
+                point = run_down(current)
+            elif bit == UP_BIT:
+                point = run_up(current)
+            else:
+                point = run_across(current, stride if bit == RIGHT_BIT else -stride)
+            if point == OFF_BOARD:
+                continue
+            distance = point - current
+            point_cost = current_cost + abs(distance if bit & (DOWN_BIT | UP_BIT) else distance // stride)
+            known = cost.get(point)
+            if known is None or point_cost < known:
+                cost[point] = point_cost
+                arrived[point] = bit
+                parent[point] = current
+                closed.discard(point)
+                remaining = estimate(point)
+                heapq.heappush(heap, (point_cost + remaining, point_cost, point))
+                if remaining < closest_estimate:
+                    closest, closest_estimate = point, remaining
+            elif point_cost == known and not arrived[point] & bit:
+                # Equally short from another direction: it may continue that way too
+                arrived[point] |= bit
+                if point in closed:
+                    closed.discard(point)
+                    heapq.heappush(heap, (point_cost + estimate(point), point_cost, point))
+    board.expanded += expanded
+    if budget is not None:
+        budget.spend(expanded - charged)
+    return None
+
+
+def _jump_points(parent: Dict[int, int], start: int, end: int) -> List[int]:
+    points = []
+    while end != start:
+        points.append(end)
+        end = parent[end]
+    points.reverse()
+    return points
+
+
+def path_length(board: Board, start: int, points: List[int]) -> int:
+    """Steps along the straight runs between consecutive jump points."""
+    length = 0
+    for point in points:
+        x, y = divmod(point, board.stride)
+        start_x, start_y = divmod(start, board.stride)
+        length += abs(x - start_x) + abs(y - start_y)
+        start = point
+    return length
+
+
+def jump_first_step(board: Board, target) -> Optional[Direction]:
+    """``Board.first_step`` for a shortest path, found by jump point search."""
+    if board.head == tuple(target):
+        return "UP"
+    start = board.cell(*board.head)
+    goal = board.cell(*target)
+    if start == OFF_BOARD or goal == OFF_BOARD:
+        return None
+    points = jump_point_search(board, start, goal)
+    if not points:
+        return None
+    distance = points[0] - start
+    if distance % board.stride == 0:
+        offset = board.stride if distance > 0 else -board.stride
+    else:
+        offset = 1 if distance > 0 else -1
+    return board.moves[offset]
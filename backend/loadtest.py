@@ -0,0 +1,282 @@
+"""Find how many concurrent games one server keeps up with at a given tick rate.
+
+Usage:
+    python loadtest.py --workers 1 2 4 --games 25 50 100 200 --tick-ms 100
+    python loadtest.py --url http://127.0.0.1:8000 --games 50 --output curves.json
+
+For every worker count, the sweep starts ``uvicorn main:app --workers W``
+(or, with --url, uses a server that is already running) and plays each
+number of concurrent games against it for --duration seconds.
+
+Every game runs ``engine.Game`` on the client: the player steers greedily,
+the snakes grow as they eat, and a new game starts when one ends. Each
+tick posts the AI's board to ``/api/ai-move`` in the compact binary format
+with a game_id, as the frontend does, over a keep-alive connection per
+game. Games take turns through --algorithms and --grid-sizes and start at
+random points of the tick interval.
+
+Ticks are due at a fixed rate, like the frontend's setTimeout loop. A tick
+is missed when its answer arrives after the next tick was due; the game
+then sends its next request as soon as the answer is in. The first
+--warmup seconds of each level aren't counted.
+
+Each level reports moves answered per second, latency percentiles and the
+missed-tick rate. A worker count's capacity is the most games it served
+with p99 latency within the tick and at most --max-missed of ticks missed.
+The games are spread over --clients processes so the load generator
+itself doesn't become the bottleneck; ``send_lag_p99_ms`` (how late the
+client sent ticks that weren't held up by the server) says when it does.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from algorithms import PathfindingAlgorithms
+from board import Board
+from coldstart import free_port, wait_for
+from engine import Game
+from models import AIRequest, GameStateInput, Position
+from wire import COMPACT_BINARY, decode_binary_response, encode_binary
+
+# (seed, grid size, algorithm)
+GameSpec = Tuple[int, int, str]
+
+DEFAULT_ALGORITHMS = ["astar", "bfs", "greedy", "field", "hamiltonian", "dijkstra"]
+
+
+class Connection:
+    """Keep-alive HTTP/1.1 connection for POSTs to one server."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def post(self, path: str, body: bytes) -> Tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: {COMPACT_BINARY}\r\n"
+            f"Accept: {COMPACT_BINARY}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+        return status, await self.reader.readexactly(length)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+def move_body(board: Board, algorithm: str, game_id: str) -> bytes:
+    positions = lambda cells: [Position(x=x, y=y) for x, y in cells]
+    return encode_binary(AIRequest(
+        game_state=GameStateInput(ai_snake=positions(board.ai_snake), player_snake=positions(board.player_snake),
+                                  food=positions(board.food), grid_size=board.grid_size),
+        algorithm=algorithm,
+        game_id=game_id,
+    ))
+
+
+def new_stats() -> Dict:
+    return {"latencies": [], "send_lags": [], "ticks": 0, "missed": 0, "errors": 0, "incomplete": 0,
+            "games": 0, "longest_snake": 0}
+
+
+async def play(spec: GameSpec, address: Tuple[str, int], tick_seconds: float, counted_from: float,
+               stop_at: float, stats: Dict) -> None:
+    """Play games back to back at a fixed tick rate until ``stop_at``."""
+    seed, grid_size, algorithm = spec
+    rng = random.Random(seed)
+    connection = Connection(*address)
+    game, game_id, played = None, "", 0
+    due = time.perf_counter() + rng.random() * tick_seconds
+    held_up = False
+    try:
+        while due < stop_at:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if game is None or game.game_over:
+                game = Game(grid_size, rng)
+                played += 1
+                game_id = f"load-{seed}-{played}"
+                stats["games"] += 1
+            sent = time.perf_counter()
+            board = game.ai_board(PathfindingAlgorithms.greedy_move(game.player_board()))
+            try:
+                status, reply = await connection.post("/api/ai-move", move_body(board, algorithm, game_id))
+                response = decode_binary_response(reply) if status == 200 else None
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                connection.close()
+                response = None
+            answered = time.perf_counter()
+            if response is None or not response.success:
+                stats["errors"] += 1
+                game.advance(board, game.ai_direction)
+            else:
+                game.advance(board, response.direction)
+            next_due = due + tick_seconds
+            if sent >= counted_from:
+                stats["ticks"] += 1
+                stats["latencies"].append(answered - sent)
+                if not held_up:
+                    stats["send_lags"].append(sent - due)
+                if answered > next_due:
+                    stats["missed"] += 1
+                if response is not None and not response.complete:
+                    stats["incomplete"] += 1
+                stats["longest_snake"] = max(stats["longest_snake"], len(game.ai_snake), len(game.player_snake))
+            held_up = answered > next_due
+            due = answered if held_up else next_due
+    finally:
+        connection.close()
+
+
+def run_client(specs: List[GameSpec], address: Tuple[str, int], tick_ms: float, warmup: float,
+               duration: float) -> Dict:
+    """Play ``specs`` concurrently in this process; returns their combined stats."""
+    async def run_all() -> Dict:
+        stats = new_stats()
+        now = time.perf_counter()
+        await asyncio.gather(*(play(spec, address, tick_ms / 1000, now + warmup, now + warmup + duration, stats)
+                               for spec in specs))
+        return stats
+    return asyncio.run(run_all())
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)] if samples else 0.0
+
+
+def run_level(address: Tuple[str, int], games: int, args: argparse.Namespace) -> Dict:
+    """Play ``games`` concurrent games against the server and summarize them."""
+    specs = [(args.seed + index, args.grid_sizes[index % len(args.grid_sizes)],
+              args.algorithms[index % len(args.algorithms)]) for index in range(games)]
+    clients = max(1, min(args.clients, games))
+    with ProcessPoolExecutor(clients) as pool:
+        parts = list(pool.map(run_client, [specs[index::clients] for index in range(clients)],
+                              [address] * clients, [args.tick_ms] * clients, [args.warmup] * clients,
+                              [args.duration] * clients))
+    stats = new_stats()
+    for part in parts:
+        for name, value in part.items():
+            stats[name] = max(stats[name], value) if name == "longest_snake" else stats[name] + value
+    latencies = sorted(seconds * 1000 for seconds in stats["latencies"])
+    send_lags = sorted(seconds * 1000 for seconds in stats["send_lags"])
+    ticks = stats["ticks"]
+    return {
+        "games": games,
+        "moves_per_second": round(ticks / args.duration, 1),
+        "p50_ms": round(percentile(latencies, 0.5), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "missed_rate": round(stats["missed"] / ticks, 4) if ticks else 0.0,
+        "error_rate": round(stats["errors"] / ticks, 4) if ticks else 0.0,
+        "incomplete_rate": round(stats["incomplete"] / ticks, 4) if ticks else 0.0,
+        "send_lag_p99_ms": round(percentile(send_lags, 0.99), 2),
+        "games_played": stats["games"],
+        "longest_snake": stats["longest_snake"],
+    }
+
+
+def start_server(workers: int, timeout: float) -> Tuple[subprocess.Popen, int]:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(f"http://127.0.0.1:{port}/api/ready", time.perf_counter(), timeout)
+    except TimeoutError:
+        server.terminate()
+        raise
+    return server, port
+
+
+def capacity(levels: List[Dict], tick_ms: float, max_missed: float) -> int:
+    """Most games served with p99 within the tick and few enough missed ticks."""
+    return max((level["games"] for level in levels
+                if level["p99_ms"] <= tick_ms and level["missed_rate"] <= max_missed), default=0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test /api/ai-move with concurrent simulated games.")
+    parser.add_argument("--games", type=int, nargs="+", default=[10, 25, 50, 100, 200],
+                        help="concurrent games at each level of the sweep")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1],
+                        help="uvicorn worker processes to sweep (ignored with --url)")
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--tick-ms", type=float, default=100.0, help="tick interval of every game (50-300)")
+    parser.add_argument("--algorithms", default=",".join(DEFAULT_ALGORITHMS),
+                        help="comma-separated algorithms, assigned to games in turn")
+    parser.add_argument("--grid-sizes", type=int, nargs="+", default=[20, 30, 40])
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds at the start of a level")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="client processes the games are spread over")
+    parser.add_argument("--max-missed", type=float, default=0.01,
+                        help="missed-tick rate still counted as keeping up")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for a server to be ready")
+    parser.add_argument("--output", help="write the capacity curves to this JSON file")
+    args = parser.parse_args(argv)
+    args.algorithms = [name.strip() for name in args.algorithms.split(",") if name.strip()]
+
+    curves: Dict[str, List[Dict]] = {}
+    print(f"{'workers':>7} {'games':>6} {'moves/s':>9} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} "
+          f"{'missed':>7} {'errors':>7} {'sendlag':>8}")
+    for workers in ([None] if args.url else args.workers):
+        server = None
+        if args.url:
+            parts = urlsplit(args.url)
+            address = (parts.hostname, parts.port or 80)
+        else:
+            server, port = start_server(workers, args.timeout)
+            address = ("127.0.0.1", port)
+        label = "external" if workers is None else str(workers)
+        try:
+            levels = curves[label] = []
+            for games in args.games:
+                level = run_level(address, games, args)
+                levels.append(level)
+                print(f"{label:>7} {games:>6} {level['moves_per_second']:>9.1f} {level['p50_ms']:>8.2f} "
+                      f"{level['p95_ms']:>8.2f} {level['p99_ms']:>8.2f} {level['missed_rate']:>7.2%} "
+                      f"{level['error_rate']:>7.2%} {level['send_lag_p99_ms']:>8.2f}")
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    capacities = {label: capacity(levels, args.tick_ms, args.max_missed) for label, levels in curves.items()}
+    for label, games in capacities.items():
+        print(f"capacity at {args.tick_ms:g}ms ticks with {label} worker(s): {games} games")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"tick_ms": args.tick_ms, "algorithms": args.algorithms, "grid_sizes": args.grid_sizes,
+                       "duration": args.duration, "max_missed": args.max_missed,
+                       "curves": curves, "capacity": capacities}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,71 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+import asyncio
 import logging
-from models import AIRequest, AIResponse, Direction
-from algorithms import PathfindingAlgorithms
+import os
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+from pydantic import ValidationError
+from models import (AIRequest, AIResponse, BatchAIRequest, BatchAIResponse, Direction, RoomInput,
+                    RoomRequest, SpeculativeAIRequest, SpeculativeAIResponse, TickDelta)
+import algorithms
+from algorithms import ALGORITHM_MAP, PathfindingAlgorithms
+from board import Board, Budget
+from jps import LARGE_GRID_SIZE
+from sessions import SessionStore
+from channel import GameChannel
+from metrics import Metrics
+from profiler import SamplingProfiler
+from movecache import MoveCache, board_hash
+from executor import MoveExecutor, Overloaded, run_search
+from movetrace import TraceRecorder
+from rooms import Room, RoomLimit, RoomScheduler
+from warmup import GRID_SIZES, Readiness, precompute, synthetic_requests
+from wire import (COMPACT_BINARY, COMPACT_JSON, MoveRequest, decode_binary,
+                  decode_compact_json, encode_binary_response)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up off the event loop, so /api/health answers while it runs
+    if WARMUP_ENABLED:
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+    else:
+        readiness.mark_warm()
+    yield
+    await rooms.stop()
+    executor.shutdown()
+    if recorder is not None:
+        recorder.close()
+
 app = FastAPI(
     title="Snake AI Arena Backend",
     description="AI algorithms for Snake game pathfinding",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+class RequestTimer:
+    """Stamp each HTTP request with its arrival time, so handlers can tell
+    how long reading and validating the body took."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope["snake.received_at"] = time.perf_counter()
+        await self.app(scope, receive, send)
+
+app.add_middleware(RequestTimer)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,15 +75,214 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Algorithm mapping
-ALGORITHM_MAP = {
-    "random": PathfindingAlgorithms.random_move,
-    "greedy": PathfindingAlgorithms.greedy_move,
-    "bfs": PathfindingAlgorithms.bfs_move,
-    "dfs": PathfindingAlgorithms.dfs_move,
-    "dijkstra": PathfindingAlgorithms.dijkstra_move,
-    "astar": PathfindingAlgorithms.astar_move,
-}
+# Algorithms whose move is the first step of a shortest path; these can reuse
+# a game's plan between ticks when the client sends a game_id
+INCREMENTAL_ALGORITHMS = {"bfs", "dijkstra", "astar"}
+
+def uses_plan(board: Board, algorithm: str, game_id: Optional[str]) -> bool:
+    """Whether the move comes from the game's incremental plan. Large grids use
+    jump point search instead, which needs no per-game arrays the size of the board."""
+    return bool(game_id) and algorithm in INCREMENTAL_ALGORITHMS and board.grid_size < LARGE_GRID_SIZE
+
+# Algorithms whose move isn't a function of the board alone, so never cached
+UNCACHED_ALGORITHMS = {"random"}
+
+# Whether moves are checked for dead-end pockets when a request doesn't say
+AVOID_TRAPS = os.environ.get("SNAKE_AVOID_TRAPS", "0") == "1"
+
+# Per-move search limits for requests that don't set their own; unset means unlimited
+DEFAULT_TIME_BUDGET_MS = float(os.environ.get("SNAKE_TIME_BUDGET_MS", "0")) or None
+DEFAULT_NODE_BUDGET = int(os.environ.get("SNAKE_NODE_BUDGET", "0")) or None
+
+# Where searches run: "inline" on the event loop, or a "thread" or "process" pool
+# of SNAKE_WORKERS workers with at most SNAKE_MAX_PENDING moves queued or running
+EXECUTOR_MODE = os.environ.get("SNAKE_EXECUTOR", "inline")
+
+# Algorithms cheap enough to always run on the event loop
+INLINE_ALGORITHMS = {"random", "greedy"}
+
+# Time from a request's arrival to its answer; past it, the search stops and
+# a pooled one is abandoned. Unset means no deadline
+REQUEST_DEADLINE_MS = float(os.environ.get("SNAKE_REQUEST_DEADLINE_MS", "0")) or None
+
+# How long past the deadline to wait for a pooled search to stop on its own
+DEADLINE_GRACE_SECONDS = 0.005
+
+# Whether the server precomputes tables and runs synthetic moves at startup
+# before /api/ready reports ready
+WARMUP_ENABLED = os.environ.get("SNAKE_WARMUP", "1") == "1"
+
+# The sampling profiler can only be switched on when this is set
+PROFILER_ENABLED = os.environ.get("SNAKE_PROFILER", "0") == "1"
+
+# Directory to record every move into an append-only binary trace (see movetrace.py)
+TRACE_DIR = os.environ.get("SNAKE_TRACE_DIR")
+
+readiness = Readiness()
+metrics = Metrics()
+profiler = SamplingProfiler()
+
+# Moves already computed for identical boards; a size of 0 turns the cache off
+move_cache = MoveCache(max_entries=int(os.environ.get("SNAKE_MOVE_CACHE_SIZE", "4096")))
+
+executor = MoveExecutor(
+    EXECUTOR_MODE,
+    workers=int(os.environ.get("SNAKE_WORKERS", "0")) or None,
+    max_pending=int(os.environ.get("SNAKE_MAX_PENDING", "0")) or None,
+)
+
+recorder = None
+if TRACE_DIR:
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    recorder = TraceRecorder(os.path.join(TRACE_DIR, f"trace-{int(time.time())}-{os.getpid()}.bin"))
+    logger.info(f"Recording moves to {recorder.path}")
+
+def record_move(board: Board, algorithm: str, game_id: Optional[str], avoid_traps: Optional[bool],
+                direction: Direction, started: float) -> None:
+    """Queue the move for the trace, if one is being recorded."""
+    if recorder is not None:
+        recorder.record(game_id, board, algorithm, direction, AVOID_TRAPS if avoid_traps is None else avoid_traps,
+                        not board.limited, int((time.perf_counter() - started) * 1e6))
+
+sessions = SessionStore(
+    max_sessions=int(os.environ.get("SNAKE_SESSION_LIMIT", "256")),
+    idle_seconds=float(os.environ.get("SNAKE_SESSION_IDLE_SECONDS", "300")),
+)
+
+async def decide_room_move(room: Room, board: Board, next_tick: float) -> Direction:
+    """AI move for a server-run room; the search must be done by its next tick."""
+    board.budget = make_budget(None, None, next_tick)
+    started = time.perf_counter()
+    direction = await offload_move(board, room.algorithm, room.id, room.avoid_traps, next_tick)
+    record_move(board, room.algorithm, room.id, room.avoid_traps, direction, started)
+    return direction
+
+# Games run by the server (see rooms.py); rooms without subscribers for
+# SNAKE_ROOM_IDLE_SECONDS make way for new ones once SNAKE_MAX_ROOMS are open
+rooms = RoomScheduler(
+    decide_room_move,
+    max_rooms=int(os.environ.get("SNAKE_MAX_ROOMS", "500")),
+    idle_seconds=float(os.environ.get("SNAKE_ROOM_IDLE_SECONDS", "60")),
+    on_tick=metrics.observe_tick,
+)
+
+def compute_move(board: Board, algorithm: str, game_id: Optional[str] = None,
+                 avoid_traps: Optional[bool] = None) -> Direction:
+    """Run the selected algorithm on a compiled board and make sure the move is safe."""
+    started = time.perf_counter()
+    # Calculate the next move
+    if uses_plan(board, algorithm, game_id):
+        # The plan keeps to cells that are free now; when that finds nothing,
+        # the algorithm's own search may still get through cells tails will leave
+        direction = sessions.next_move(game_id, board) or cached_move(board, algorithm)
+    else:
+        direction = cached_move(board, algorithm)
+    return finish_move(board, algorithm, direction, avoid_traps, started)
+
+def finish_move(board: Board, algorithm: str, direction: Direction, avoid_traps: Optional[bool],
+                started: float) -> Direction:
+    """Make sure a chosen move is safe and record how it was computed."""
+    direction = ensure_safe(board, direction, avoid_traps)
+    metrics.observe_move(algorithm, time.perf_counter() - started, board.expanded,
+                         board.fallbacks, board.limited)
+    return direction
+
+def lookup_move(board: Board, algorithm: str) -> Tuple[Optional[int], Optional[Direction]]:
+    """Cache key of a board (None if it can't be cached) and its cached move, if any."""
+    if algorithm in UNCACHED_ALGORITHMS or move_cache.max_entries <= 0 or not MoveCache.cacheable(board):
+        return None, None
+    key = board_hash(board, algorithm)
+    direction = move_cache.get(key)
+    metrics.count_cache("hit" if direction else "miss")
+    return key, direction
+
+def store_move(key: Optional[int], board: Board, direction: Direction) -> None:
+    # A move cut short by its budget is only a best guess for this board
+    if key is not None and not board.limited:
+        move_cache.put(key, direction)
+
+def cached_move(board: Board, algorithm: str) -> Direction:
+    """Run the algorithm, or return the move it chose earlier on an identical board."""
+    key, direction = lookup_move(board, algorithm)
+    if direction is None:
+        direction = ALGORITHM_MAP[algorithm](board)
+        store_move(key, board, direction)
+    return direction
+
+async def offload_move(board: Board, algorithm: str, game_id: Optional[str] = None,
+                       avoid_traps: Optional[bool] = None, deadline: Optional[float] = None) -> Direction:
+    """compute_move with the search on the configured execution backend.
+
+    Cheap algorithms, cache hits and incremental plans are answered on the
+    event loop. If the pool is full or the search misses ``deadline`` (a
+    perf_counter time), a quick greedy move is returned instead.
+    """
+    if (executor.mode == "inline" or algorithm in INLINE_ALGORITHMS
+            or uses_plan(board, algorithm, game_id)):
+        return compute_move(board, algorithm, game_id, avoid_traps)
+    started = time.perf_counter()
+    key, direction = lookup_move(board, algorithm)
+    if direction is None:
+        timeout = None if deadline is None else max(deadline - started, 0) + DEADLINE_GRACE_SECONDS
+        try:
+            # A process pool searches a copy of the board, so copy back what it did
+            direction, board.expanded, board.fallbacks, limited = await executor.run(
+                run_search, ALGORITHM_MAP[algorithm], board, timeout=timeout)
+        except (Overloaded, asyncio.TimeoutError) as e:
+            reason = "overloaded" if isinstance(e, Overloaded) else "deadline"
+            logger.warning(f"Shedding {algorithm} move ({reason}), answering with a quick move")
+            metrics.count_shed(reason)
+            return quick_move(board)
+        if limited and board.budget is not None:
+            board.budget.exhausted = True
+        store_move(key, board, direction)
+    return finish_move(board, algorithm, direction, avoid_traps, started)
+
+def quick_move(board: Board) -> Direction:
+    """A safe move that costs next to nothing, for requests that can't wait for a search."""
+    board.budget = Budget()
+    board.budget.exhausted = True  # Reported as incomplete
+    return ensure_safe(board, PathfindingAlgorithms.greedy_move(board), avoid_traps=False)
+
+def make_budget(time_budget_ms: Optional[float], node_budget: Optional[int],
+                deadline: Optional[float] = None) -> Optional[Budget]:
+    """Search budget for one move; the clock starts now. The search also
+    stops at ``deadline``, a perf_counter time, if one is given."""
+    time_budget_ms = time_budget_ms or DEFAULT_TIME_BUDGET_MS
+    node_budget = node_budget or DEFAULT_NODE_BUDGET
+    seconds = time_budget_ms / 1000 if time_budget_ms else None
+    if deadline is not None:
+        remaining = max(deadline - time.perf_counter(), 0.0)
+        seconds = remaining if seconds is None else min(seconds, remaining)
+    if seconds is None and node_budget is None:
+        return None
+    return Budget(seconds, node_budget)
+
+def request_deadline(received_at: Optional[float]) -> Optional[float]:
+    """When a request that arrived at ``received_at`` must be answered by."""
+    if REQUEST_DEADLINE_MS is None:
+        return None
+    return (received_at or time.perf_counter()) + REQUEST_DEADLINE_MS / 1000
+
+def parse_seconds(http_request: Request) -> float:
+    """Time since the request arrived, measured on entry to the handler."""
+    received_at = http_request.scope.get("snake.received_at")
+    return time.perf_counter() - received_at if received_at else 0.0
+
+def report_override(reason: str, direction: Direction, replacement: Direction) -> None:
+    """Log and count a move the safety check replaced."""
+    if reason == "unsafe":
+        logger.warning(f"AI direction {direction} not safe, using safe direction instead")
+    elif reason == "no_safe_move":
+        logger.warning("No safe directions available for AI!")
+    else:
+        logger.info(f"AI direction {direction} leads into a dead end, using {replacement} instead")
+    metrics.count_override(reason)
+
+def ensure_safe(board: Board, direction: Direction, avoid_traps: Optional[bool] = None) -> Direction:
+    """algorithms.ensure_safe with the server's trap default, logging and metrics."""
+    return algorithms.ensure_safe(board, direction, AVOID_TRAPS if avoid_traps is None else avoid_traps,
+                                  on_override=report_override)
 
 @app.get("/")
 async def root():
@@ -44,15 +294,79 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "message": "AI Backend is running"}
 
-@app.post("/api/ai-move", response_model=AIResponse)
-async def get_ai_move(request: AIRequest):
+@app.get("/api/ready")
+async def readiness_check():
+    """
+    Readiness endpoint: 503 until the startup warm-up has finished, then 200.
+
+    Unlike /api/health, which answers as soon as the process is up, this
+    says whether the first moves will be served at full speed. Both report
+    how long warming up and the first answered move took.
+    """
+    return JSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
+
+def warm_up() -> None:
+    """Build the per-grid tables and run a synthetic request in every body
+    format and every algorithm through the move path, then mark the server
+    ready. Metrics, the move cache and sessions are left untouched."""
+    started = time.perf_counter()
+    try:
+        precompute()
+        for grid_size in GRID_SIZES:
+            for algorithm in ALGORITHM_MAP:
+                for content_type, body in synthetic_requests(grid_size, algorithm).items():
+                    board = read_move_request(body, content_type).board
+                # Enough to run every search, not to finish the slow ones
+                board.budget = Budget(0.005)
+                direction = ALGORITHM_MAP[algorithm](board)
+                board.safe_directions(*board.head)
+                response = AIResponse(direction=direction, success=True, complete=not board.limited)
+                response.model_dump_json()
+                encode_binary_response(response)
+        logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f}ms")
+    except Exception as e:
+        # A failed warm-up only costs speed; the server still answers
+        logger.error(f"Warm-up failed: {str(e)}")
+        readiness.error = str(e)
+    readiness.mark_warm()
+
+def read_move_request(body: bytes, content_type: str) -> MoveRequest:
+    """Decode a move request body in whichever format its Content-Type names."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in (COMPACT_JSON, COMPACT_BINARY):
+        decode = decode_compact_json if media_type == COMPACT_JSON else decode_binary
+        try:
+            return decode(body)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    try:
+        return MoveRequest.from_ai_request(AIRequest.model_validate_json(body))
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+@app.post("/api/ai-move", response_model=AIResponse, openapi_extra={"requestBody": {
+    "required": True,
+    "content": {
+        "application/json": {"schema": {"$ref": "#/components/schemas/AIRequest"}},
+        COMPACT_JSON: {"schema": {"type": "object"}},
+        COMPACT_BINARY: {"schema": {"type": "string", "format": "binary"}},
+    },
+}})
+async def get_ai_move(http_request: Request):
     """
     Get the next move for the AI snake based on the selected algorithm.
+
+    Accepts an AIRequest as JSON or in one of the compact formats of wire.py,
+    chosen by Content-Type; answers in binary if the Accept header asks for it.
     """
+    request = read_move_request(await http_request.body(), http_request.headers.get("content-type", ""))
+    metrics.observe_parse("ai-move", parse_seconds(http_request))
     try:
+        # The board is compiled while decoding; the algorithm and the safety check share it
+        board = request.board
         logger.info(f"Processing AI move request with algorithm: {request.algorithm}")
-        logger.info(f"AI snake head: ({request.game_state.ai_snake[0].x}, {request.game_state.ai_snake[0].y})")
-        logger.info(f"Grid size: {request.game_state.grid_size}")
+        logger.info(f"AI snake head: {board.head}")
+        logger.info(f"Grid size: {board.grid_size}")
         
         # Validate algorithm
         if request.algorithm not in ALGORITHM_MAP:
@@ -61,46 +375,300 @@ async def get_ai_move(request: AIRequest):
                 detail=f"Unknown algorithm: {request.algorithm}"
             )
         
-        # Get the algorithm function
-        algorithm_func = ALGORITHM_MAP[request.algorithm]
-        
-        # Calculate the next move
-        direction = algorithm_func(request.game_state)
-        
-        # Safety check: ensure the direction won't cause immediate collision
-        head = request.game_state.ai_snake[0]
-        obstacles = set()
-        for pos in request.game_state.ai_snake[:-1]:
-            obstacles.add((pos.x, pos.y))
-        for pos in request.game_state.player_snake:
-            obstacles.add((pos.x, pos.y))
-        
-        # Get safe directions
-        safe_directions = PathfindingAlgorithms.get_safe_directions(head, request.game_state.grid_size, obstacles)
-        
-        # If the calculated direction is not safe, use a safe one
-        if direction not in safe_directions and safe_directions:
-            logger.warning(f"AI direction {direction} not safe, using safe direction instead")
-            direction = safe_directions[0]
-        elif not safe_directions:
-            logger.warning("No safe directions available for AI!")
-            # Keep the calculated direction as a last resort
+        deadline = request_deadline(http_request.scope.get("snake.received_at"))
+        board.budget = make_budget(request.time_budget_ms, request.node_budget, deadline)
+        started = time.perf_counter()
+        direction = await offload_move(board, request.algorithm, request.game_id,
+                                       request.avoid_traps, deadline)
+        record_move(board, request.algorithm, request.game_id, request.avoid_traps, direction, started)
         
         logger.info(f"Final AI move: {direction}")
         
-        return AIResponse(
+        response = AIResponse(
             direction=direction,
-            success=True
+            success=True,
+            complete=not board.limited
         )
+        readiness.mark_move()
         
     except Exception as e:
         logger.error(f"Error processing AI move: {str(e)}")
-        return AIResponse(
+        metrics.count_error("ai-move")
+        response = AIResponse(
             direction="UP",  # Fallback direction
             success=False,
             error=str(e)
         )
 
+    if COMPACT_BINARY in http_request.headers.get("accept", ""):
+        return Response(encode_binary_response(response), media_type=COMPACT_BINARY)
+    return response
+
+@app.post("/api/ai-move/batch", response_model=BatchAIResponse)
+async def get_ai_moves(batch: BatchAIRequest, http_request: Request):
+    """
+    Get the next move for many games in one request.
+
+    BFS and Dijkstra games on boards of the same size are searched together
+    with a vectorized wavefront. The rest are answered like /api/ai-move
+    requests, on the execution backend and within the request deadline.
+    """
+    # Imported here: NumPy is a large part of the server's import time
+    from batch import VECTORIZED_ALGORITHMS, wavefront_moves
+    metrics.observe_parse("ai-move-batch", parse_seconds(http_request))
+    logger.info(f"Processing batch of {len(batch.requests)} AI move requests")
+    responses: List[Optional[AIResponse]] = [None] * len(batch.requests)
+    boards: List[Optional[Board]] = [None] * len(batch.requests)
+    groups: "defaultdict[Tuple[str, int], List[int]]" = defaultdict(list)
+    
+    def failed(index: int, e: Exception) -> AIResponse:
+        logger.error(f"Error processing AI move {index} of batch: {str(e)}")
+        metrics.count_error("ai-move-batch")
+        return AIResponse(direction="UP", success=False, error=str(e))
+
+    deadline = request_deadline(http_request.scope.get("snake.received_at"))
+
+    async def single_move(index: int, request: AIRequest, board: Board) -> None:
+        """One game's move the way /api/ai-move answers it."""
+        try:
+            board.budget = make_budget(request.time_budget_ms, request.node_budget, deadline)
+            started = time.perf_counter()
+            direction = await offload_move(board, request.algorithm, request.game_id,
+                                           request.avoid_traps, deadline)
+            record_move(board, request.algorithm, request.game_id, request.avoid_traps, direction, started)
+            responses[index] = AIResponse(direction=direction, success=True, complete=not board.limited)
+        except Exception as e:
+            responses[index] = failed(index, e)
+
+    singles = []
+    for index, request in enumerate(batch.requests):
+        try:
+            if not request.game_state.ai_snake:
+                raise ValueError("AI snake is empty")
+            board = Board.from_game_state(request.game_state)
+            boards[index] = board
+            # The wavefront always runs to completion, so budgeted moves go one by one;
+            # on large grids a jump point search per board beats sweeping whole boards
+            if (request.algorithm in VECTORIZED_ALGORITHMS and not request.game_id
+                    and make_budget(request.time_budget_ms, request.node_budget) is None
+                    and board.grid_size < LARGE_GRID_SIZE):
+                groups[(request.algorithm, board.grid_size)].append(index)
+            else:
+                singles.append(single_move(index, request, board))
+        except Exception as e:
+            responses[index] = failed(index, e)
+    # Searches that go to the worker pool run side by side
+    await asyncio.gather(*singles)
+    
+    for (algorithm, _), indexes in groups.items():
+        group_boards = [boards[index] for index in indexes]
+        started = time.perf_counter()
+        try:
+            directions = wavefront_moves(group_boards, algorithm)
+            metrics.observe_batch(algorithm, time.perf_counter() - started)
+        except Exception as e:
+            logger.error(f"Error processing {algorithm} batch: {str(e)}")
+            directions = [ALGORITHM_MAP[algorithm](board) for board in group_boards]
+        # Each move is charged an equal share of the group's search
+        share = (time.perf_counter() - started) / len(indexes)
+        for index, board, direction in zip(indexes, group_boards, directions):
+            request = batch.requests[index]
+            # No path found, head for any food that can be reached
+            direction = direction or PathfindingAlgorithms.fallback_move(board)
+            direction = ensure_safe(board, direction, request.avoid_traps)
+            metrics.observe_move(algorithm, share, board.expanded, board.fallbacks, board.limited)
+            record_move(board, algorithm, request.game_id, request.avoid_traps, direction,
+                        time.perf_counter() - share)
+            responses[index] = AIResponse(direction=direction, success=True, complete=not board.limited)
+    
+    return BatchAIResponse(responses=responses)
+
+@app.post("/api/ai-move/speculative", response_model=SpeculativeAIResponse)
+async def get_speculative_ai_moves(request: SpeculativeAIRequest, http_request: Request):
+    """
+    Get the AI's answer to every move the player can make next.
+
+    The game state is the one before the player moves, so a client can ask
+    for the next tick's table in the background and look its answer up the
+    moment the player's move is known. Only the compiling is shared: both
+    snakes are compiled once for all the candidate boards, but each candidate
+    is still a full search of its own, so this costs up to three searches.
+    Each answer is cached like an /api/ai-move answer for the same board.
+    With a thread or process pool the candidates are searched in parallel.
+    """
+    metrics.observe_parse("ai-move-speculative", parse_seconds(http_request))
+    try:
+        state = request.game_state
+        if not state.ai_snake or not state.player_snake:
+            raise ValueError("Both snakes need at least one segment")
+        deadline = request_deadline(http_request.scope.get("snake.received_at"))
+        boards = Board.after_player_moves(state)
+        for board in boards.values():
+            board.budget = make_budget(request.time_budget_ms, request.node_budget, deadline)
+        # No game_id: the game's plan follows the moves actually played. Not
+        # traced either, since at most one of the candidates is ever played
+        directions = await asyncio.gather(*(
+            offload_move(board, request.algorithm, None, request.avoid_traps, deadline)
+            for board in boards.values()))
+        response = SpeculativeAIResponse(moves=dict(zip(boards, directions)), success=True,
+                                         complete=not any(board.limited for board in boards.values()))
+        readiness.mark_move()
+    except Exception as e:
+        logger.error(f"Error processing speculative AI moves: {str(e)}")
+        metrics.count_error("ai-move-speculative")
+        response = SpeculativeAIResponse(success=False, error=str(e))
+    return response
+
+@app.websocket("/api/ws")
+async def game_channel(websocket: WebSocket):
+    """
+    Persistent game channel. The client sends the full state once
+    ({"type": "start", "game_state": ..., "algorithm": ...}) and then one
+    TickDelta per tick; every message is answered with the AI direction.
+    """
+    await websocket.accept()
+    channel = None
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+                if not isinstance(message, dict):
+                    raise ValueError("Expected a JSON object")
+                if message.get("type") == "start":
+                    if channel:
+                        sessions.discard(channel.game_id)
+                    channel = GameChannel(AIRequest.model_validate(message))
+                elif channel is None:
+                    raise ValueError("Send a start message first")
+                else:
+                    channel.apply(TickDelta.model_validate(message))
+                deadline = request_deadline(time.perf_counter())
+                board = channel.board()
+                board.budget = make_budget(channel.time_budget_ms, channel.node_budget, deadline)
+                started = time.perf_counter()
+                direction = await offload_move(board, channel.algorithm, channel.game_id,
+                                               channel.avoid_traps, deadline)
+                record_move(board, channel.algorithm, channel.game_id, channel.avoid_traps, direction, started)
+                await websocket.send_json(channel.reply(direction, not board.limited))
+                readiness.mark_move()
+            except (ValidationError, ValueError, IndexError) as e:
+                logger.error(f"Error processing channel message: {str(e)}")
+                metrics.count_error("ws")
+                await websocket.send_json({"error": str(e), "tick": channel.tick if channel else 0})
+    except WebSocketDisconnect:
+        if channel:
+            sessions.discard(channel.game_id)
+
+@app.post("/api/rooms")
+async def create_room(request: RoomRequest):
+    """Open a room for the server to run; the game starts when a client joins it."""
+    try:
+        room = rooms.create(request.grid_size, request.algorithm, request.tick_ms, request.avoid_traps)
+    except RoomLimit as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    logger.info(f"Opened room {room.id} ({request.algorithm}, {request.tick_ms}ms ticks)")
+    return room.stats()
+
+@app.get("/api/rooms")
+async def list_rooms():
+    """Every open room with its tick count and how late its ticks start."""
+    return {"rooms": [room.stats() for room in rooms.rooms.values()], "max_rooms": rooms.max_rooms}
+
+def require_room(room_id: str) -> Room:
+    room = rooms.get(room_id)
+    if room is None:
+        raise HTTPException(status_code=404, detail=f"Unknown room: {room_id}")
+    return room
+
+@app.get("/api/rooms/{room_id}")
+async def get_room(room_id: str):
+    """A room's statistics and current state."""
+    room = require_room(room_id)
+    return {**room.stats(), "state": room.state()}
+
+@app.delete("/api/rooms/{room_id}")
+async def close_room(room_id: str):
+    """Stop a room's game and disconnect its subscribers."""
+    require_room(room_id)
+    rooms.close(room_id)
+    sessions.discard(room_id)
+    return {"room_id": room_id, "closed": True}
+
+@app.websocket("/api/rooms/{room_id}/ws")
+async def room_channel(websocket: WebSocket, room_id: str):
+    """
+    Join a server-run room. The server sends the room's state on joining and
+    after every tick ({"type": "state", ...}); the client only sends the
+    player's turns ({"direction": "UP"}), which apply from the next tick.
+    """
+    await websocket.accept()
+    room = rooms.get(room_id)
+    if room is None:
+        await websocket.send_json({"error": f"Unknown room: {room_id}"})
+        await websocket.close(code=4404)
+        return
+    queue = rooms.join(room)
+
+    async def forward_states():
+        while True:
+            message = await queue.get()
+            await websocket.send_json(message)
+            if message["type"] == "closed":
+                await websocket.close()
+                return
+
+    sender = asyncio.create_task(forward_states())
+    try:
+        while True:
+            try:
+                room.steer(RoomInput.model_validate(await websocket.receive_json()).direction)
+            except (ValidationError, ValueError) as e:
+                logger.error(f"Error processing room input: {str(e)}")
+                metrics.count_error("room-ws")
+                await websocket.send_json({"error": str(e), "tick": room.game.ticks})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        room.unsubscribe(queue)
+        sender.cancel()
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Counters and latency histograms in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/cache")
+async def get_cache_stats():
+    """Size and hit/miss counts of the move cache."""
+    return move_cache.stats()
+
+def require_profiler():
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiler is disabled; start the server with SNAKE_PROFILER=1")
+
+@app.post("/api/profiler/start")
+async def start_profiler(interval_ms: float = 5.0):
+    """Start the sampling profiler, discarding earlier samples."""
+    require_profiler()
+    if not 0.5 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="interval_ms must be between 0.5 and 1000")
+    # Starting joins a running sampler thread first; don't block the event loop on it
+    await asyncio.to_thread(profiler.start, interval_ms / 1000)
+    return profiler.status()
+
+@app.post("/api/profiler/stop")
+async def stop_profiler():
+    """Stop the sampling profiler; its samples stay available."""
+    require_profiler()
+    await asyncio.to_thread(profiler.stop)
+    return profiler.status()
+
+@app.get("/api/profiler", response_class=PlainTextResponse)
+async def get_profile():
+    """Samples so far as collapsed stacks, for flamegraph.pl or speedscope."""
+    require_profiler()
+    return PlainTextResponse(profiler.collapsed())
+
 @app.get("/api/algorithms")
 async def get_available_algorithms():
     """Get list of available AI algorithms."""
@@ -141,6 +709,24 @@ async def get_available_algorithms():
                 "name": "A* Search",
                 "description": "Heuristic-based optimal pathfinding",
                 "difficulty": "Expert"
+            },
+            {
+                "id": "field",
+                "name": "Distance Field",
+                "description": "Heads for whichever food is truly nearest",
+                "difficulty": "Hard"
+            },
+            {
+                "id": "hamiltonian",
+                "name": "Hamiltonian Cycle",
+                "description": "Follows a cycle over the whole grid, taking safe shortcuts to food",
+                "difficulty": "Expert"
+            },
+            {
+                "id": "minimax",
+                "name": "Minimax",
+                "description": "Searches both snakes' moves a few ticks ahead with alpha-beta pruning",
+                "difficulty": "Expert+"
             }
         ]
     }
@@ -0,0 +1,160 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Only counters and histograms are needed, so they are implemented here
+rather than pulling in a client library. Every update takes one lock and
+touches a handful of ints.
+"""
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Latency buckets in seconds: 50us up to 1s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Cells expanded per move
+EXPANSION_BUCKETS = (0, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 40000)
+
+
+def format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(labels)} {format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (plus +Inf), sum]
+        self.series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else format_value(bound)
+                lines.append(f"{self.name}_bucket{format_labels(labels, (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {format_value(total[0])}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """The server's counters and histograms."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.move_seconds = Histogram(
+            "snake_move_seconds", "Time to compute one AI move, including the safety check",
+            LATENCY_BUCKETS)
+        self.parse_seconds = Histogram(
+            "snake_request_parse_seconds", "Time to read and validate a request body",
+            LATENCY_BUCKETS)
+        self.batch_seconds = Histogram(
+            "snake_batch_search_seconds", "Time for one vectorized batch search",
+            LATENCY_BUCKETS)
+        self.expansions = Histogram(
+            "snake_nodes_expanded", "Cells expanded by the searches for one AI move",
+            EXPANSION_BUCKETS)
+        self.moves = Counter("snake_moves_total", "AI moves computed")
+        self.fallbacks = Counter(
+            "snake_fallbacks_total", "Moves where the algorithm's search failed and a fallback chose")
+        self.limited = Counter(
+            "snake_budget_limited_total", "Moves cut short by their time or node budget")
+        self.overrides = Counter(
+            "snake_safety_overrides_total", "Moves changed or flagged by the safety check")
+        self.errors = Counter("snake_errors_total", "Requests that failed")
+        self.shed = Counter(
+            "snake_shed_total", "Moves answered without a search because the pool was full or the deadline passed")
+        self.cache = Counter("snake_move_cache_total", "Move cache lookups by result")
+        self.tick_lag = Histogram(
+            "snake_room_tick_lag_seconds", "How late a server-run room's tick started", LATENCY_BUCKETS)
+        self.missed_ticks = Counter(
+            "snake_room_missed_ticks_total", "Room ticks skipped because the scheduler fell a whole tick behind")
+
+    def observe_move(self, algorithm: str, seconds: float, expanded: int, fallbacks: int,
+                     limited: bool = False) -> None:
+        labels = (("algorithm", algorithm),)
+        with self.lock:
+            self.moves.inc(labels)
+            self.move_seconds.observe(seconds, labels)
+            self.expansions.observe(expanded, labels)
+            if fallbacks:
+                self.fallbacks.inc(labels, fallbacks)
+            if limited:
+                self.limited.inc(labels)
+
+    def observe_parse(self, endpoint: str, seconds: float) -> None:
+        with self.lock:
+            self.parse_seconds.observe(seconds, (("endpoint", endpoint),))
+
+    def observe_batch(self, algorithm: str, seconds: float) -> None:
+        with self.lock:
+            self.batch_seconds.observe(seconds, (("algorithm", algorithm),))
+
+    def observe_tick(self, lag: float, skipped: int) -> None:
+        with self.lock:
+            self.tick_lag.observe(lag)
+            if skipped:
+                self.missed_ticks.inc((), skipped)
+
+    def count_override(self, reason: str) -> None:
+        with self.lock:
+            self.overrides.inc((("reason", reason),))
+
+    def count_shed(self, reason: str) -> None:
+        with self.lock:
+            self.shed.inc((("reason", reason),))
+
+    def count_cache(self, result: str) -> None:
+        with self.lock:
+            self.cache.inc((("result", result),))
+
+    def count_error(self, endpoint: str) -> None:
+        with self.lock:
+            self.errors.inc((("endpoint", endpoint),))
+
+    def render(self) -> str:
+        with self.lock:
+            lines = []
+            for metric in (self.moves, self.move_seconds, self.expansions, self.fallbacks,
+                           self.limited, self.overrides, self.shed, self.cache, self.parse_seconds, self.batch_seconds, self.tick_lag, self.missed_ticks,
+                           self.errors):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
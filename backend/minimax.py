@@ -0,0 +1,327 @@
+"""Adversarial lookahead over both snakes' moves.
+
+Ticks follow ``engine.Game``: the board the AI decides on already has this
+tick's player move, so the AI moves (max), the tick is settled, then the
+player makes the next tick's move (min), and so on. Settling uses the
+collision rules of ``useGameLogic``: a head that ends up on a wall or on
+either body dies, and two heads meeting on one cell is a tie; only then
+does a snake on food eat it and grow by repeating its tail. No new food
+appears inside the search.
+
+The search deepens one AI move at a time until it has visited its node
+limit, prunes with alpha-beta, and keeps a transposition table keyed by the
+Zobrist hash of the position (see ``movecache``), whose best moves also
+order the next iteration. Body segments are keyed by their place in the
+snake, since that decides when each cell frees up. Leaves are scored by the
+room each head can reach (a bounded flood fill), the length difference and
+the AI's distance to food.
+
+The limit counts nodes rather than time, so the same board always gets the
+same move and the answer can be cached. A request's own time or node budget
+still applies on top; a search it cuts short is reported as limited.
+"""
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from board import Board, OFF_BOARD
+from models import Direction
+from movecache import segment_key, zobrist_keys
+
+# Nodes for one move (about 30 ms on a 40x40 board), and the deepest search
+NODE_LIMIT = 1024
+MAX_DEPTH = 12
+
+WIN = 1_000_000
+# A head-on collision: better than losing, worse than any ordinary position
+TIE = -5_000
+# Room beyond this many cells counts the same; keeps the flood fills short
+ROOM_CAP = 48
+ROOM_WEIGHT = 10
+# Reaching less room than the snake is long is treated like a trap
+TRAPPED_PENALTY = 600
+LENGTH_WEIGHT = 40
+FOOD_WEIGHT = 3
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# depth searched, value, bound type, best AI move offset
+Entry = Tuple[int, int, int, int]
+
+
+class OutOfNodes(Exception):
+    pass
+
+
+class Search:
+    """Mutable game state for one minimax search, changed and restored in place.
+
+    Between the player's move and the AI's, the player's new head is in
+    ``player`` but not yet in ``blocked``; settling the tick checks it.
+    """
+
+    def __init__(self, board: Board, node_limit: int = NODE_LIMIT):
+        self.board = board
+        self.node_limit = node_limit
+        self.budget = board.budget
+        self.stride = board.stride
+        self.offsets = board.offsets
+        self.keys = zobrist_keys(board.grid_size)
+        # Walls and both bodies, every segment (tails included) blocked
+        self.blocked = bytearray(board.blocked)
+        self.ai: Deque[int] = deque(board.cell(x, y) for x, y in board.ai_snake)
+        self.player: Deque[int] = deque(
+            cell for cell in (board.cell(x, y) for x, y in board.player_snake) if cell != OFF_BOARD)
+        for cell in (self.ai[-1], self.player[-1] if self.player else OFF_BOARD):
+            if cell != OFF_BOARD:
+                self.blocked[cell] = 1
+        # The player has made this tick's move; its head waits for the tick to settle
+        if self.player and self.player[0] not in list(self.player)[1:] and self.player[0] not in self.ai:
+            self.blocked[self.player[0]] = 0
+        self.food = {cell for cell in (board.cell(x, y) for x, y in board.food) if cell != OFF_BOARD}
+        self.table: Dict[int, Entry] = {}
+        # Segment i of a snake is keyed by its head's number minus i; a new
+        # head gets the next number, so every segment keeps its key
+        self.ai_number = self.player_number = 0
+        # Undo records of the moves made so far, and the number of ticks settled
+        self.history: List[Tuple] = []
+        self.ply = 0
+        self.nodes = 0
+        self.hash = self._hash()
+        self.seen = bytearray(len(self.blocked))
+
+    def _hash(self) -> int:
+        keys = self.keys
+        value = 0
+        for body, table, number in ((self.ai, keys.ai_body, self.ai_number),
+                                    (self.player, keys.player, self.player_number)):
+            for index, cell in enumerate(body):
+                value ^= segment_key(table[cell], number - index)
+        for cell in self.food:
+            value ^= keys.food[cell]
+        return value
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if self.nodes >= self.node_limit:
+            raise OutOfNodes
+        if self.nodes & 63 == 0 and self.budget is not None and not self.budget.spend(64):
+            raise OutOfNodes
+
+    def _leaving(self, body: Deque[int]) -> int:
+        """The cell a snake's next move frees: its tail, unless the tail just grew."""
+        if not body or (len(body) > 1 and body[-2] == body[-1]):
+            return OFF_BOARD
+        return body[-1]
+
+    def _candidates(self, body: Deque[int], other: Deque[int]) -> List[int]:
+        """Moves that don't hit a wall or a body, counting both tails as leaving."""
+        head, blocked = body[0], self.blocked
+        tails = (self._leaving(body), self._leaving(other))
+        return [offset for offset in self.offsets
+                if not blocked[head + offset] or head + offset in tails]
+
+    def _room(self, start: int) -> int:
+        """Free cells reachable from ``start``, counted up to ROOM_CAP."""
+        blocked, seen, offsets = self.blocked, self.seen, self.offsets
+        seen[start] = 1
+        visited = [start]
+        frontier = [start]
+        while frontier and len(visited) < ROOM_CAP:
+            cell = frontier.pop()
+            for offset in offsets:
+                neighbor = cell + offset
+                if not blocked[neighbor] and not seen[neighbor]:
+                    seen[neighbor] = 1
+                    visited.append(neighbor)
+                    frontier.append(neighbor)
+        for cell in visited:
+            seen[cell] = 0
+        return len(visited) - 1
+
+    def _evaluate(self) -> int:
+        ai_head = self.ai[0]
+        ai_room = self._room(ai_head)
+        score = ROOM_WEIGHT * ai_room + LENGTH_WEIGHT * (len(self.ai) - len(self.player))
+        if ai_room < min(len(self.ai), ROOM_CAP - 1):
+            score -= TRAPPED_PENALTY
+        if self.player:
+            player_room = self._room(self.player[0])
+            score -= ROOM_WEIGHT * player_room
+            if player_room < min(len(self.player), ROOM_CAP - 1):
+                score += TRAPPED_PENALTY
+        return score - FOOD_WEIGHT * self._food_distance(0)
+
+    def _pop_tail(self, body: Deque[int], table: List[int], number: int) -> int:
+        index = len(body) - 1
+        tail = body.pop()
+        self.hash ^= segment_key(table[tail], number - index)
+        # A grown snake repeats its tail cell; the cell stays taken
+        if not body or body[-1] != tail:
+            self.blocked[tail] = 0
+        return tail
+
+    def _grow(self, body: Deque[int], table: List[int], number: int) -> None:
+        self.hash ^= segment_key(table[body[-1]], number - len(body))
+        body.append(body[-1])
+
+    def _move_player(self, offset: int) -> None:
+        """Make the player's move for the next tick; ``_settle`` checks it."""
+        player = self.player
+        saved = (self.hash, self.player_number)
+        head = player[0] + offset
+        tail = self._pop_tail(player, self.keys.player, self.player_number)
+        self.player_number += 1
+        player.appendleft(head)
+        self.hash ^= segment_key(self.keys.player[head], self.player_number)
+        self.history.append((tail, saved))
+
+    def _unmove_player(self) -> None:
+        tail, (self.hash, self.player_number) = self.history.pop()
+        self.player.popleft()
+        self.player.append(tail)
+        self.blocked[tail] = 1
+
+    def _settle(self, ai_offset: int) -> Optional[int]:
+        """Move the AI and settle the tick like ``engine.Game.advance``; returns
+        a terminal score if a snake died (the state is then unchanged),
+        otherwise None and the tick must be undone with ``_unsettle``."""
+        self._tick()
+        keys, ai, player, food, blocked = self.keys, self.ai, self.player, self.food, self.blocked
+        saved = (self.hash, self.ai_number)
+        ai_head = ai[0] + ai_offset
+        player_head = player[0] if player else OFF_BOARD
+
+        # The AI's tail moves first, so either head may take the cell it left
+        ai_tail = self._pop_tail(ai, keys.ai_body, self.ai_number)
+        ai_dead = blocked[ai_head] or ai_head == player_head
+        player_dead = player_head != OFF_BOARD and (blocked[player_head] or ai_head == player_head)
+        if ai_dead or player_dead:
+            ai.append(ai_tail)
+            blocked[ai_tail] = 1
+            self.hash, self.ai_number = saved
+            if ai_dead and player_dead:
+                return TIE
+            return -WIN + self.ply if ai_dead else WIN - self.ply
+
+        self.ai_number += 1
+        ai.appendleft(ai_head)
+        blocked[ai_head] = 1
+        self.hash ^= segment_key(keys.ai_body[ai_head], self.ai_number)
+        if player:
+            blocked[player_head] = 1
+        # Both heads are on different cells now, so at most one snake eats each food
+        eaten = []
+        for body, table, number, head in ((ai, keys.ai_body, self.ai_number, ai_head),
+                                          (player, keys.player, self.player_number, player_head)):
+            if head in food:
+                food.discard(head)
+                self.hash ^= keys.food[head]
+                self._grow(body, table, number)
+                eaten.append(body)
+        self.history.append((ai_head, player_head, ai_tail, eaten, saved))
+        self.ply += 1
+        return None
+
+    def _unsettle(self) -> None:
+        ai_head, player_head, ai_tail, eaten, (self.hash, self.ai_number) = self.history.pop()
+        self.ply -= 1
+        for body in eaten:
+            body.pop()
+            self.food.add(body[0])
+        # Neither head's cell was taken before the tick, or its snake would have died
+        if player_head != OFF_BOARD:
+            self.blocked[player_head] = 0
+        self.ai.popleft()
+        self.blocked[ai_head] = 0
+        self.ai.append(ai_tail)
+        self.blocked[ai_tail] = 1
+
+    def max_node(self, depth: int, alpha: int, beta: int) -> Tuple[int, Optional[int]]:
+        """Best score for the AI and its move, searching ``depth`` AI moves
+        from a position where the player has made this tick's move."""
+        entry = self.table.get(self.hash)
+        best_move = None
+        if entry is not None:
+            entry_depth, value, bound, best_move = entry
+            if entry_depth >= depth and (bound == EXACT or (bound == LOWER and value >= beta)
+                                         or (bound == UPPER and value <= alpha)):
+                return value, best_move
+
+        player_head = self.player[0] if self.player else OFF_BOARD
+        # Moving onto the player's new head is a head-on collision
+        moves = [offset for offset in self._candidates(self.ai, self.player)
+                 if self.ai[0] + offset != player_head]
+        if not moves:
+            return -WIN + self.ply, None
+        # The best move of the last iteration first, then toward food
+        moves.sort(key=self._food_distance)
+        if best_move in moves:
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+        original_alpha = alpha
+        best_value, best = -WIN - 1, moves[0]
+        for offset in moves:
+            value = self._settle(offset)
+            if value is None:
+                try:
+                    value = self._evaluate() if depth == 1 else self.min_node(depth - 1, alpha, beta)
+                finally:
+                    self._unsettle()
+            if value > best_value:
+                best_value, best = value, offset
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+        bound = LOWER if best_value >= beta else UPPER if best_value <= original_alpha else EXACT
+        self.table[self.hash] = (depth, best_value, bound, best)
+        return best_value, best
+
+    def min_node(self, depth: int, alpha: int, beta: int) -> int:
+        """Worst score the player can force with its next move, the AI then
+        searching ``depth`` more moves."""
+        if not self.player:
+            return self.max_node(depth, alpha, beta)[0]
+        # A player with no way out still has to move
+        player_moves = self._candidates(self.player, self.ai) or [self.offsets[0]]
+        worst = WIN + 1
+        for offset in player_moves:
+            self._move_player(offset)
+            try:
+                value, _ = self.max_node(depth, alpha, beta)
+            finally:
+                self._unmove_player()
+            worst = min(worst, value)
+            beta = min(beta, value)
+            if alpha >= beta:
+                break
+        return worst
+
+    def _food_distance(self, offset: int) -> int:
+        if not self.food:
+            return 0
+        stride = self.stride
+        x, y = divmod(self.ai[0] + offset, stride)
+        return min(abs(x - fx) + abs(y - fy) for fx, fy in (divmod(cell, stride) for cell in self.food))
+
+
+def minimax_direction(board: Board, node_limit: int = NODE_LIMIT) -> Optional[Direction]:
+    """The AI move chosen by the deepest search that finished within the
+    node limit and the board's budget, or None if the head is off the board."""
+    head = board.cell(*board.head)
+    if head == OFF_BOARD:
+        return None
+    search = Search(board, node_limit)
+    best = None
+    try:
+        for depth in range(1, MAX_DEPTH + 1):
+            value, move = search.max_node(depth, -WIN - 1, WIN + 1)
+            best = move
+            # A forced result won't change with more depth
+            if abs(value) >= WIN - MAX_DEPTH:
+                break
+    except OutOfNodes:
+        pass
+    finally:
+        board.expanded += search.nodes
+    return board.moves[best] if best is not None else None
@@ -1,25 +1,83 @@
-from pydantic import BaseModel
-from typing import List, Literal
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional, Tuple
 
 # Type aliases
 Direction = Literal["UP", "DOWN", "LEFT", "RIGHT"]
-Algorithm = Literal["random", "greedy", "bfs", "dfs", "dijkstra", "astar"]
+# The binary wire format sends an algorithm as its index here, so only append
+Algorithm = Literal["random", "greedy", "bfs", "dfs", "dijkstra", "astar", "field", "hamiltonian",
+                    "minimax"]
 
 class Position(BaseModel):
     x: int
     y: int
 
+# Largest grid a move request may describe; every board allocates (n+2)^2 bytes
+MAX_GRID_SIZE = 1024
+
 class GameStateInput(BaseModel):
     ai_snake: List[Position]
     player_snake: List[Position]
     food: List[Position]
-    grid_size: int
+    grid_size: int = Field(ge=1, le=MAX_GRID_SIZE)
 
 class AIRequest(BaseModel):
     game_state: GameStateInput
     algorithm: Algorithm
+    # Optional id that lets the server reuse the previous tick's plan for this game
+    game_id: Optional[str] = None
+    # Steer away from pockets smaller than the snake; None uses the server default
+    avoid_traps: Optional[bool] = None
+    # Search limits for this move; None uses the server default
+    time_budget_ms: Optional[float] = Field(default=None, gt=0)
+    node_budget: Optional[int] = Field(default=None, gt=0)
 
 class AIResponse(BaseModel):
     direction: Direction
     success: bool
     error: str = None
+    # False when the search ran out of budget and returned its best move so far
+    complete: bool = True
+
+class SpeculativeAIRequest(BaseModel):
+    # The state before the player's move; the AI's answer to each move it can make is returned
+    game_state: GameStateInput
+    algorithm: Algorithm
+    avoid_traps: Optional[bool] = None
+    # Search limits for each of the moves; None uses the server default
+    time_budget_ms: Optional[float] = Field(default=None, gt=0)
+    node_budget: Optional[int] = Field(default=None, gt=0)
+
+class SpeculativeAIResponse(BaseModel):
+    # AI direction for each direction the player may move in
+    moves: Dict[Direction, Direction] = {}
+    success: bool
+    error: str = None
+    # False when any of the searches ran out of budget
+    complete: bool = True
+
+class BatchAIRequest(BaseModel):
+    requests: List[AIRequest]
+
+class BatchAIResponse(BaseModel):
+    responses: List[AIResponse]
+
+class TickDelta(BaseModel):
+    """What changed on the client since the last WebSocket reply."""
+    player_head: Tuple[int, int]
+    player_grew: bool = False
+    ai_grew: bool = False
+    food_added: List[Tuple[int, int]] = []
+    food_removed: List[Tuple[int, int]] = []
+
+class RoomRequest(BaseModel):
+    """A game for the server to run; see rooms.py."""
+    algorithm: Algorithm = "astar"
+    # Big enough for the starting snakes, small enough to send every tick
+    grid_size: int = Field(default=20, ge=8, le=200)
+    # Milliseconds between ticks, like the frontend's gameSpeed
+    tick_ms: float = Field(default=150, ge=20, le=2000)
+    avoid_traps: Optional[bool] = None
+
+class RoomInput(BaseModel):
+    """A player's turn, sent over a room's WebSocket."""
+    direction: Direction
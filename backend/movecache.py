@@ -0,0 +1,145 @@
+"""LRU cache of algorithm moves keyed by a Zobrist hash of the board.
+
+Every piece of the position the algorithms look at gets a random 128-bit
+key per cell: each snake's segments and food. A segment's key is mixed
+with its place in the snake (``segment_key``), because searches free body
+cells in order from the tail, so the same cells in another order are a
+different position. A board's hash is the XOR of the keys of its pieces,
+the algorithm's key and a mix of the snake lengths, so food changing
+updates it with one XOR (``toggle``) instead of rehashing the board. The low 64 bits
+index the cache and the high 64 bits are stored with the entry to catch
+index collisions.
+"""
+import random
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from board import Board, OFF_BOARD
+from jps import LARGE_GRID_SIZE
+from models import Algorithm, Direction
+
+LOW_BITS = (1 << 64) - 1
+HASH_BITS = (1 << 128) - 1
+# Odd 128-bit constants for mixing the snake lengths into the hash
+LENGTH_MIX = 0x9E3779B97F4A7C15F39CC0605CEDC835
+PLAYER_LENGTH_MIX = 0xC2B2AE3D27D4EB4F165667B19E3779F9
+# Mixes a segment's place in its snake into the key of its cell
+SEGMENT_MIX = 0xD6E8FEB86659FD93A5A5E1B7C5D4A3F1
+
+PIECES = ("ai_body", "player", "food")
+
+
+class ZobristKeys(NamedTuple):
+    """Per-cell keys for one grid size; index OFF_BOARD (-1) is a key of its own."""
+
+    ai_body: List[int]
+    player: List[int]
+    food: List[int]
+    algorithms: Dict[str, int]
+
+
+@lru_cache(maxsize=32)
+def zobrist_keys(grid_size: int) -> ZobristKeys:
+    rng = random.Random(f"zobrist-{grid_size}")
+    cells = (max(grid_size, 0) + 2) ** 2 + 1
+    tables = [[rng.getrandbits(128) for _ in range(cells)] for _ in PIECES]
+    algorithms = {name: rng.getrandbits(128) for name in Algorithm.__args__}
+    return ZobristKeys(*tables, algorithms)
+
+
+def segment_key(cell_key: int, index: int) -> int:
+    """Key of a body segment at ``index`` in its snake, so the same cells in
+    another order hash differently."""
+    return cell_key * (index * SEGMENT_MIX | 1) & HASH_BITS
+
+
+def board_hash(board: Board, algorithm: str) -> int:
+    """Zobrist hash of everything the algorithm's move depends on."""
+    keys = zobrist_keys(board.grid_size)
+    size, stride = board.grid_size, board.stride
+    ai_snake, player_snake = board.ai_snake, board.player_snake
+    value = (keys.algorithms[algorithm] ^ (len(ai_snake) * LENGTH_MIX)
+             ^ (len(player_snake) * PLAYER_LENGTH_MIX))
+
+    def cell(x: int, y: int) -> int:
+        return (x + 1) * stride + y + 1 if 0 <= x < size and 0 <= y < size else OFF_BOARD
+
+    # Each segment by its index, so a repeated cell (a grown tail) can't cancel itself out
+    for table, snake in ((keys.ai_body, ai_snake), (keys.player, player_snake)):
+        for index, (x, y) in enumerate(snake):
+            value ^= segment_key(table[cell(x, y)], -index)
+    # A set, so doubled food can't cancel itself out
+    for food_cell in {cell(x, y) for x, y in board.food}:
+        value ^= keys.food[food_cell]
+    return value
+
+
+def toggle(value: int, grid_size: int, piece: str, cell: int) -> int:
+    """Add or remove one piece at a cell; e.g. a food being eaten is one toggle."""
+    return value ^ getattr(zobrist_keys(grid_size), piece)[cell]
+
+
+class MoveCache:
+    """Thread-safe LRU map from board hashes to the move an algorithm chose."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[int, Direction]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def cacheable(board: Board) -> bool:
+        """Only boards with the AI head on the grid; off-board cells share one key.
+        Large grids rarely repeat a position and would need keys for every cell."""
+        return (bool(board.ai_snake) and board.cell(*board.head) != OFF_BOARD
+                and board.grid_size < LARGE_GRID_SIZE)
+
+    def get(self, value: int) -> Optional[Direction]:
+        index, check = value & LOW_BITS, value >> 64
+        with self._lock:
+            entry = self._entries.get(index)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] != check:
+                self.collisions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(index)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, value: int, direction: Direction) -> None:
+        if self.max_entries <= 0:
+            return
+        index = value & LOW_BITS
+        with self._lock:
+            self._entries[index] = (value >> 64, direction)
+            self._entries.move_to_end(index)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "collisions": self.collisions,
+                "evictions": self.evictions,
+            }
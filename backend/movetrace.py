@@ -0,0 +1,308 @@
+"""Append-only binary traces of the moves the server computed.
+
+A trace file starts with ``MAGIC`` and is followed by records, each a
+``RECORD`` header and a payload::
+
+    u32 payload size | u8 kind | u32 game | u8 algorithm | u8 direction
+    | u8 flags (1 avoid_traps, 2 complete) | u32 search microseconds
+    | f64 unix time
+
+A keyframe's payload is ``u16 grid_size``, ``u8 n`` and ``n`` bytes of
+game id (none for a request without one), then the snakes and food in the layout of ``wire.pack_state``.
+A delta's payload describes the tick since the game's previous record:
+for each snake a byte of ``step | change << 2`` (``MOVED`` and so on),
+then ``u8 added, u8 removed`` and the food indices added and removed.
+Every ``KEYFRAME_INTERVAL`` records of a game, and whenever a tick can't be
+expressed as a delta, a keyframe is written instead.
+
+``TraceRecorder`` does the encoding and writing on a background thread;
+``TraceReader`` maps a file and rebuilds the board of any record from the
+game's nearest keyframe.
+"""
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from bisect import bisect_right
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from board import Board, Coord
+from wire import ALGORITHMS, DIRECTIONS, STEPS, pack_state, unpack_state
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SNKTRACE1\n"
+RECORD = struct.Struct("<IBIBBBId")
+KEYFRAME, DELTA = 0, 1
+KEYFRAME_INTERVAL = 64
+
+FLAG_AVOID_TRAPS = 1
+FLAG_COMPLETE = 2
+
+# How a snake changed in one tick, after its head moved one step:
+# its tail moved up (moveSnake), it also grew by repeating the new tail
+# (growSnake after moveSnake), or the tail stayed (the player's order)
+MOVED, MOVED_AND_GREW, KEPT_TAIL, ABSENT = 0, 1, 2, 3
+
+State = Tuple[int, List[Coord], List[Coord], List[Coord]]
+
+
+class TraceEntry(NamedTuple):
+    game_id: Optional[str]
+    grid_size: int
+    ai_snake: List[Coord]
+    player_snake: List[Coord]
+    food: List[Coord]
+    algorithm: str
+    direction: str
+    avoid_traps: bool
+    complete: bool
+    micros: int
+    timestamp: float
+
+    def board(self) -> Board:
+        return Board(self.grid_size, list(self.ai_snake), list(self.player_snake), list(self.food))
+
+
+def advance_snake(snake: List[Coord], step: int, change: int) -> List[Coord]:
+    if change == ABSENT:
+        return snake
+    dx, dy = STEPS[step]
+    head = (snake[0][0] + dx, snake[0][1] + dy)
+    if change == KEPT_TAIL:
+        return [head] + snake
+    moved = [head] + snake[:-1]
+    return moved + [moved[-1]] if change == MOVED_AND_GREW else moved
+
+
+def snake_delta(previous: List[Coord], current: List[Coord]) -> Optional[Tuple[int, int]]:
+    """(step, change) turning ``previous`` into ``current``, or None."""
+    if not previous and not current:
+        return 0, ABSENT
+    if not previous or not current:
+        return None
+    try:
+        step = STEPS.index((current[0][0] - previous[0][0], current[0][1] - previous[0][1]))
+    except ValueError:
+        return None
+    for change in (MOVED, MOVED_AND_GREW, KEPT_TAIL):
+        if advance_snake(previous, step, change) == current:
+            return step, change
+    return None
+
+
+def advance_food(food: List[Coord], added: List[Coord], removed: List[Coord]) -> List[Coord]:
+    food = list(food)
+    for cell in removed:
+        food.remove(cell)
+    return food + added
+
+
+def encode_delta(previous: State, current: State) -> Optional[bytes]:
+    grid_size, ai_snake, player_snake, food = current
+    if previous[0] != grid_size:
+        return None
+    ai = snake_delta(previous[1], ai_snake)
+    player = snake_delta(previous[2], player_snake)
+    if ai is None or player is None:
+        return None
+    removed = [cell for cell in previous[3] if cell not in food]
+    added = [cell for cell in food if cell not in previous[3]]
+    if (advance_food(previous[3], added, removed) != food or len(added) > 255 or len(removed) > 255
+            or any(not (0 <= x < grid_size and 0 <= y < grid_size) for x, y in added)):
+        return None
+    indices = [y * grid_size + x for x, y in added + removed]
+    return struct.pack(f"<BBBB{len(indices)}H", ai[0] | ai[1] << 2, player[0] | player[1] << 2,
+                       len(added), len(removed), *indices)
+
+
+def decode_delta(payload: bytes, previous: State) -> State:
+    grid_size, ai_snake, player_snake, food = previous
+    ai, player, added_count, removed_count = struct.unpack_from("<BBBB", payload)
+    indices = struct.unpack_from(f"<{added_count + removed_count}H", payload, 4)
+    cells = [(index % grid_size, index // grid_size) for index in indices]
+    return (grid_size, advance_snake(ai_snake, ai & 3, ai >> 2), advance_snake(player_snake, player & 3, player >> 2),
+            advance_food(food, cells[:added_count], cells[added_count:]))
+
+
+def encode_keyframe(game_id: Optional[str], state: State) -> bytes:
+    grid_size, ai_snake, player_snake, food = state
+    name = (game_id or "").encode()[:255]
+    return struct.pack("<HB", grid_size, len(name)) + name + pack_state(grid_size, ai_snake, player_snake, food)
+
+
+def decode_keyframe(payload: bytes) -> Tuple[Optional[str], State]:
+    grid_size, size = struct.unpack_from("<HB", payload)
+    game_id = payload[3:3 + size].decode() or None
+    ai_snake, player_snake, food, _ = unpack_state(payload, 3 + size, grid_size)
+    return game_id, (grid_size, ai_snake, player_snake, food)
+
+
+class TraceRecorder:
+    """Encodes and appends moves to a trace file on a background thread.
+
+    ``record`` only puts a tuple on a bounded queue; when the writer falls
+    behind, moves are dropped (and counted) rather than slowing requests.
+    The last state of at most ``max_games`` games is kept for deltas, with
+    LRU and idle-time eviction like SessionStore; a game that comes back
+    after being evicted starts again from a keyframe.
+    """
+
+    def __init__(self, path: str, max_queued: int = 10000, buffer_size: int = 1 << 16,
+                 max_games: int = 256, idle_seconds: float = 300.0):
+        self.path = path
+        self.max_games = max_games
+        self.idle_seconds = idle_seconds
+        self.dropped = 0
+        self.written = 0
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(max_queued)
+        # Game numbers are per file, so a recorder never appends to an old trace
+        self._file = open(path, "xb", buffering=buffer_size)
+        self._file.write(MAGIC)
+        # Per game in last-written order: (last written, number in this file,
+        # records since its keyframe, last state); only the writer thread uses it
+        self._games: "OrderedDict[str, Tuple[float, int, int, State]]" = OrderedDict()
+        self._next_game = 0
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, game_id: Optional[str], board: Board, algorithm: str, direction: str,
+               avoid_traps: bool, complete: bool, micros: int) -> None:
+        item = (game_id, board.grid_size, list(board.ai_snake), list(board.player_snake), list(board.food),
+                algorithm, direction, avoid_traps, complete, micros, time.time())
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                self._file.flush()
+                continue
+            if item is None:
+                break
+            try:
+                self._write(*item)
+            except (ValueError, struct.error) as e:
+                # States the binary layout can't hold, e.g. snakes that aren't chains
+                logger.debug(f"Not tracing move: {str(e)}")
+                self.dropped += 1
+        self._file.flush()
+
+    def _write(self, game_id, grid_size, ai_snake, player_snake, food, algorithm, direction,
+               avoid_traps, complete, micros, timestamp) -> None:
+        state: State = (grid_size, ai_snake, player_snake, food)
+        now = time.monotonic()
+        # Idle games sit at the front
+        while self._games:
+            oldest_id, (last_written, *_) = next(iter(self._games.items()))
+            if now - last_written < self.idle_seconds:
+                break
+            del self._games[oldest_id]
+        if game_id in self._games:
+            _, number, since_keyframe, previous = self._games.pop(game_id)
+        else:
+            number, since_keyframe, previous = self._next_game, KEYFRAME_INTERVAL, None
+            self._next_game += 1
+        payload = None
+        if previous is not None and since_keyframe < KEYFRAME_INTERVAL:
+            payload = encode_delta(previous, state)
+        kind = DELTA
+        if payload is None:
+            kind, payload, since_keyframe = KEYFRAME, encode_keyframe(game_id, state), 0
+        # Requests without a game id stand alone: one keyframe each
+        if game_id is not None:
+            self._games[game_id] = (now, number, since_keyframe + 1, state)
+            while len(self._games) > self.max_games:
+                self._games.popitem(last=False)
+        flags = (FLAG_AVOID_TRAPS if avoid_traps else 0) | (FLAG_COMPLETE if complete else 0)
+        self._file.write(RECORD.pack(len(payload), kind, number, ALGORITHMS.index(algorithm),
+                                     DIRECTIONS.index(direction), flags, micros, timestamp) + payload)
+        self.written += 1
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+
+class TraceReader:
+    """Random access to the records of a trace file through mmap."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a trace file")
+        self.offsets = array("Q")
+        self.games = array("I")
+        self.keyframes = array("b")
+        # Record indexes of each game, in order
+        self._by_game: Dict[int, array] = {}
+        offset = len(MAGIC)
+        while offset + RECORD.size <= size:
+            payload_size, kind, game = RECORD.unpack_from(self._map, offset)[:3]
+            if offset + RECORD.size + payload_size > size:
+                break  # A record cut short by a crash
+            self._by_game.setdefault(game, array("I")).append(len(self.offsets))
+            self.offsets.append(offset)
+            self.games.append(game)
+            self.keyframes.append(kind == KEYFRAME)
+            offset += RECORD.size + payload_size
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _record(self, index: int) -> Tuple[tuple, bytes]:
+        offset = self.offsets[index]
+        header = RECORD.unpack_from(self._map, offset)
+        start = offset + RECORD.size
+        return header, self._map[start:start + header[0]]
+
+    def _entry(self, header: tuple, game_id: Optional[str], state: State) -> TraceEntry:
+        _, _, _, algorithm, direction, flags, micros, timestamp = header
+        return TraceEntry(game_id, *state, ALGORITHMS[algorithm], DIRECTIONS[direction],
+                          bool(flags & FLAG_AVOID_TRAPS), bool(flags & FLAG_COMPLETE), micros, timestamp)
+
+    def __getitem__(self, index: int) -> TraceEntry:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        records = self._by_game[self.games[index]]
+        position = bisect_right(records, index) - 1
+        start = position
+        while not self.keyframes[records[start]]:
+            start -= 1
+        game_id, state = decode_keyframe(self._record(records[start])[1])
+        for record in records[start + 1:position + 1]:
+            state = decode_delta(self._record(record)[1], state)
+        return self._entry(self._record(index)[0], game_id, state)
+
+    def __iter__(self) -> Iterator[TraceEntry]:
+        """Every record in order, carrying each game's state forward."""
+        games: Dict[int, Tuple[Optional[str], State]] = {}
+        for index in range(len(self)):
+            header, payload = self._record(index)
+            game = self.games[index]
+            if self.keyframes[index]:
+                games[game] = decode_keyframe(payload)
+            else:
+                game_id, state = games[game]
+                games[game] = (game_id, decode_delta(payload, state))
+            yield self._entry(header, *games[game])
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
@@ -0,0 +1,105 @@
+"""Replay a move trace through the algorithms to catch regressions.
+
+Usage:
+    python replay.py traces/trace-1760000000-1234.bin
+    python replay.py trace.bin --algorithm astar --limit 10000
+
+Every recorded move is computed again the way the server computes it (same
+game ids, so incremental plans are rebuilt in order) and compared with the
+recorded direction. Moves of ``random``, and moves that ran out of budget
+or were shed, aren't reproducible and are skipped. Every other difference,
+``minimax`` included, is a mismatch and fails the run.
+"""
+import argparse
+import logging
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+import main as server
+from benchmark import percentiles
+from movetrace import TraceReader
+
+
+class Mismatch(NamedTuple):
+    index: int
+    algorithm: str
+    recorded: str
+    replayed: str
+
+
+class ReplayResult(NamedTuple):
+    replayed: int
+    skipped: int
+    mismatches: List[Mismatch]
+    seconds: float
+    timings: Dict[str, List[float]]
+
+
+def replay(reader: TraceReader, algorithm: Optional[str] = None, limit: Optional[int] = None) -> ReplayResult:
+    # Every move is searched afresh; a cache hit would time nothing. The
+    # server module may be in use elsewhere, so its cache is restored after
+    max_entries = server.move_cache.max_entries
+    server.move_cache.max_entries = 0
+    try:
+        return replay_moves(reader, algorithm, limit)
+    finally:
+        server.move_cache.max_entries = max_entries
+
+
+def replay_moves(reader: TraceReader, algorithm: Optional[str], limit: Optional[int]) -> ReplayResult:
+    timings: Dict[str, List[float]] = defaultdict(list)
+    mismatches: List[Mismatch] = []
+    replayed = skipped = 0
+    started = time.perf_counter()
+    for index, entry in enumerate(reader):
+        if limit is not None and replayed >= limit:
+            break
+        if algorithm and entry.algorithm != algorithm:
+            continue
+        if entry.algorithm in server.UNCACHED_ALGORITHMS or not entry.complete:
+            skipped += 1
+            continue
+        board = entry.board()
+        move_started = time.perf_counter()
+        direction = server.compute_move(board, entry.algorithm, entry.game_id, entry.avoid_traps)
+        timings[entry.algorithm].append(time.perf_counter() - move_started)
+        replayed += 1
+        if direction != entry.direction:
+            mismatches.append(Mismatch(index, entry.algorithm, entry.direction, direction))
+    return ReplayResult(replayed, skipped, mismatches, time.perf_counter() - started, dict(timings))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a move trace and compare the directions.")
+    parser.add_argument("trace", help="trace file written with SNAKE_TRACE_DIR set")
+    parser.add_argument("--algorithm", help="only replay moves of this algorithm")
+    parser.add_argument("--limit", type=int, help="stop after this many moves")
+    parser.add_argument("--show", type=int, default=20, help="mismatches to print")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("main").setLevel(logging.WARNING)
+    reader = TraceReader(args.trace)
+    try:
+        result = replay(reader, args.algorithm, args.limit)
+    finally:
+        reader.close()
+
+    for name, samples in sorted(result.timings.items()):
+        entry = percentiles(samples)
+        print(f"{name:<12} moves {len(samples):8d}  p50 {entry['p50_ms']:8.3f}ms  p99 {entry['p99_ms']:8.3f}ms")
+    rate = result.replayed / result.seconds if result.seconds else 0.0
+    print(f"replayed {result.replayed} moves of {len(reader)} in {result.seconds:.2f}s ({rate:.0f} moves/s), "
+          f"skipped {result.skipped}")
+    for mismatch in result.mismatches[:args.show]:
+        print(f"MISMATCH #{mismatch.index} {mismatch.algorithm}: recorded {mismatch.recorded}, "
+              f"replayed {mismatch.replayed}")
+    if result.mismatches:
+        print(f"{len(result.mismatches)} mismatches")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
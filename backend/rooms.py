@@ -0,0 +1,273 @@
+"""Game rooms run by the server.
+
+The frontend normally drives its own tick loop and asks for the AI's move
+over HTTP every tick, so a slow answer slows the game down. A room runs the
+game on the server instead: one asyncio scheduler ticks every room at its
+own speed, steps both snakes with ``engine.Game``, asks for the AI's move
+and pushes the new state to the room's subscribers. Clients only send the
+player's turns.
+
+Rooms are kept in a heap ordered by when their next tick is due, so one
+loop serves hundreds of them. Ticks are on a fixed-rate schedule: a tick
+that starts late keeps the schedule rather than pushing later ticks back,
+and ticks missed by a whole interval are skipped instead of replayed in a
+burst. How late each tick started (its lag) is kept per room.
+"""
+import asyncio
+import heapq
+import logging
+import random
+import time
+import uuid
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from board import Board
+from engine import Game
+from models import Direction
+
+logger = logging.getLogger(__name__)
+
+# Picks the AI's move for a room on the board from ``Game.ai_board``; the
+# float is when the room's next tick is due, on the scheduler's clock
+Decide = Callable[["Room", Board, float], Awaitable[Direction]]
+
+# States queued for a subscriber that is slow to read; the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 4
+
+# Recent tick lags kept per room for its percentiles
+LAG_SAMPLES = 256
+
+
+class RoomLimit(Exception):
+    """Raised when a room is created while the scheduler is full."""
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+class Room:
+    """One game, its subscribers and its tick statistics."""
+
+    def __init__(self, room_id: str, grid_size: int, algorithm: str, tick_ms: float,
+                 avoid_traps: Optional[bool] = None, rng: Optional[random.Random] = None):
+        self.id = room_id
+        self.algorithm = algorithm
+        self.avoid_traps = avoid_traps
+        self.tick_seconds = tick_ms / 1000
+        self.game = Game(grid_size, rng)
+        self.subscribers: Set[asyncio.Queue] = set()
+        # The player's latest turn, applied on the next tick
+        self.input: Optional[Direction] = None
+        # Scheduler clock time the next tick is due; None while the room isn't scheduled
+        self.due: Optional[float] = None
+        self.idle_since = time.monotonic()
+        self.lags: "deque[float]" = deque(maxlen=LAG_SAMPLES)
+        self.lag_max = 0.0
+        self.missed = 0
+
+    def steer(self, direction: Direction) -> None:
+        self.input = direction
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        queue.put_nowait(self.state())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+        if not self.subscribers:
+            self.idle_since = time.monotonic()
+
+    def publish(self, message: Dict) -> None:
+        """Queue a message for every subscriber without waiting on any of them."""
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def state(self) -> Dict:
+        game = self.game
+        return {
+            "type": "state",
+            "room_id": self.id,
+            "tick": game.ticks,
+            "grid_size": game.grid_size,
+            "player_snake": game.player_snake,
+            "ai_snake": game.ai_snake,
+            "food": list(game.food),
+            "player_direction": game.player_direction,
+            "ai_direction": game.ai_direction,
+            "score": dict(game.score),
+            "game_over": game.game_over,
+            "winner": game.winner,
+        }
+
+    def stats(self) -> Dict:
+        lags = list(self.lags)
+        return {
+            "room_id": self.id,
+            "algorithm": self.algorithm,
+            "grid_size": self.game.grid_size,
+            "tick_ms": self.tick_seconds * 1000,
+            "ticks": self.game.ticks,
+            "subscribers": len(self.subscribers),
+            "game_over": self.game.game_over,
+            "missed_ticks": self.missed,
+            "lag_p50_ms": round(percentile(lags, 0.5) * 1000, 3),
+            "lag_p99_ms": round(percentile(lags, 0.99) * 1000, 3),
+            "lag_max_ms": round(self.lag_max * 1000, 3),
+        }
+
+
+class RoomScheduler:
+    """Ticks every room with subscribers from one asyncio task.
+
+    A room starts ticking when its first subscriber joins and stops when
+    the last one leaves or the game ends. Rooms left without subscribers
+    for ``idle_seconds`` are closed when room is needed for a new one.
+    ``on_tick`` is called with each tick's lag and the ticks it skipped.
+    Tick times are read from ``clock``, ``time.perf_counter`` by default.
+    """
+
+    def __init__(self, decide: Decide, max_rooms: int = 500, idle_seconds: float = 60.0,
+                 on_tick: Optional[Callable[[float, int], None]] = None,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.decide = decide
+        self.clock = clock
+        self.max_rooms = max_rooms
+        self.idle_seconds = idle_seconds
+        self.on_tick = on_tick
+        self.rooms: Dict[str, Room] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._wakeup: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ticking: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def get(self, room_id: str) -> Optional[Room]:
+        return self.rooms.get(room_id)
+
+    def create(self, grid_size: int, algorithm: str, tick_ms: float,
+               avoid_traps: Optional[bool] = None) -> Room:
+        if len(self.rooms) >= self.max_rooms:
+            self.close_idle()
+            if len(self.rooms) >= self.max_rooms:
+                raise RoomLimit(f"All {self.max_rooms} rooms are in use")
+        room = Room(uuid.uuid4().hex, grid_size, algorithm, tick_ms, avoid_traps)
+        self.rooms[room.id] = room
+        return room
+
+    def close(self, room_id: str) -> None:
+        room = self.rooms.pop(room_id, None)
+        if room is not None:
+            room.due = None
+            room.publish({"type": "closed", "room_id": room_id})
+
+    def close_idle(self) -> None:
+        now = time.monotonic()
+        for room in list(self.rooms.values()):
+            if not room.subscribers and now - room.idle_since >= self.idle_seconds:
+                self.close(room.id)
+
+    def join(self, room: Room) -> asyncio.Queue:
+        """Subscribe to a room's states, starting its clock if it was stopped."""
+        queue = room.subscribe()
+        if room.due is None and not room.game.game_over:
+            self._schedule(room, self.clock() + room.tick_seconds)
+        self.start()
+        return queue
+
+    def _schedule(self, room: Room, due: float) -> None:
+        room.due = due
+        heapq.heappush(self._heap, (due, room.id))
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    async def _sleep(self, delay: Optional[float]) -> None:
+        """Wait ``delay`` seconds (None: no limit), or until a room is scheduled."""
+        loop = asyncio.get_running_loop()
+        self._wakeup = loop.create_future()
+        timer = loop.call_later(delay, self._wake) if delay is not None else None
+        try:
+            await self._wakeup
+        finally:
+            self._wakeup = None
+            if timer is not None:
+                timer.cancel()
+
+    def start(self) -> None:
+        """Start the scheduler task on the running loop, if it isn't running there."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = list(self._ticking)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            # Woken early when a room is scheduled ahead of the current first one
+            await self._sleep(self.start_due())
+
+    def start_due(self) -> Optional[float]:
+        """Start a tick for every room that is due.
+
+        Returns the time until the next room is due, or None when no room
+        is scheduled.
+        """
+        now = self.clock()
+        while self._heap and self._heap[0][0] <= now:
+            due, room_id = heapq.heappop(self._heap)
+            room = self.rooms.get(room_id)
+            # Skip entries of closed or rescheduled rooms
+            if room is None or room.due != due:
+                continue
+            task = asyncio.get_running_loop().create_task(self.tick(room))
+            self._ticking.add(task)
+            task.add_done_callback(self._ticking.discard)
+        return self._heap[0][0] - now if self._heap else None
+
+    async def tick(self, room: Room) -> None:
+        """Play one tick of a room that was due at ``room.due``."""
+        if room.due is None:
+            return
+        lag = self.clock() - room.due
+        skipped = int(lag // room.tick_seconds)
+        next_due = room.due + (skipped + 1) * room.tick_seconds
+        room.lags.append(lag)
+        room.lag_max = max(room.lag_max, lag)
+        room.missed += skipped
+        if self.on_tick is not None:
+            self.on_tick(lag, skipped)
+
+        game = room.game
+        board = game.ai_board(room.input or game.player_direction)
+        room.input = None
+        try:
+            direction = await self.decide(room, board, next_due)
+        except Exception as e:
+            logger.error(f"Error computing AI move for room {room.id}: {str(e)}")
+            direction = game.ai_direction
+        if room.id not in self.rooms:
+            return
+        game.advance(board, direction)
+        room.publish(room.state())
+        if game.game_over or not room.subscribers:
+            room.due = None
+        else:
+            self._schedule(room, next_due)
@@ -0,0 +1,188 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from board import Board, Budget, OFF_BOARD, UNSEEN, grid_layout
+from models import Direction
+
+Key = Tuple[int, int]
+
+
+class IncrementalPlanner:
+    """D* Lite planner that keeps its search tree between ticks.
+
+    The search runs backward from the goal cells, so the AI head can move
+    freely. Each tick only the cells whose occupancy changed (usually the
+    two heads and two tails) are re-evaluated, and the repair stops as soon
+    as the head's distance is consistent again.
+    """
+
+    def __init__(self, board: Board):
+        size = max(board.grid_size, 0)
+        self.grid_size = board.grid_size
+        self.stride = board.stride
+        self.offsets = board.offsets
+        self.moves = board.moves
+        self.walls = grid_layout(size)[0]
+        self.blocked = bytearray(self.walls)
+        self.obstacles: Set[int] = set()
+        self.goals: Set[int] = set()
+        self.g = [UNSEEN] * len(self.walls)
+        self.rhs = [UNSEEN] * len(self.walls)
+        self.queue: List[Tuple[Key, int]] = []
+        self.queued: Dict[int, Key] = {}
+        self.km = 0
+        self.start = OFF_BOARD
+
+    def _distance(self, a: int, b: int) -> int:
+        ax, ay = divmod(a, self.stride)
+        bx, by = divmod(b, self.stride)
+        return abs(ax - bx) + abs(ay - by)
+
+    def _key(self, cell: int) -> Key:
+        best = min(self.g[cell], self.rhs[cell])
+        return (best + self._distance(self.start, cell) + self.km, best)
+
+    def _update(self, cell: int) -> None:
+        if self.walls[cell]:
+            return
+        if cell not in self.goals:
+            blocked, g = self.blocked, self.g
+            best = UNSEEN
+            for offset in self.offsets:
+                neighbor = cell + offset
+                if not blocked[neighbor] and g[neighbor] + 1 < best:
+                    best = g[neighbor] + 1
+            self.rhs[cell] = best
+        if self.g[cell] != self.rhs[cell]:
+            key = self._key(cell)
+            self.queued[cell] = key
+            heapq.heappush(self.queue, (key, cell))
+        else:
+            self.queued.pop(cell, None)
+
+    def _update_around(self, cell: int) -> None:
+        for offset in self.offsets:
+            self._update(cell + offset)
+
+    def _compute(self, budget: Optional[Budget] = None) -> int:
+        """Process the queue until the start is consistent; returns the cells expanded.
+
+        Stops early when ``budget`` runs out. The queue keeps the remaining
+        work, so the next tick picks up where this one left off.
+        """
+        g, rhs = self.g, self.rhs
+        queue, queued = self.queue, self.queued
+        start = self.start
+        expanded = 0
+        charged = 0
+        check_at = budget.allowance() if budget is not None else -1
+        while queue:
+            key, cell = queue[0]
+            if queued.get(cell) != key:
+                heapq.heappop(queue)  # Stale entry
+                continue
+            if key >= self._key(start) and rhs[start] == g[start]:
+                break
+            if expanded == check_at:
+                if not budget.spend(expanded - charged):
+                    break
+                charged = expanded
+                check_at = expanded + budget.allowance()
+            heapq.heappop(queue)
+            new_key = self._key(cell)
+            if key < new_key:
+                queued[cell] = new_key
+                heapq.heappush(queue, (new_key, cell))
+                continue
+            del queued[cell]
+            expanded += 1
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = UNSEEN
+                self._update(cell)
+            self._update_around(cell)
+        return expanded
+
+    def next_move(self, board: Board, goals: Set[int]) -> Optional[Direction]:
+        """Repair the plan for the new board and return the first move on it."""
+        start = board.cell(*board.head)
+        if start == OFF_BOARD:
+            return None
+        if self.start != OFF_BOARD:
+            self.km += self._distance(self.start, start)
+        self.start = start
+
+        # Only re-evaluate the cells whose occupancy changed since the last tick
+        obstacles = {board.cell(x, y) for x, y in board.ai_snake[:-1]}
+        obstacles.update(board.cell(x, y) for x, y in board.player_snake)
+        obstacles.discard(OFF_BOARD)
+        for cell in obstacles ^ self.obstacles:
+            self.blocked[cell] = cell in obstacles
+            self._update_around(cell)
+        self.obstacles = obstacles
+
+        if goals != self.goals:
+            changed = goals ^ self.goals
+            self.goals = set(goals)
+            for cell in changed:
+                if cell in goals:
+                    self.rhs[cell] = 0
+                self._update(cell)
+
+        if start in self.goals:
+            return "UP"
+        board.expanded += self._compute(board.budget)
+
+        best, best_offset = UNSEEN, None
+        for offset in self.offsets:
+            neighbor = start + offset
+            if not self.blocked[neighbor] and self.g[neighbor] < best:
+                best, best_offset = self.g[neighbor], offset
+        return self.moves[best_offset] if best_offset is not None else None
+
+
+class SessionStore:
+    """Per-game planners with LRU and idle-time eviction."""
+
+    def __init__(self, max_sessions: int = 256, idle_seconds: float = 300.0):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions: "OrderedDict[str, Tuple[float, IncrementalPlanner]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _planner(self, game_id: str, board: Board) -> IncrementalPlanner:
+        now = time.monotonic()
+        with self._lock:
+            # Entries are kept in last-used order, so idle ones sit at the front
+            while self._sessions:
+                oldest_id, (last_used, _) = next(iter(self._sessions.items()))
+                if now - last_used < self.idle_seconds:
+                    break
+                del self._sessions[oldest_id]
+
+            entry = self._sessions.pop(game_id, None)
+            planner = entry[1] if entry else None
+            if planner is None or planner.grid_size != board.grid_size:
+                planner = IncrementalPlanner(board)
+            self._sessions[game_id] = (now, planner)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return planner
+
+    def next_move(self, game_id: str, board: Board) -> Optional[Direction]:
+        """Next move toward the closest food for a game, reusing its last plan."""
+        planner = self._planner(game_id, board)
+        goal = board.cell(*board.closest_food())
+        goals = {goal} if goal != OFF_BOARD else set()
+        return planner.next_move(board, goals)
+
+    def discard(self, game_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(game_id, None)
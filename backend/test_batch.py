@@ -0,0 +1,82 @@
+import random
+
+from fastapi.testclient import TestClient
+
+from batch import wavefront_moves
+from board import Board, PriorityFrontier, QueueFrontier
+import main
+from main import app
+from movetrace import TraceReader, TraceRecorder
+
+
+def random_snake(rng, grid_size, length, occupied):
+    x, y = rng.randrange(grid_size), rng.randrange(grid_size)
+    body = [(x, y)]
+    occupied.add((x, y))
+    for _ in range(length - 1):
+        options = [(x + dx, y + dy) for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0))
+                   if 0 <= x + dx < grid_size and 0 <= y + dy < grid_size
+                   and (x + dx, y + dy) not in occupied]
+        if not options:
+            break
+        x, y = rng.choice(options)
+        body.append((x, y))
+        occupied.add((x, y))
+    return body
+
+
+def random_board(rng, grid_size):
+    occupied = set()
+    ai = random_snake(rng, grid_size, rng.randint(1, grid_size * grid_size // 3), occupied)
+    player = random_snake(rng, grid_size, rng.randint(1, grid_size * grid_size // 3), occupied)
+    food = [(rng.randrange(grid_size), rng.randrange(grid_size)) for _ in range(rng.randint(0, 3))]
+    return Board(grid_size, ai, player, food)
+
+
+def test_wavefront_matches_scalar_searches():
+    rng = random.Random(11)
+    for grid_size in (5, 10, 20, 40):
+        boards = [random_board(rng, grid_size) for _ in range(30)]
+        bfs = [board.first_step(board.closest_food(), QueueFrontier()) for board in boards]
+        dijkstra = [board.first_step(board.closest_food(), PriorityFrontier()) for board in boards]
+        assert wavefront_moves(boards, "bfs") == bfs
+        assert wavefront_moves(boards, "dijkstra") == dijkstra
+
+
+def test_batch_endpoint_matches_single_requests(tmp_path, monkeypatch):
+    # Greedy fallbacks pick randomly among equal options; make that repeatable
+    monkeypatch.setattr(random, "choice", lambda options: options[0])
+    rng = random.Random(12)
+    client = TestClient(app)
+    requests = []
+    for index in range(24):
+        board = random_board(rng, (20, 30)[index % 2])
+        requests.append({
+            "game_state": {
+                "ai_snake": [{"x": x, "y": y} for x, y in board.ai_snake],
+                "player_snake": [{"x": x, "y": y} for x, y in board.player_snake],
+                "food": [{"x": x, "y": y} for x, y in board.food],
+                "grid_size": board.grid_size,
+            },
+            "algorithm": ("bfs", "dijkstra", "astar", "dfs", "greedy", "field")[index % 6],
+        })
+    requests.append({"game_state": {"ai_snake": [], "player_snake": [], "food": [], "grid_size": 20},
+                     "algorithm": "bfs"})
+
+    path = str(tmp_path / "trace.bin")
+    monkeypatch.setattr(main, "recorder", TraceRecorder(path))
+    bfs_moves = lambda: main.metrics.moves.values.get((("algorithm", "bfs"),), 0)
+    bfs_before = bfs_moves()
+    responses = client.post("/api/ai-move/batch", json={"requests": requests}).json()["responses"]
+    assert len(responses) == len(requests)
+    main.recorder.close()
+    # Every game is traced and counted, whether or not it joined a wavefront
+    reader = TraceReader(path)
+    recorded = sorted((entry.algorithm, entry.direction) for entry in reader)
+    assert recorded == sorted((request["algorithm"], response["direction"])
+                              for request, response in zip(requests, responses[:-1]))
+    assert bfs_moves() == bfs_before + 4
+    reader.close()
+    for request, response in zip(requests[:-1], responses):
+        assert response == client.post("/api/ai-move", json=request).json()
+    assert responses[-1]["success"] is False
@@ -0,0 +1,33 @@
+from benchmark import build_fixtures, compare, main
+from board import Board, QueueFrontier
+import main as server
+
+
+def test_fixtures_are_reproducible():
+    first = build_fixtures([20], 2)
+    second = build_fixtures([20], 2)
+    assert first.keys() == second.keys()
+    for name in first:
+        assert [state.model_dump() for state in first[name]] == [state.model_dump() for state in second[name]]
+
+
+def test_unreachable_fixture_has_no_path_to_food():
+    for state in build_fixtures([20, 30], 3)["30x30/unreachable/short"]:
+        board = Board.from_game_state(state)
+        target = board.closest_food()
+        assert board.first_step(target, QueueFrontier()) is None
+
+
+def test_compare_flags_regressions(tmp_path):
+    max_entries = server.move_cache.max_entries
+    output = tmp_path / "results.json"
+    assert main(["--repeat", "1", "--boards", "1", "--filter", "20x20/open/short",
+                 "--output", str(output)]) == 0
+    assert main(["--repeat", "1", "--boards", "1", "--filter", "20x20/open/short",
+                 "--compare", str(output), "--threshold", "1000"]) == 0
+    # The endpoint benchmark turns the shared move cache off only while it runs
+    assert server.move_cache.max_entries == max_entries
+
+    baseline = {"bfs/20x20": {"p50_ms": 1.0}}
+    assert compare({"bfs/20x20": {"p50_ms": 2.0}}, baseline, 1.25)
+    assert not compare({"bfs/20x20": {"p50_ms": 1.1}}, baseline, 1.25)
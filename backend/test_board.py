@@ -0,0 +1,199 @@
+import time
+
+from algorithms import PathfindingAlgorithms, ensure_safe
+from board import Board, Budget, OFF_BOARD, UNSEEN, QueueFrontier, StackFrontier, PriorityFrontier
+from main import compute_move
+from models import Position, GameStateInput
+
+
+def make_state(ai_snake, player_snake, food, grid_size=20):
+    return GameStateInput(
+        ai_snake=[Position(x=x, y=y) for x, y in ai_snake],
+        player_snake=[Position(x=x, y=y) for x, y in player_snake],
+        food=[Position(x=x, y=y) for x, y in food],
+        grid_size=grid_size,
+    )
+
+
+def test_cells_round_trip_and_borders():
+    board = Board(20, [(5, 5)], [], [])
+    assert board.xy(board.cell(0, 0)) == (0, 0)
+    assert board.xy(board.cell(19, 7)) == (19, 7)
+    assert board.cell(-1, 10) == OFF_BOARD
+    assert board.cell(10, 20) == OFF_BOARD
+    assert board.safe_directions(0, 0) == ["DOWN", "RIGHT"]
+    assert board.safe_directions(19, 10) == ["UP", "DOWN", "LEFT"]
+
+
+def test_tail_is_not_an_obstacle():
+    board = Board(20, [(5, 5), (5, 6), (5, 7)], [(8, 8)], [])
+    assert board.blocked[board.cell(5, 5)]
+    assert board.blocked[board.cell(5, 6)]
+    assert not board.blocked[board.cell(5, 7)]
+    assert board.blocked[board.cell(8, 8)]
+
+
+def test_search_rebuilds_path_from_parents():
+    # A wall at the head end of a snake that stays put longer than any path here
+    wall = [(1, 0), (1, 1), (1, 2), (1, 3)] + [(4, y) for y in range(5)]
+    board = Board(5, [(0, 0)], wall, [])
+    start, goal = board.cell(0, 0), board.cell(2, 0)
+    for frontier in (QueueFrontier(), StackFrontier(), PriorityFrontier()):
+        path = board.search(start, goal, frontier)
+        assert path[-1] == goal
+        assert board.xy(path[0]) == (0, 1)
+    # BFS and Dijkstra return the shortest way around the wall
+    assert len(board.search(start, goal, QueueFrontier())) == 10
+    assert len(board.search(start, goal, PriorityFrontier())) == 10
+
+
+def test_search_passes_through_cells_vacated_on_arrival():
+    # The player's tail end leaves (1, 3) after two moves and (1, 2) after three
+    board = Board(5, [(0, 0)], [(1, 0), (1, 1), (1, 2), (1, 3)], [])
+    assert board.vacate[board.cell(1, 3)] == 2 and board.vacate[board.cell(1, 0)] == 5
+    start, goal = board.cell(0, 0), board.cell(2, 0)
+    for frontier in (QueueFrontier(), PriorityFrontier(board.manhattan_to((2, 0)))):
+        path = board.search(start, goal, frontier)
+        assert len(path) == 6 and [board.xy(cell) for cell in path[:3]] == [(0, 1), (0, 2), (1, 2)]
+    # Its own body is left behind one cell per move; the tail is free at once
+    board = Board(5, [(2, 2), (2, 3), (1, 3), (1, 2)], [], [])
+    assert board.vacate == {board.cell(2, 2): 4, board.cell(2, 3): 3, board.cell(1, 3): 2}
+    assert not board.safe_directions(2, 2).count("DOWN")
+
+
+def test_unreachable_food_falls_back_to_greedy():
+    # Food boxed in by the head end of a player snake too long to move away in time
+    state = make_state(
+        [(0, 0), (0, 1)],
+        [(9, 10), (11, 10), (10, 9), (10, 11)] + [(x, y) for y in (18, 19) for x in range(20)],
+        [(10, 10)],
+    )
+    greedy = PathfindingAlgorithms.greedy_move(state)
+    for move in (PathfindingAlgorithms.bfs_move, PathfindingAlgorithms.dijkstra_move,
+                 PathfindingAlgorithms.astar_move):
+        assert move(state) == greedy
+    # DFS winds around for so long that the player is gone by the time it arrives
+    board = Board.from_game_state(state)
+    path = board.search(board.cell(0, 0), board.cell(10, 10), StackFrontier())
+    assert len(path) > board.vacate[board.cell(10, 11)]
+
+
+def test_known_moves_are_unchanged():
+    state = make_state([(10, 10), (11, 10), (12, 10)], [(5, 10), (4, 10), (3, 10)], [(10, 5)])
+    assert PathfindingAlgorithms.bfs_move(state) == "UP"
+    assert PathfindingAlgorithms.dfs_move(state) == "LEFT"
+    assert PathfindingAlgorithms.dijkstra_move(state) == "UP"
+    assert PathfindingAlgorithms.astar_move(state) == "UP"
+
+    # Several equally short routes: each frontier keeps its original tie-breaking
+    state = make_state([(10, 10), (10, 11)], [], [(12, 8)])
+    assert PathfindingAlgorithms.bfs_move(state) == "UP"
+    assert PathfindingAlgorithms.dfs_move(state) == "RIGHT"
+    assert PathfindingAlgorithms.dijkstra_move(state) == "UP"
+    assert PathfindingAlgorithms.astar_move(state) == "UP"
+
+
+def test_compiled_board_is_accepted_by_every_algorithm():
+    state = make_state([(19, 10), (18, 10), (17, 10)], [(5, 10), (4, 10), (3, 10)], [(10, 5)])
+    board = Board.from_game_state(state)
+    assert Board.of(board) is board
+    for name in ("greedy_move", "bfs_move", "dfs_move", "dijkstra_move", "astar_move"):
+        move = getattr(PathfindingAlgorithms, name)
+        assert move(board) == move(state)
+        assert move(board) != "RIGHT"
+
+
+def test_distance_field_heads_for_the_food_nearest_by_path():
+    # The Manhattan-closest food at (10, 5) sits behind a wall; (10, 16) is nearer by path
+    # The wall is the head end of a snake that stays put longer than the way around
+    wall = [(x, 8) for x in range(0, 20)] + [(x, 19) for x in range(20)]
+    state = make_state([(10, 10), (10, 11), (10, 12)], wall, [(10, 5), (10, 16)])
+    board = Board.from_game_state(state)
+    distance = board.distance_field()
+    assert distance[board.cell(10, 16)] == 0
+    assert distance[board.cell(10, 9)] == 9
+    assert distance[board.cell(10, 5)] == 0
+    assert distance[board.cell(0, 8)] == UNSEEN
+    assert PathfindingAlgorithms.distance_field_move(state) == "LEFT"
+
+    # BFS searches toward (10, 5), fails and falls back to the field instead of greedy
+    assert PathfindingAlgorithms.greedy_move(state) != "LEFT"
+    for move in (PathfindingAlgorithms.bfs_move, PathfindingAlgorithms.dijkstra_move,
+                 PathfindingAlgorithms.astar_move):
+        assert move(state) == "LEFT"
+
+
+def test_nearest_food_step_handles_edge_cases():
+    assert Board(10, [(3, 3)], [], [(3, 3)]).nearest_food_step() == "UP"
+    assert Board(10, [(3, 3)], [], []).nearest_food_step() is None
+    assert Board(10, [(3, 3), (3, 4)], [], [(3, 1)]).nearest_food_step() == "UP"
+    assert Board(10, [(3, 3), (3, 4), (3, 5)], [], [(6, 4)]).nearest_food_step() == "RIGHT"
+
+
+def test_region_sizes_are_labelled_once_and_shared():
+    # The player's body splits a 10x10 grid into a 3-column pocket and the rest
+    wall = [(3, y) for y in range(10)]
+    board = Board(10, [(4, 5), (5, 5), (6, 5)], wall, [])
+    assert board.region_size(board.cell(0, 0)) == 30
+    assert board.region_size(board.cell(9, 9)) == 58
+    assert board.region_size(board.cell(3, 3)) == 0
+    assert board.region_size(OFF_BOARD) == 0
+    assert board.room_after("UP") == board.room_after("DOWN") == 58
+    assert len(board.region_sizes) == 3
+
+
+def test_avoid_traps_steps_around_small_pockets():
+    # The food sits at the end of a four-cell corridor; the snake is five long
+    player = [(4, 0), (4, 1), (4, 2), (4, 3), (2, 0), (2, 1), (2, 2), (2, 3)]
+    state = make_state([(3, 4), (3, 5), (3, 6), (3, 7), (3, 8)], player, [(3, 0)])
+    board = Board.from_game_state(state)
+    assert board.room_after("UP") == 4
+    assert PathfindingAlgorithms.bfs_move(state) == "UP"
+    assert PathfindingAlgorithms.avoid_traps(state, "UP") == "LEFT"
+    # Moves with enough room are left alone
+    assert PathfindingAlgorithms.avoid_traps(state, "RIGHT") == "RIGHT"
+
+    # The server applies the check only when asked to
+    assert compute_move(Board.from_game_state(state), "bfs") == "UP"
+    assert compute_move(Board.from_game_state(state), "bfs", avoid_traps=True) == "LEFT"
+
+
+def test_ensure_safe_reports_each_override():
+    player = [(4, 0), (4, 1), (4, 2), (4, 3), (2, 0), (2, 1), (2, 2), (2, 3)]
+    board = Board.from_game_state(make_state([(3, 4), (3, 5), (3, 6), (3, 7), (3, 8)], player, [(3, 0)]))
+    overrides = []
+    report = lambda *override: overrides.append(override)
+    # Backwards into its own body, then the first safe move leads into the pocket
+    assert ensure_safe(board, "DOWN", on_override=report) == "UP"
+    assert ensure_safe(board, "DOWN", avoid_traps=True, on_override=report) == "LEFT"
+    assert overrides == [("unsafe", "DOWN", "UP"), ("unsafe", "DOWN", "UP"), ("trap", "UP", "LEFT")]
+
+
+def test_budget_returns_best_move_so_far():
+    board = Board(40, [(0, 0), (0, 1), (0, 2)], [], [(39, 39)])
+    assert PathfindingAlgorithms.bfs_move(board) == "RIGHT"
+    assert not board.limited
+
+    for move in (PathfindingAlgorithms.bfs_move, PathfindingAlgorithms.dfs_move,
+                 PathfindingAlgorithms.dijkstra_move, PathfindingAlgorithms.astar_move):
+        board = Board(40, [(0, 0), (0, 1), (0, 2)], [], [(39, 39)])
+        board.budget = Budget(nodes=20)
+        assert move(board) == "RIGHT"
+        assert board.limited
+        assert board.expanded <= 20
+
+    # The partial path ends at the reached cell nearest the goal
+    board = Board(40, [(0, 0)], [], [])
+    board.budget = Budget(nodes=5)
+    path = board.search(board.cell(0, 0), board.cell(39, 0), QueueFrontier())
+    assert board.limited and path[-1] == board.cell(2, 0)
+
+
+def test_time_budget_caps_large_searches():
+    board = Board(200, [(0, 0), (0, 1), (0, 2)], [], [(199, 199)])
+    board.budget = Budget(seconds=0.002)
+    started = time.perf_counter()
+    # A* itself; astar_move takes jump point search on a grid this large
+    assert board.first_step((199, 199), PriorityFrontier(board.manhattan_to((199, 199)))) == "RIGHT"
+    assert time.perf_counter() - started < 0.05
+    assert board.limited
@@ -0,0 +1,86 @@
+import random
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+STEPS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+
+
+def move_snake(snake, direction):
+    dx, dy = STEPS[direction]
+    return [(snake[0][0] + dx, snake[0][1] + dy)] + snake[:-1]
+
+
+def as_state(ai_snake, player_snake, food, grid_size):
+    return {
+        "ai_snake": [{"x": x, "y": y} for x, y in ai_snake],
+        "player_snake": [{"x": x, "y": y} for x, y in player_snake],
+        "food": [{"x": x, "y": y} for x, y in food],
+        "grid_size": grid_size,
+    }
+
+
+def test_channel_matches_full_state_requests():
+    rng = random.Random(3)
+    client = TestClient(app)
+    grid_size = 20
+    player = [(5, 10), (4, 10), (3, 10)]
+    ai = [(15, 10), (16, 10), (17, 10)]
+    food = [(10, 4), (14, 9), (12, 12)]
+    player_direction = "RIGHT"
+    player_grew = ai_grew = False
+    synced_food = None
+
+    with client.websocket_connect("/api/ws") as websocket:
+        for tick in range(200):
+            # Player wanders randomly but avoids walls and snakes when it can
+            options = [d for d in STEPS if move_snake(player, d)[0] not in player + ai
+                       and all(0 <= v < grid_size for v in move_snake(player, d)[0])]
+            if not options:
+                break
+            player_direction = rng.choice(options)
+            player = move_snake(player, player_direction)
+
+            state = as_state(ai, player, food, grid_size)
+            # With a game id of its own, so both are planned the same way
+            expected = client.post("/api/ai-move", json={"game_state": state, "algorithm": "bfs",
+                                                         "game_id": "channel-mirror"}).json()
+            if synced_food is None:
+                websocket.send_json({"type": "start", "game_state": state, "algorithm": "bfs"})
+            else:
+                websocket.send_json({
+                    "player_head": list(player[0]),
+                    "player_grew": player_grew,
+                    "ai_grew": ai_grew,
+                    "food_added": [list(f) for f in food if f not in synced_food],
+                    "food_removed": [list(f) for f in synced_food if f not in food],
+                })
+            synced_food = list(food)
+            reply = websocket.receive_json()
+            assert reply == {"direction": expected["direction"], "tick": tick, "complete": True}
+
+            ai = move_snake(ai, reply["direction"])
+            player_grew = player[0] in food
+            ai_grew = ai[0] in food
+            if player_grew:
+                player = player + [player[-1]]
+            if ai_grew:
+                ai = ai + [ai[-1]]
+            if player_grew or ai_grew:
+                food = [f for f in food if f not in (player[0], ai[0])]
+                while len(food) < 3:
+                    cell = (rng.randrange(grid_size), rng.randrange(grid_size))
+                    if cell not in player and cell not in ai:
+                        food.append(cell)
+
+
+def test_channel_reports_protocol_errors():
+    client = TestClient(app)
+    with client.websocket_connect("/api/ws") as websocket:
+        websocket.send_json({"player_head": [1, 1]})
+        assert "error" in websocket.receive_json()
+        websocket.send_json({"type": "start", "game_state": as_state([(3, 3)], [], [], 10), "algorithm": "greedy"})
+        assert websocket.receive_json()["tick"] == 0
+        websocket.send_json({"player_head": "nowhere"})
+        assert "error" in websocket.receive_json()
@@ -0,0 +1,55 @@
+import random
+
+from engine import Game, grow_snake, move_snake
+from tournament import run_tournament
+
+
+def test_initial_state_matches_frontend():
+    game = Game(20, random.Random(0))
+    assert game.player_snake == [(5, 10), (4, 10), (3, 10)]
+    assert game.ai_snake == [(15, 10), (16, 10), (17, 10)]
+    assert len(game.food) == 1
+    assert len(Game(30).food) == 2
+    assert len(Game(40).food) == 3
+
+
+def test_growth_keeps_the_duplicated_tail():
+    snake = grow_snake(move_snake([(5, 10), (4, 10), (3, 10)], "RIGHT"))
+    assert snake == [(6, 10), (5, 10), (4, 10), (4, 10)]
+    assert move_snake(snake, "RIGHT") == [(7, 10), (6, 10), (5, 10), (4, 10)]
+
+
+def test_eating_grows_scores_and_respawns_food():
+    game = Game(20, random.Random(0))
+    game.food = [(6, 10)]
+    game.step("RIGHT", lambda board: "UP")
+    assert game.score == {"player": 1, "ai": 0}
+    assert len(game.player_snake) == 4
+    assert len(game.food) == 1 and game.food[0] not in game.player_snake + game.ai_snake
+
+
+def test_player_cannot_reverse_and_walls_end_the_game():
+    game = Game(20, random.Random(0))
+    game.step("LEFT", lambda board: "UP")
+    assert game.player_direction == "RIGHT"
+    assert game.player_snake[0] == (6, 10)
+
+    game.ai_snake = [(0, 0), (1, 0), (2, 0)]
+    game.step("RIGHT", lambda board: "UP")
+    assert game.game_over and game.winner == "player"
+
+
+def test_head_on_collision_is_a_tie():
+    game = Game(20, random.Random(0))
+    game.ai_snake = [(7, 10), (8, 10), (9, 10)]
+    game.step("RIGHT", lambda board: "LEFT")
+    assert game.winner == "tie"
+
+
+def test_tournament_reports_both_algorithms():
+    report = run_tournament("greedy", "bfs", games=4, grid_sizes=[20], workers=1, max_ticks=300)
+    assert report["games"] == 4
+    assert set(report["algorithms"]) == {"greedy", "bfs"}
+    outcomes = sum(stats["wins"] for stats in report["algorithms"].values())
+    assert outcomes + report["ties"] + report["timeouts"] == 4
+    assert report["moves_per_second"] > 0
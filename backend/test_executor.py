@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from algorithms import PathfindingAlgorithms
+from board import Board
+from executor import MoveExecutor, Overloaded, run_search
+from main import app
+from metrics import Metrics
+from movecache import MoveCache
+
+STATE = {
+    "ai_snake": [{"x": 5, "y": 5}, {"x": 5, "y": 6}, {"x": 5, "y": 7}],
+    "player_snake": [{"x": 10, "y": 10}, {"x": 10, "y": 11}],
+    "food": [{"x": 15, "y": 2}],
+    "grid_size": 20,
+}
+
+
+def test_pool_admission_and_deadline():
+    executor = MoveExecutor("thread", workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(Overloaded):
+            await executor.run(sum, [1, 2])
+        release.set()
+        assert await blocked is True
+        assert await executor.run(sum, [1, 2]) == 3
+        release.clear()
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(release.wait, 5, timeout=0.01)
+        release.set()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_process_pool_reports_the_search():
+    def board():
+        return Board(20, [(5, 5), (5, 6), (5, 7)], [(10, 10), (10, 11)], [(15, 2)])
+
+    executor = MoveExecutor("process", workers=1)
+    try:
+        result = asyncio.run(executor.run(run_search, PathfindingAlgorithms.bfs_move, board()))
+    finally:
+        executor.shutdown()
+    assert result == run_search(PathfindingAlgorithms.bfs_move, board())
+
+
+def test_endpoint_runs_on_a_thread_pool_and_sheds_load(monkeypatch):
+    monkeypatch.setattr(main, "metrics", Metrics())
+    monkeypatch.setattr(main, "move_cache", MoveCache(max_entries=0))
+    client = TestClient(app)
+    body = {"game_state": STATE, "algorithm": "astar"}
+    expected = client.post("/api/ai-move", json=body).json()
+
+    executor = MoveExecutor("thread", workers=2)
+    monkeypatch.setattr(main, "executor", executor)
+    try:
+        assert client.post("/api/ai-move", json=body).json() == expected
+
+        # No room in the queue: a quick move, flagged as incomplete
+        executor.max_pending = 0
+        response = client.post("/api/ai-move", json=body).json()
+        assert response["success"] and not response["complete"]
+        assert response["direction"] in Board.from_game_state(
+            main.AIRequest.model_validate(body).game_state).safe_directions(5, 5)
+    finally:
+        executor.shutdown()
+    assert 'snake_shed_total{reason="overloaded"} 1' in client.get("/api/metrics").text
+
+
+def test_deadline_stops_the_search(monkeypatch):
+    monkeypatch.setattr(main, "REQUEST_DEADLINE_MS", 1e-6)
+    monkeypatch.setattr(main, "move_cache", MoveCache(max_entries=0))
+    response = TestClient(app).post("/api/ai-move", json={"game_state": STATE, "algorithm": "bfs"}).json()
+    assert response["success"] and not response["complete"]
@@ -0,0 +1,55 @@
+import hamiltonian
+from algorithms import PathfindingAlgorithms
+from board import Board
+from hamiltonian import build_cycle, hamiltonian_cycle
+
+
+def test_cycle_visits_every_cell_once_and_closes():
+    for grid_size in (2, 4, 20, 30, 40):
+        path = build_cycle(grid_size)
+        assert len(path) == len(set(path)) == grid_size * grid_size
+        for (x1, y1), (x2, y2) in zip(path, path[1:] + path[:1]):
+            assert abs(x1 - x2) + abs(y1 - y2) == 1
+    assert build_cycle(21) is None
+    assert hamiltonian_cycle(21) is None
+
+
+def test_cycle_index_matches_order():
+    order, index = hamiltonian_cycle(20)
+    assert all(index[cell] == position for position, cell in enumerate(order))
+    board = Board(20, [(0, 0)], [], [])
+    assert index[board.cell(0, 0)] == 0
+    assert sum(1 for position in index if position == -1) == 22 * 22 - 400
+
+
+def test_cycle_is_persisted_and_reloaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(hamiltonian, "CACHE_DIR", str(tmp_path))
+    hamiltonian_cycle.cache_clear()
+    try:
+        built = hamiltonian_cycle(12)
+        assert (tmp_path / "hamiltonian-12.bin").exists()
+        hamiltonian_cycle.cache_clear()
+        assert hamiltonian_cycle(12) == built
+
+        # A corrupt file is ignored and the cycle rebuilt
+        (tmp_path / "hamiltonian-12.bin").write_bytes(b"\x00" * 12)
+        hamiltonian_cycle.cache_clear()
+        assert hamiltonian_cycle(12) == built
+    finally:
+        hamiltonian_cycle.cache_clear()
+
+
+def test_hamiltonian_move_follows_cycle_and_takes_shortcuts():
+    # Head at the start of row 1's zigzag, food straight below it
+    board = Board(10, [(9, 1), (9, 0), (8, 0)], [], [(9, 5)])
+    assert PathfindingAlgorithms.hamiltonian_move(board) == "DOWN"
+
+    # Cutting DOWN toward the food would skip past its own body on the cycle
+    board = Board(10, [(5, 3), (6, 3), (6, 4), (6, 5)], [], [(5, 5)])
+    assert PathfindingAlgorithms.hamiltonian_move(board) == "LEFT"
+    board = Board(10, [(5, 3), (6, 3), (7, 3), (8, 3)], [], [(5, 5)])
+    assert PathfindingAlgorithms.hamiltonian_move(board) == "DOWN"
+
+    # Odd grids have no cycle and still get a safe move
+    board = Board(11, [(5, 5), (5, 6), (5, 7)], [], [(5, 1)])
+    assert PathfindingAlgorithms.hamiltonian_move(board) == "UP"
@@ -0,0 +1,58 @@
+import random
+import time
+
+from algorithms import PathfindingAlgorithms
+from benchmark import random_walk
+from board import Board, Budget, PriorityFrontier
+from jps import jump_point_search, path_length
+
+
+def assert_same_lengths_as_astar(board: Board, head, food):
+    # Jump point search plans around the bodies as they are now, so A* must too
+    board.vacate.clear()
+    start, goal = board.cell(*head), board.cell(*food)
+    path = board.search(start, goal, PriorityFrontier(board.manhattan_to(food)))
+    points = jump_point_search(board, start, goal)
+    assert (path is None) == (points is None)
+    if points is not None:
+        assert path_length(board, start, points) == len(path)
+        # Consecutive jump points are joined by free straight runs
+        previous = start
+        for point in points:
+            (x0, y0), (x1, y1) = board.xy(previous), board.xy(point)
+            assert x0 == x1 or y0 == y1
+            run = [(x, y) for x in range(min(x0, x1), max(x0, x1) + 1) for y in range(min(y0, y1), max(y0, y1) + 1)]
+            assert all(board.is_free(x, y) for x, y in run if (x, y) != head)
+            previous = point
+
+
+def test_paths_are_as_short_as_astar():
+    for seed in range(400):
+        rng = random.Random(seed)
+        size = rng.choice([4, 7, 12, 25])
+        walls = [(x, y) for x in range(size) for y in range(size) if rng.random() < 0.35 * rng.random() * 2]
+        free = [(x, y) for x in range(size) for y in range(size) if (x, y) not in set(walls)]
+        if len(free) >= 2:
+            head, food = rng.sample(free, 2)
+            assert_same_lengths_as_astar(Board(size, [head], walls, [food]), head, food)
+
+
+def test_large_arenas_use_jump_point_search():
+    rng, occupied = random.Random(7), set()
+    snakes = [random_walk(rng, 400, 1200, occupied) for _ in range(8)]
+    food = [(x, y) for x, y in ((rng.randrange(400), rng.randrange(400)) for _ in range(50))
+            if (x, y) not in occupied]
+    board = Board(400, snakes[0], [cell for snake in snakes[1:] for cell in snake], food)
+    assert_same_lengths_as_astar(board, board.head, board.closest_food())
+
+    board.expanded = 0
+    started = time.perf_counter()
+    direction = PathfindingAlgorithms.astar_move(board)
+    assert time.perf_counter() - started < 0.05
+    assert direction in board.safe_directions(*board.head) and board.expanded < 1000
+
+    # Out of budget, the way to the jump point nearest the food
+    board = Board(400, [(0, 0), (0, 1)], [(x, 50) for x in range(1, 400)], [(399, 399)])
+    board.budget = Budget(nodes=2)
+    assert jump_point_search(board, board.cell(0, 0), board.cell(399, 399)) == [board.cell(0, 51)]
+    assert board.limited
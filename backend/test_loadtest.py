@@ -0,0 +1,27 @@
+import json
+
+from loadtest import capacity, main
+
+
+def test_capacity_is_the_largest_level_that_keeps_up():
+    levels = [{"games": 10, "p99_ms": 5.0, "missed_rate": 0.0},
+              {"games": 50, "p99_ms": 80.0, "missed_rate": 0.005},
+              {"games": 100, "p99_ms": 90.0, "missed_rate": 0.2},
+              {"games": 200, "p99_ms": 400.0, "missed_rate": 0.6}]
+    assert capacity(levels, 100, 0.01) == 50
+    assert capacity(levels, 50, 0.01) == 10
+    assert capacity(levels[2:], 100, 0.01) == 0
+
+
+def test_sweep_plays_games_against_a_server(tmp_path):
+    output = tmp_path / "curves.json"
+    assert main(["--games", "2", "4", "--duration", "1", "--warmup", "0.3", "--clients", "1",
+                 "--tick-ms", "50", "--algorithms", "astar,greedy", "--output", str(output)]) == 0
+    result = json.loads(output.read_text())
+    levels = result["curves"]["1"]
+    assert [level["games"] for level in levels] == [2, 4]
+    for level in levels:
+        assert level["error_rate"] == 0 and level["games_played"] >= level["games"]
+        # Roughly a move per game per tick
+        assert level["moves_per_second"] >= level["games"] * 10
+    assert result["capacity"]["1"] in (0, 2, 4)
@@ -0,0 +1,94 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from main import app
+from metrics import Histogram, Metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", (0.1, 1.0))
+    labels = (("algorithm", "bfs"),)
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, labels)
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{algorithm="bfs",le="0.1"} 2',
+        'latency_seconds_bucket{algorithm="bfs",le="1.0"} 3',
+        'latency_seconds_bucket{algorithm="bfs",le="+Inf"} 4',
+        'latency_seconds_sum{algorithm="bfs"} 2.65',
+        'latency_seconds_count{algorithm="bfs"} 4',
+    ]
+
+
+def test_moves_are_counted_and_exposed(monkeypatch):
+    monkeypatch.setattr(main, "metrics", Metrics())
+    client = TestClient(app)
+    state = {
+        "ai_snake": [{"x": 10, "y": 10}, {"x": 11, "y": 10}, {"x": 12, "y": 10}],
+        # Boxed in at (0, 0) by the head end of a player too long to move away in time: BFS falls back
+        "player_snake": ([{"x": 1, "y": 0}, {"x": 0, "y": 1}, {"x": 1, "y": 1}]
+                         + [{"x": x, "y": 19} for x in range(20)]),
+        "food": [{"x": 0, "y": 0}],
+        "grid_size": 20,
+    }
+    client.post("/api/ai-move", json={"game_state": state, "algorithm": "bfs"})
+    # Cornered: no safe move at all
+    cornered = {
+        "ai_snake": [{"x": 0, "y": 0}, {"x": 1, "y": 0}, {"x": 2, "y": 0}],
+        "player_snake": [{"x": 0, "y": 1}],
+        "food": [{"x": 5, "y": 5}],
+        "grid_size": 20,
+    }
+    client.post("/api/ai-move", json={"game_state": cornered, "algorithm": "greedy"})
+
+    text = client.get("/api/metrics").text
+    assert 'snake_moves_total{algorithm="bfs"} 1' in text
+    assert 'snake_moves_total{algorithm="greedy"} 1' in text
+    assert 'snake_fallbacks_total{algorithm="bfs"} 1' in text
+    assert 'snake_safety_overrides_total{reason="no_safe_move"} 1' in text
+    assert 'snake_move_seconds_count{algorithm="bfs"} 1' in text
+    assert 'snake_request_parse_seconds_count{endpoint="ai-move"} 2' in text
+    assert 'snake_nodes_expanded_bucket{algorithm="greedy",le="0"} 1' in text
+
+
+def test_profiler_is_opt_in(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(main, "PROFILER_ENABLED", False)
+    assert client.post("/api/profiler/start").status_code == 403
+
+    monkeypatch.setattr(main, "PROFILER_ENABLED", True)
+    try:
+        assert client.post("/api/profiler/start", params={"interval_ms": 1}).json()["running"]
+        deadline = time.time() + 0.5
+        while time.time() < deadline and main.profiler.samples < 5:
+            time.sleep(0.01)
+        status = client.post("/api/profiler/stop").json()
+        assert not status["running"] and status["samples"] >= 5
+        assert "test_profiler_is_opt_in" in client.get("/api/profiler").text
+    finally:
+        main.profiler.stop()
+
+
+def test_budget_limited_moves_are_reported(monkeypatch):
+    monkeypatch.setattr(main, "metrics", Metrics())
+    client = TestClient(app)
+    state = {
+        "ai_snake": [{"x": 0, "y": 0}, {"x": 0, "y": 1}, {"x": 0, "y": 2}],
+        "player_snake": [],
+        "food": [{"x": 39, "y": 39}],
+        "grid_size": 40,
+    }
+    response = client.post("/api/ai-move", json={"game_state": state, "algorithm": "dfs", "node_budget": 10}).json()
+    assert response == {"direction": "RIGHT", "success": True, "error": None, "complete": False}
+    response = client.post("/api/ai-move", json={"game_state": state, "algorithm": "dfs"}).json()
+    assert response["complete"] is True
+    assert client.post("/api/ai-move", json={"game_state": state, "algorithm": "dfs",
+                                             "time_budget_ms": 0}).status_code == 422
+
+    batch = client.post("/api/ai-move/batch", json={"requests": [
+        {"game_state": state, "algorithm": "bfs", "node_budget": 10},
+        {"game_state": state, "algorithm": "bfs"},
+    ]}).json()["responses"]
+    assert [response["complete"] for response in batch] == [False, True]
+    assert 'snake_budget_limited_total{algorithm="dfs"} 1' in client.get("/api/metrics").text
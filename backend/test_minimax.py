@@ -0,0 +1,62 @@
+from fastapi.testclient import TestClient
+
+from algorithms import PathfindingAlgorithms
+from benchmark import build_fixtures
+from board import Board, Budget
+from main import app
+from minimax import NODE_LIMIT, WIN, OutOfNodes, Search, minimax_direction
+
+
+def test_takes_food_the_player_can_no_longer_reach_first():
+    # The player has already made this tick's move, so the food is the AI's;
+    # a player that follows it onto the AI's new head dies
+    board = Board(20, [(5, 5), (4, 5), (3, 5)], [(7, 5), (8, 5), (9, 5)], [(6, 5)])
+    assert PathfindingAlgorithms.astar_move(board) == "RIGHT"
+    assert minimax_direction(board) == "RIGHT"
+    # Stepping onto the player's new head is a head-on collision
+    board = Board(20, [(5, 5), (4, 5), (3, 5)], [(6, 5), (7, 5), (8, 5)], [(9, 5)])
+    assert minimax_direction(board) in ("UP", "DOWN")
+
+
+def test_sees_that_a_cornered_player_is_lost():
+    # The player's only way out of the corner, (1, 0), is under the AI's body
+    board = Board(10, [(2, 0), (1, 0), (1, 1), (1, 2)], [(0, 0), (0, 1), (0, 2)], [(9, 9)])
+    search = Search(board)
+    value, move = search.max_node(2, -WIN - 1, WIN + 1)
+    assert value > WIN // 2 and board.moves[move] in board.safe_directions(2, 0)
+
+
+def test_search_restores_the_position_and_stops_at_its_node_limit():
+    for states in build_fixtures([40], 2).values():
+        board = Board.from_game_state(states[0])
+        search = Search(board, 500)
+        blocked, ai, position = bytes(search.blocked), list(search.ai), search.hash
+        try:
+            for depth in range(1, 4):
+                search.max_node(depth, -WIN - 1, WIN + 1)
+        except OutOfNodes:
+            pass
+        assert (bytes(search.blocked), list(search.ai), search.hash) == (blocked, ai, position)
+        assert search.hash == search._hash()
+
+        # The same board gets the same move, from a search of the same size
+        boards = [Board.from_game_state(states[0]) for _ in range(2)]
+        assert minimax_direction(boards[0]) == minimax_direction(boards[1])
+        assert boards[0].expanded == boards[1].expanded <= NODE_LIMIT and not boards[0].limited
+        # A request budget that stops it first marks the move as limited
+        if boards[0].expanded > 128:
+            budgeted = Board.from_game_state(states[0])
+            budgeted.budget = Budget(nodes=128)
+            minimax_direction(budgeted)
+            assert budgeted.limited
+
+
+def test_minimax_is_served_by_the_endpoint():
+    state = {
+        "ai_snake": [{"x": 5, "y": 5}, {"x": 4, "y": 5}, {"x": 3, "y": 5}],
+        "player_snake": [{"x": 7, "y": 5}, {"x": 8, "y": 5}, {"x": 9, "y": 5}],
+        "food": [{"x": 6, "y": 5}],
+        "grid_size": 20,
+    }
+    response = TestClient(app).post("/api/ai-move", json={"game_state": state, "algorithm": "minimax"}).json()
+    assert response["success"] and response["direction"] == "RIGHT"
@@ -0,0 +1,70 @@
+from fastapi.testclient import TestClient
+
+import main
+from algorithms import PathfindingAlgorithms
+from board import Board
+from main import app
+from metrics import Metrics
+from movecache import MoveCache, board_hash, toggle
+
+
+def make_board(food=((0, 0),)):
+    return Board(20, [(5, 5), (5, 6), (5, 7)], [(10, 10), (10, 11), (11, 11)], list(food))
+
+
+def test_hash_covers_the_position_and_updates_incrementally():
+    board = make_board(food=[(0, 0), (3, 3)])
+    value = board_hash(board, "astar")
+    assert value == board_hash(make_board(food=[(3, 3), (0, 0)]), "astar")
+    assert value != board_hash(board, "bfs")
+    assert value != board_hash(Board(20, [(5, 5), (5, 6), (5, 7), (5, 7)], board.player_snake, board.food), "astar")
+
+    # The food at (3, 3) is eaten: one toggle instead of rehashing the board
+    eaten = toggle(value, 20, "food", board.cell(3, 3))
+    assert eaten == board_hash(make_board(food=[(0, 0)]), "astar")
+
+
+def test_hash_tells_apart_the_same_cells_in_another_order():
+    # Both snakes cover the same cells, but they leave them in a different
+    # order, so the searches take different ways to the food
+    first = Board(5, [(2, 3), (1, 3), (0, 3), (0, 2), (1, 2), (2, 2), (2, 1), (1, 1), (0, 1)], [], [(0, 0)])
+    second = Board(5, [(2, 3), (2, 2), (2, 1), (1, 1), (1, 2), (1, 3), (0, 3), (0, 2), (0, 1)], [], [(0, 0)])
+    assert (PathfindingAlgorithms.bfs_move(first), PathfindingAlgorithms.bfs_move(second)) == ("RIGHT", "DOWN")
+    assert board_hash(first, "bfs") != board_hash(second, "bfs")
+
+
+def test_lru_eviction_and_collision_check():
+    cache = MoveCache(max_entries=2)
+    cache.put(1, "UP")
+    cache.put(2, "DOWN")
+    assert cache.get(1) == "UP"
+    cache.put(3, "LEFT")  # Evicts 2, the least recently used
+    assert cache.get(2) is None and cache.get(3) == "LEFT"
+
+    # Same index, different check bits
+    assert cache.get(1 | (5 << 64)) is None
+    assert cache.stats() == {"size": 2, "max_entries": 2, "hits": 2, "misses": 2,
+                             "collisions": 1, "evictions": 1}
+
+
+def test_repeated_boards_are_served_from_the_cache(monkeypatch):
+    monkeypatch.setattr(main, "move_cache", MoveCache())
+    monkeypatch.setattr(main, "metrics", Metrics())
+    client = TestClient(app)
+    state = {
+        "ai_snake": [{"x": 5, "y": 5}, {"x": 5, "y": 6}, {"x": 5, "y": 7}],
+        "player_snake": [{"x": 10, "y": 10}],
+        "food": [{"x": 15, "y": 2}],
+        "grid_size": 20,
+    }
+    first = client.post("/api/ai-move", json={"game_state": state, "algorithm": "astar"}).json()
+    second = client.post("/api/ai-move", json={"game_state": state, "algorithm": "astar"}).json()
+    assert first == second
+    # Random moves are never cached, budget-limited ones aren't stored
+    client.post("/api/ai-move", json={"game_state": state, "algorithm": "random"})
+    client.post("/api/ai-move", json={"game_state": state, "algorithm": "bfs", "node_budget": 1})
+
+    assert client.get("/api/cache").json()["size"] == 1
+    text = client.get("/api/metrics").text
+    assert 'snake_move_cache_total{result="hit"} 1' in text
+    assert 'snake_move_cache_total{result="miss"} 2' in text
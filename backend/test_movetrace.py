@@ -0,0 +1,112 @@
+from fastapi.testclient import TestClient
+
+import main
+import movetrace
+import replay
+from board import Board
+from movetrace import TraceReader, TraceRecorder
+
+STATE = {
+    "ai_snake": [{"x": 5, "y": 5}, {"x": 4, "y": 5}, {"x": 3, "y": 5}],
+    "player_snake": [{"x": 15, "y": 15}, {"x": 16, "y": 15}, {"x": 17, "y": 15}],
+    "food": [{"x": 9, "y": 5}],
+    "grid_size": 20,
+}
+
+
+def play(recorder: TraceRecorder, game_id, ticks: int):
+    """Record a game the way the frontend plays it; returns the boards."""
+    ai, player, food = [(5, 5), (4, 5), (3, 5)], [(15, 15), (16, 15), (17, 15)], [(9, 5)]
+    boards = []
+    for tick in range(ticks):
+        board = Board(40, list(ai), list(player), list(food))
+        boards.append(board)
+        recorder.record(game_id, board, "astar", "RIGHT", False, True, tick)
+        # The AI walks right along row 5 and eats; the player grows on odd ticks
+        head = (ai[0][0] + 1, 5)
+        ai = [head] + ai[:-1]
+        if head in food:
+            ai.append(ai[-1])
+            food = [f for f in food if f != head] + [(head[0] + 7, 5)]
+        player = [(player[0][0], player[0][1] - 1 if tick % 4 < 2 else player[0][1] + 1)] + player
+        if tick % 2 == 0:
+            player.pop()
+    return boards
+
+
+def test_round_trip_with_deltas_and_keyframes(tmp_path, monkeypatch):
+    monkeypatch.setattr(movetrace, "KEYFRAME_INTERVAL", 8)
+    path = str(tmp_path / "trace.bin")
+    recorder = TraceRecorder(path)
+    boards = play(recorder, "game-1", 30)
+    anonymous = Board(20, [(1, 1)], [], [])
+    recorder.record(None, anonymous, "bfs", "DOWN", True, False, 7)
+    recorder.close()
+
+    reader = TraceReader(path)
+    assert len(reader) == 31 and sum(reader.keyframes) == 5
+    sequential = list(reader)
+    for index in (30, 0, 17, 9, 29, -1):
+        assert reader[index] == sequential[index]
+    for board, entry in zip(boards, sequential):
+        assert (entry.ai_snake, entry.player_snake, entry.food) == (board.ai_snake, board.player_snake, board.food)
+    assert sequential[3].micros == 3 and sequential[3].game_id == "game-1"
+    assert sequential[-1][:5] == (None, 20, [(1, 1)], [], [])
+    assert sequential[-1][5:10] == ("bfs", "DOWN", True, False, 7)
+    reader.close()
+
+    # A record cut short by a crash is left out
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 3)
+    reader = TraceReader(path)
+    assert len(reader) == 30
+    reader.close()
+
+
+def test_recorder_forgets_least_recent_and_idle_games(tmp_path):
+    ticks = {}
+
+    def step(game_id):
+        """The game's board after both snakes walk right one more tick."""
+        ticks[game_id] = ticks.get(game_id, -1) + 1
+        x = 5 + ticks[game_id]
+        return Board(20, [(x, 5), (x - 1, 5)], [(x, 15), (x - 1, 15)], [])
+
+    recorder = TraceRecorder(str(tmp_path / "lru.bin"), max_games=2)
+    for game_id in ("a", "b", "a", "c", "b"):
+        recorder.record(game_id, step(game_id), "astar", "RIGHT", False, True, 0)
+    recorder.close()
+    assert list(recorder._games) == ["c", "b"]
+    reader = TraceReader(recorder.path)
+    # "b" was evicted by "c", so it starts over from a keyframe
+    assert list(reader.keyframes) == [1, 1, 0, 1, 1]
+    assert [entry.game_id for entry in reader] == ["a", "b", "a", "c", "b"]
+    reader.close()
+
+    recorder = TraceRecorder(str(tmp_path / "idle.bin"), idle_seconds=0)
+    for _ in range(3):
+        recorder.record("d", step("d"), "astar", "RIGHT", False, True, 0)
+    recorder.close()
+    reader = TraceReader(recorder.path)
+    assert list(reader.keyframes) == [1, 1, 1]
+    reader.close()
+
+
+def test_endpoint_records_and_replay_agrees(tmp_path, monkeypatch):
+    path = str(tmp_path / "trace.bin")
+    monkeypatch.setattr(main, "recorder", TraceRecorder(path))
+    max_entries = main.move_cache.max_entries
+    client = TestClient(main.app)
+    for algorithm in ("astar", "bfs", "field", "random"):
+        response = client.post("/api/ai-move", json={"game_state": STATE, "algorithm": algorithm,
+                                                     "game_id": f"replay-{algorithm}"})
+        assert response.json()["success"]
+    main.recorder.close()
+
+    reader = TraceReader(path)
+    assert [entry.algorithm for entry in reader] == ["astar", "bfs", "field", "random"]
+    assert reader[0].ai_snake == [(5, 5), (4, 5), (3, 5)] and reader[0].game_id == "replay-astar"
+    result = replay.replay(reader)
+    assert (result.replayed, result.skipped, result.mismatches) == (3, 1, [])
+    assert main.move_cache.max_entries == max_entries
+    reader.close()
@@ -0,0 +1,105 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import main
+from algorithms import PathfindingAlgorithms
+from rooms import RoomScheduler
+
+
+async def greedy(room, board, next_tick):
+    return PathfindingAlgorithms.greedy_move(board)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+async def advance(scheduler, clock, seconds):
+    """Move the clock on and play the ticks that fell due."""
+    clock.now += seconds
+    scheduler.start_due()
+    await asyncio.gather(*scheduler._ticking)
+
+
+def test_room_ticks_on_schedule_and_applies_inputs():
+    clock = FakeClock()
+    ticks = []
+
+    async def play():
+        scheduler = RoomScheduler(greedy, clock=clock, on_tick=lambda lag, skipped: ticks.append((lag, skipped)))
+        room = scheduler.create(20, "greedy", tick_ms=125)
+        queue = scheduler.join(room)
+        assert queue.get_nowait()["tick"] == 0
+        room.steer("UP")
+        await advance(scheduler, clock, 0.125)
+        first = queue.get_nowait()
+        assert first["tick"] == 1 and first["player_direction"] == "UP"
+        assert first["player_snake"] == room.game.player_snake
+        # Reversing into the neck is ignored, as in the frontend
+        room.steer("DOWN")
+        await advance(scheduler, clock, 0.125)
+        assert queue.get_nowait()["player_direction"] == "UP"
+        # A late tick keeps the schedule: the interval it ran into is skipped,
+        # and the next tick is due where it always would have been
+        await advance(scheduler, clock, 0.3125)
+        await advance(scheduler, clock, 0.0625)
+        assert room.game.ticks == 4 and room.missed == 1
+        # The clock stops once the last subscriber leaves
+        room.unsubscribe(queue)
+        await advance(scheduler, clock, 0.125)
+        await advance(scheduler, clock, 0.5)
+        assert room.game.ticks == 5 and room.due is None
+        await scheduler.stop()
+        return room
+
+    room = asyncio.run(play())
+    assert ticks == [(0, 0), (0, 0), (0.1875, 1), (0, 0), (0, 0)]
+    assert room.stats()["lag_max_ms"] == 187.5 and room.stats()["missed_ticks"] == 1
+
+
+def test_hundreds_of_rooms_share_one_scheduler():
+    clock = FakeClock()
+
+    async def play():
+        scheduler = RoomScheduler(greedy, max_rooms=200, clock=clock)
+        rooms = [scheduler.create(20, "greedy", tick_ms=(125, 250)[index % 2]) for index in range(200)]
+        for room in rooms:
+            scheduler.join(room)
+        for _ in range(8):
+            await advance(scheduler, clock, 0.125)
+        await scheduler.stop()
+        return rooms
+
+    rooms = asyncio.run(play())
+    # Games end when a snake dies; the rest ticked at their own rate
+    running = [room for room in rooms if not room.game.game_over]
+    assert running and all(room.game.ticks == (8 if room.tick_seconds == 0.125 else 4) for room in running)
+    assert all(room.missed == 0 and room.lag_max == 0 for room in rooms)
+
+
+def test_room_endpoints(monkeypatch):
+    monkeypatch.setattr(main, "rooms", RoomScheduler(main.decide_room_move, max_rooms=1,
+                                                     on_tick=main.metrics.observe_tick))
+    with TestClient(main.app) as client:
+        room = client.post("/api/rooms", json={"algorithm": "astar", "tick_ms": 30}).json()
+        assert client.post("/api/rooms", json={}).status_code == 503
+        with client.websocket_connect(f"/api/rooms/{room['room_id']}/ws") as websocket:
+            assert websocket.receive_json()["tick"] == 0
+            websocket.send_json({"direction": "DOWN"})
+            state = websocket.receive_json()
+            assert state["type"] == "state" and state["tick"] == 1
+            websocket.send_json({"direction": "SIDEWAYS"})
+            while "error" not in websocket.receive_json():
+                pass
+            listed = client.get("/api/rooms").json()["rooms"]
+            assert [stats["room_id"] for stats in listed] == [room["room_id"]]
+            assert client.delete(f"/api/rooms/{room['room_id']}").json()["closed"]
+            while websocket.receive_json()["type"] != "closed":
+                pass
+        assert client.get(f"/api/rooms/{room['room_id']}").status_code == 404
+        assert "snake_room_tick_lag_seconds_count" in client.get("/api/metrics").text
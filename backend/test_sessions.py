@@ -0,0 +1,55 @@
+import time
+
+from board import Board, QueueFrontier
+from sessions import SessionStore
+
+
+def shortest(board, start, goal):
+    path = board.search(start, goal, QueueFrontier())
+    return None if path is None else len(path)
+
+
+def step(snake, direction):
+    dx, dy = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}[direction]
+    return [(snake[0][0] + dx, snake[0][1] + dy)] + snake[:-1]
+
+
+def test_plan_follows_a_shortest_path_as_the_board_changes():
+    store = SessionStore()
+    ai = [(10, 10), (10, 11), (10, 12)]
+    player = [(3, y) for y in range(2, 15)]
+    food = [(17, 2)]
+    for _ in range(12):
+        board = Board(20, ai, player, food)
+        move = store.next_move("game", board)
+        head = board.cell(*board.head)
+        goal = board.cell(*food[0])
+        neighbor = head + {v: k for k, v in board.moves.items()}[move]
+        assert shortest(board, neighbor, goal) + 1 == shortest(board, head, goal)
+        ai = step(ai, move)
+        player = step(player, "DOWN")
+
+
+def test_repairs_plan_when_the_path_gets_blocked():
+    store = SessionStore()
+    ai = [(0, 5), (0, 6)]
+    assert store.next_move("game", Board(10, ai, [], [(9, 5)])) == "RIGHT"
+    # A wall appears right in front of the head
+    wall = [(1, y) for y in range(0, 9)]
+    assert store.next_move("game", Board(10, ai, wall, [(9, 5)])) == "DOWN"
+    # Food eaten and a new one placed behind the head
+    assert store.next_move("game", Board(10, ai, wall, [(0, 0)])) == "UP"
+    # Fully boxed in: no plan
+    box = wall + [(0, 4), (1, 9)]
+    assert store.next_move("game", Board(10, [(0, 5), (0, 6), (0, 7)], box, [(9, 5)])) is None
+
+
+def test_sessions_are_bounded_and_evicted_when_idle():
+    store = SessionStore(max_sessions=2, idle_seconds=0.05)
+    board = Board(20, [(5, 5), (5, 6)], [], [(15, 15)])
+    for game_id in ("a", "b", "c"):
+        store.next_move(game_id, board)
+    assert len(store) == 2
+    time.sleep(0.06)
+    store.next_move("d", board)
+    assert len(store) == 1
@@ -0,0 +1,62 @@
+import random
+
+from fastapi.testclient import TestClient
+
+from board import Board
+from engine import move_snake
+import main
+from main import app
+from movetrace import TraceReader, TraceRecorder
+from test_batch import random_board
+from test_board import make_state
+
+
+def test_boards_after_player_moves_match_compiled_boards():
+    rng = random.Random(21)
+    for _ in range(40):
+        board = random_board(rng, 12)
+        if not board.ai_snake or not board.player_snake:
+            continue
+        state = make_state(board.ai_snake, board.player_snake, board.food, grid_size=12)
+        boards = Board.after_player_moves(state)
+        # Every move but the one back into the neck
+        assert len(boards) == (3 if len(board.player_snake) > 1 else 4)
+        for direction, moved in boards.items():
+            player = move_snake(board.player_snake, direction)
+            expected = Board(12, board.ai_snake, player, board.food)
+            assert moved.player_snake == player
+            assert moved.blocked == expected.blocked and moved.vacate == expected.vacate
+
+
+def test_speculative_moves_match_single_requests(tmp_path, monkeypatch):
+    client = TestClient(app)
+    state = make_state([(10, 10), (11, 10), (12, 10)], [(8, 9), (7, 9), (6, 9)], [(3, 10)])
+    replies = {}
+    # Minimax stops at a node limit, so its answers are as repeatable as the others'
+    for algorithm in ("bfs", "astar", "minimax"):
+        path = str(tmp_path / f"{algorithm}.bin")
+        monkeypatch.setattr(main, "recorder", TraceRecorder(path))
+        reply = replies[algorithm] = client.post("/api/ai-move/speculative", json={
+            "game_state": state.model_dump(), "algorithm": algorithm}).json()
+        main.recorder.close()
+        # Candidates the player may never play stay out of the trace
+        reader = TraceReader(path)
+        assert len(reader) == 0
+        reader.close()
+        monkeypatch.setattr(main, "recorder", None)
+        assert reply["success"] and reply["complete"]
+        assert set(reply["moves"]) == {"UP", "DOWN", "RIGHT"}
+        for player_direction, ai_direction in reply["moves"].items():
+            player = move_snake([(8, 9), (7, 9), (6, 9)], player_direction)
+            moved = make_state([(10, 10), (11, 10), (12, 10)], player, [(3, 10)])
+            single = client.post("/api/ai-move", json={
+                "game_state": moved.model_dump(), "algorithm": algorithm}).json()
+            assert single["direction"] == ai_direction
+
+    # The player stepping into the AI's way changes its answer
+    assert replies["bfs"]["moves"]["UP"] == "LEFT" and replies["bfs"]["moves"]["DOWN"] == "UP"
+
+    empty = make_state([(10, 10)], [], [])
+    reply = client.post("/api/ai-move/speculative", json={
+        "game_state": empty.model_dump(), "algorithm": "bfs"}).json()
+    assert reply["success"] is False and reply["moves"] == {}
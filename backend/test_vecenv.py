@@ -0,0 +1,88 @@
+import os
+import random
+import subprocess
+import sys
+
+import numpy as np
+
+from algorithms import PathfindingAlgorithms
+from batch import DIRECTION_NAMES
+from engine import Game
+from tournament import algorithm_policy as single_policy
+from vecenv import AI, PLAYER, WINNERS, VecEnv, algorithm_policy, greedy_policy
+
+
+def test_games_follow_the_engine_rules(monkeypatch):
+    # Greedy picks randomly among equal options; take the first, as greedy_policy does
+    monkeypatch.setattr(random, "choice", lambda options: options[0])
+    rng = np.random.default_rng(5)
+    for grid_size in (8, 20, 30):
+        env = VecEnv(48, grid_size, seed=grid_size)
+        games = [Game(grid_size) for _ in range(env.num_games)]
+        for _ in range(300):
+            playing = np.flatnonzero(env.alive)
+            if not len(playing):
+                break
+            # Mostly greedy so snakes grow long, with random turns and reversals
+            player = greedy_policy(env, PLAYER)
+            noise = rng.random(env.num_games) < 0.15
+            player[noise] = rng.integers(4, size=noise.sum())
+            food = env.boards(PLAYER, playing)
+            env.move_player(player)
+            ai = greedy_policy(env, AI)
+            env.advance(ai)
+
+            player_snakes, ai_snakes = env.snakes(PLAYER, playing), env.snakes(AI, playing)
+            for index, game in enumerate(playing):
+                game = games[game]
+                game.food = food[index].food
+
+                def decide(board, expected=DIRECTION_NAMES[ai[playing[index]]]):
+                    assert PathfindingAlgorithms.greedy_move(board) == expected
+                    return expected
+
+                game.step(DIRECTION_NAMES[player[playing[index]]], decide)
+                assert game.player_snake == player_snakes[index]
+                assert game.ai_snake == ai_snakes[index]
+                assert [game.score["player"], game.score["ai"]] == env.scores[:, playing[index]].tolist()
+                assert game.winner == WINNERS[env.winner[playing[index]]]
+                assert game.game_over != env.alive[playing[index]]
+        assert env.lengths.max() > 3
+        # Long enough for the ring buffers to wrap around on the small grid
+        assert grid_size > 8 or env.ticks.max() > env.capacity
+
+
+def test_food_respawns_off_the_snakes_and_reset_restarts_games():
+    env = VecEnv(256, 20, seed=1)
+    for _ in range(100):
+        env.step(greedy_policy(env, PLAYER), greedy_policy(env, AI))
+        playing = np.flatnonzero(env.alive)
+        assert not env.occupancy[playing[:, None], env.food[playing]].any()
+    assert env.scores.sum() > 0 and not env.alive.all()
+
+    finished = ~env.alive
+    env.reset(finished)
+    assert env.alive.all() and (env.ticks[finished] == 0).all()
+    restarted = np.flatnonzero(finished)
+    assert env.snakes(PLAYER, restarted)[0] == Game(20).player_snake
+    assert (env.occupancy[restarted].sum(axis=1) == 6).all()
+
+
+def test_algorithm_policy_answers_like_single_games():
+    env = VecEnv(16, 20, seed=2)
+    for _ in range(5):
+        env.step(greedy_policy(env, PLAYER), greedy_policy(env, AI))
+    playing = np.flatnonzero(env.alive)
+    boards = env.boards(AI, playing)
+    for algorithm in ("bfs", "astar", "field"):
+        expected = [single_policy(algorithm)(board) for board in boards]
+        moves = algorithm_policy(algorithm)(env, AI)[playing]
+        assert [DIRECTION_NAMES[move] for move in moves] == expected
+
+    winners = VecEnv(8, 20, seed=3).play(algorithm_policy("bfs"), algorithm_policy("astar"), max_ticks=100)
+    assert len(winners) == 8 and set(winners) <= set(WINNERS)
+
+
+def test_offline_tools_do_not_build_the_server():
+    code = "import sys, tournament, vecenv; sys.exit('main' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__))).returncode == 0
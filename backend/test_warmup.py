@@ -0,0 +1,31 @@
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from warmup import synthetic_requests
+
+
+def test_ready_after_warm_up_without_touching_state(monkeypatch):
+    monkeypatch.setattr(main, "readiness", main.Readiness())
+    assert TestClient(main.app).get("/api/ready").status_code == 503
+
+    cache_size, metrics_text = len(main.move_cache), main.metrics.render()
+    with TestClient(main.app) as client:
+        deadline = time.perf_counter() + 10
+        while client.get("/api/ready").status_code != 200 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        status = client.get("/api/ready").json()
+        assert status["status"] == "ready" and status["error"] is None and status["first_move_ms"] is None
+        assert (len(main.move_cache), main.metrics.render()) == (cache_size, metrics_text)
+
+        body = synthetic_requests(20, "astar")["application/json"]
+        assert client.post("/api/ai-move", content=body, headers={"Content-Type": "application/json"}).json()["success"]
+        assert client.get("/api/ready").json()["first_move_ms"] >= status["warm_ms"]
+
+
+def test_importing_the_server_does_not_load_numpy():
+    code = "import sys, main; sys.exit('numpy' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=main.__file__.rsplit("/", 1)[0]).returncode == 0
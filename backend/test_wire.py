@@ -0,0 +1,98 @@
+import json
+import random
+import struct
+
+from fastapi.testclient import TestClient
+
+from main import app
+from models import AIRequest
+from wire import (COMPACT_BINARY, COMPACT_JSON, MoveRequest, decode_binary, decode_binary_response,
+                  decode_compact_json, encode_binary, encode_compact_json, pack_snake, unpack_snake)
+
+
+def make_request(**fields) -> AIRequest:
+    return AIRequest.model_validate({
+        "game_state": {
+            # Grew last tick, so the tail cell is repeated
+            "ai_snake": [{"x": 5, "y": 5}, {"x": 5, "y": 6}, {"x": 4, "y": 6}, {"x": 4, "y": 7},
+                         {"x": 4, "y": 7}],
+            "player_snake": [{"x": 10, "y": 2}, {"x": 11, "y": 2}],
+            "food": [{"x": 0, "y": 0}, {"x": 19, "y": 3}],
+            "grid_size": 20,
+        },
+        "algorithm": "astar",
+        **fields,
+    })
+
+
+def board_contents(request: MoveRequest):
+    board = request.board
+    return (board.grid_size, board.ai_snake, board.player_snake, board.food, bytes(board.blocked),
+            request[1:])
+
+
+def test_snake_chain_round_trips():
+    rng = random.Random(3)
+    x, y = 50, 50
+    cells = [(x, y)]
+    for _ in range(200):
+        dx, dy = rng.choice([(0, -1), (0, 1), (-1, 0), (1, 0)])
+        x, y = x + dx, y + dy
+        cells.append((x, y))
+    for body in (cells, cells[:1], cells[:2] + [cells[1]] * 3):
+        assert unpack_snake(*pack_snake(body)) == body
+
+
+def test_compact_formats_decode_to_the_same_board():
+    for fields in ({}, {"game_id": "g-1", "avoid_traps": True, "time_budget_ms": 12.5, "node_budget": 500}):
+        request = make_request(**fields)
+        expected = board_contents(MoveRequest.from_ai_request(request))
+        assert board_contents(decode_compact_json(encode_compact_json(request))) == expected
+        assert board_contents(decode_binary(encode_binary(request))) == expected
+
+
+def test_endpoint_accepts_every_format():
+    client = TestClient(app)
+    request = make_request(algorithm="bfs")
+    expected = client.post("/api/ai-move", json=request.model_dump()).json()
+
+    response = client.post("/api/ai-move", content=encode_compact_json(request),
+                           headers={"Content-Type": COMPACT_JSON})
+    assert response.json() == expected
+
+    response = client.post("/api/ai-move", content=encode_binary(request),
+                           headers={"Content-Type": COMPACT_BINARY, "Accept": COMPACT_BINARY})
+    assert response.headers["content-type"] == COMPACT_BINARY
+    assert decode_binary_response(response.content).model_dump() == expected
+
+
+def test_malformed_compact_bodies_are_rejected():
+    client = TestClient(app)
+    body = encode_binary(make_request())
+    for content, content_type in ((body[:-1], COMPACT_BINARY), (body + b"\0", COMPACT_BINARY),
+                                  (b'{"grid_size": 20}', COMPACT_JSON), (b"{}", "application/json")):
+        response = client.post("/api/ai-move", content=content, headers={"Content-Type": content_type})
+        assert response.status_code == 422
+
+    compact = json.loads(encode_compact_json(make_request()))
+    for field, value in (("time_budget_ms", "10"), ("node_budget", 1.5), ("node_budget", True),
+                         ("game_id", 7), ("avoid_traps", "yes")):
+        content = json.dumps({**compact, field: value}).encode()
+        response = client.post("/api/ai-move", content=content, headers={"Content-Type": COMPACT_JSON})
+        assert response.status_code == 422
+
+
+def test_oversized_grids_are_rejected_in_every_format():
+    client = TestClient(app)
+    request = make_request()
+    data = request.model_dump()
+    data["game_state"]["grid_size"] = 60000
+    assert client.post("/api/ai-move", json=data).status_code == 422
+
+    compact = json.loads(encode_compact_json(request))
+    compact["grid_size"] = 60000
+    binary = bytearray(encode_binary(request))
+    struct.pack_into("<H", binary, 2, 60000)
+    for content, content_type in ((json.dumps(compact).encode(), COMPACT_JSON), (bytes(binary), COMPACT_BINARY)):
+        response = client.post("/api/ai-move", content=content, headers={"Content-Type": content_type})
+        assert response.status_code == 422
@@ -0,0 +1,155 @@
+"""Play many headless games between two algorithms and report how they do.
+
+Usage:
+    python tournament.py bfs astar --games 1000 --grid-sizes 20 30 40 --workers 8
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from algorithms import ALGORITHM_MAP, ensure_safe
+from engine import Game
+
+# (seed, grid size, first algorithm, second algorithm, max ticks, avoid traps);
+# the first algorithm plays the player side, which moves first each tick
+GameSpec = Tuple[int, int, str, str, int, bool]
+
+
+def algorithm_policy(algorithm: str, avoid_traps: bool = False):
+    """Policy that answers like /api/ai-move: the algorithm plus the safety check."""
+    move = ALGORITHM_MAP[algorithm]
+    return lambda board: ensure_safe(board, move(board), avoid_traps)
+
+
+def quiet_logging() -> None:
+    # Cycle cache warnings, repeated by every worker, would swamp the report
+    logging.disable(logging.WARNING)
+
+
+def play_game(spec: GameSpec) -> Dict:
+    seed, grid_size, player_algorithm, ai_algorithm, max_ticks, avoid_traps = spec
+    # Random and greedy draw from the global generator
+    random.seed(seed)
+    game = Game(grid_size, random.Random(seed))
+    player = algorithm_policy(player_algorithm, avoid_traps)
+    ai = algorithm_policy(ai_algorithm, avoid_traps)
+
+    started = time.perf_counter()
+    winner = game.play(player, ai, max_ticks)
+    elapsed = time.perf_counter() - started
+    return {
+        "grid_size": grid_size,
+        "winner": {"player": player_algorithm, "ai": ai_algorithm}.get(winner, winner),
+        "lengths": [(player_algorithm, len(game.player_snake)), (ai_algorithm, len(game.ai_snake))],
+        "ticks": game.ticks,
+        "seconds": elapsed,
+    }
+
+
+def summarize(results: List[Dict], algorithms: Tuple[str, str], wall_seconds: float) -> Dict:
+    games = len(results)
+    moves = sum(result["ticks"] * 2 for result in results)
+    summary = {
+        "games": games,
+        "ties": sum(1 for result in results if result["winner"] == "tie"),
+        "timeouts": sum(1 for result in results if result["winner"] is None),
+        "average_game_length": sum(result["ticks"] for result in results) / games if games else 0.0,
+        "moves_per_second": moves / wall_seconds if wall_seconds else 0.0,
+        "moves_per_second_per_worker": (
+            moves / sum(result["seconds"] for result in results) if results else 0.0
+        ),
+        "algorithms": {},
+    }
+    for algorithm in dict.fromkeys(algorithms):
+        wins = sum(1 for result in results if result["winner"] == algorithm)
+        lengths = [length for result in results for name, length in result["lengths"] if name == algorithm]
+        summary["algorithms"][algorithm] = {
+            "wins": wins,
+            "win_rate": wins / games if games else 0.0,
+            "average_length": sum(lengths) / len(lengths) if lengths else 0.0,
+        }
+    return summary
+
+
+def run_tournament(first: str, second: str, games: int, grid_sizes: List[int],
+                   workers: int, seed: int = 0, max_ticks: int = 5000,
+                   avoid_traps: bool = False) -> Dict:
+    """Play ``games`` games per grid size, alternating which algorithm moves first."""
+    specs: List[GameSpec] = []
+    for grid_size in grid_sizes:
+        for index in range(games):
+            sides = (first, second) if index % 2 == 0 else (second, first)
+            specs.append((seed + len(specs), grid_size, sides[0], sides[1], max_ticks, avoid_traps))
+
+    started = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=quiet_logging) as pool:
+            results = list(pool.map(play_game, specs, chunksize=max(1, len(specs) // (workers * 8))))
+    else:
+        results = [play_game(spec) for spec in specs]
+    wall_seconds = time.perf_counter() - started
+
+    report = summarize(results, (first, second), wall_seconds)
+    report["workers"] = workers
+    report["wall_seconds"] = wall_seconds
+    report["grid_sizes"] = {
+        str(grid_size): summarize(
+            [result for result in results if result["grid_size"] == grid_size],
+            (first, second),
+            wall_seconds,
+        )
+        for grid_size in grid_sizes
+    }
+    return report
+
+
+def print_report(report: Dict) -> None:
+    def print_summary(title: str, summary: Dict) -> None:
+        print(f"{title}: {summary['games']} games, {summary['ties']} ties, "
+              f"{summary['timeouts']} timeouts, {summary['average_game_length']:.1f} ticks/game")
+        for algorithm, stats in summary["algorithms"].items():
+            print(f"  {algorithm:>10}: win rate {stats['win_rate']:6.1%}  "
+                  f"average length {stats['average_length']:.1f}")
+
+    print_summary("Overall", report)
+    for grid_size, summary in report["grid_sizes"].items():
+        print_summary(f"{grid_size}x{grid_size}", summary)
+    print(f"Throughput: {report['moves_per_second']:.0f} moves/s with {report['workers']} workers "
+          f"({report['moves_per_second_per_worker']:.0f} moves/s per worker), "
+          f"{report['wall_seconds']:.1f}s wall time")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play headless games between two algorithms.")
+    parser.add_argument("first", help="algorithm id from ALGORITHM_MAP")
+    parser.add_argument("second", help="algorithm id from ALGORITHM_MAP")
+    parser.add_argument("--games", type=int, default=100, help="games per grid size")
+    parser.add_argument("--grid-sizes", type=int, nargs="+", default=[20, 30, 40])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=5000, help="ticks before a game counts as a timeout")
+    parser.add_argument("--avoid-traps", action="store_true",
+                        help="run both sides with the dead-end check from /api/ai-move")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    for algorithm in (args.first, args.second):
+        if algorithm not in ALGORITHM_MAP:
+            parser.error(f"Unknown algorithm: {algorithm} (choose from {', '.join(ALGORITHM_MAP)})")
+
+    report = run_tournament(args.first, args.second, args.games, args.grid_sizes,
+                            args.workers, args.seed, args.max_ticks, args.avoid_traps)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    quiet_logging()
+    main()
@@ -0,0 +1,338 @@
+"""Many headless games stepped together as NumPy arrays.
+
+Usage:
+    python vecenv.py --games 4096 --grid-size 20 --player greedy --ai greedy
+    python vecenv.py --games 1024 --player greedy --ai bfs --max-ticks 2000
+
+``engine.Game`` plays one game in Python objects; tuning algorithms or
+producing training data needs far more games than that. ``VecEnv`` holds
+N games of one grid size as arrays and applies each rule of
+``src/utils/gameLogic.ts`` to all of them with a few array operations:
+
+* ``occupancy``: how many body segments cover each cell, per game, on the
+  padded column-major layout of ``Board`` (``cell = (x + 1) * stride + y + 1``),
+  so a head that leaves the grid lands on the wall border.
+* ``bodies``: each snake as a ring buffer of cells. Moving writes the new
+  head one slot on and forgets the tail; growing extends the snake back
+  over the slot the tail just left, duplicating the new tail like
+  ``growSnake``.
+* ``food``: a fixed number of fruit cells per game, respawned in place.
+* ``alive``: games still being played. A finished game stays as it ended
+  until ``reset``.
+
+A tick follows ``engine.Game``: ``move_player`` moves the player, the AI
+decides on the board with the player already moved, and ``advance`` moves
+the AI and settles collisions, growth and food for every game at once.
+
+A batch policy gets the environment and a side (``PLAYER`` or ``AI``) and
+returns a direction index (into ``DIRECTION_NAMES``) for every game;
+entries for finished games are ignored. ``greedy_policy`` is vectorized
+itself, and ``algorithm_policy`` drives any ``PathfindingAlgorithms``
+strategy through one ``Board`` per game, with BFS and Dijkstra searched
+together by the wavefront from ``batch.py``.
+"""
+import argparse
+import json
+import logging
+import time
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from algorithms import ALGORITHM_MAP, PathfindingAlgorithms, ensure_safe
+from batch import DIRECTION_NAMES, VECTORIZED_ALGORITHMS, wavefront_moves
+from board import Board, Coord, grid_layout
+from engine import get_fruit_count
+from jps import LARGE_GRID_SIZE
+
+# Sides, the first index of the per-snake arrays
+PLAYER, AI = 0, 1
+
+# Values of VecEnv.winner; NO_WINNER is a game still running or timed out
+NO_WINNER, PLAYER_WON, AI_WON, TIE = 0, 1, 2, 3
+WINNERS = (None, "player", "ai", "tie")
+
+DIRECTION_INDEX = {name: index for index, name in enumerate(DIRECTION_NAMES)}
+UP, DOWN, LEFT, RIGHT = (DIRECTION_INDEX[name] for name in ("UP", "DOWN", "LEFT", "RIGHT"))
+
+# Tries per fruit before a taken cell is accepted, as in generateMultipleFruits
+FOOD_ATTEMPTS = 100
+
+# Picks a move for one side of every game
+BatchPolicy = Callable[["VecEnv", int], np.ndarray]
+
+
+class VecEnv:
+    """N games of one grid size, stepped together."""
+
+    def __init__(self, num_games: int, grid_size: int = 20, seed: Optional[int] = None):
+        template, offsets, _ = grid_layout(grid_size)
+        self.num_games = num_games
+        self.grid_size = grid_size
+        self.stride = grid_size + 2
+        self.walls = np.frombuffer(template, dtype=np.uint8).astype(bool)
+        self.offsets = np.array(offsets, dtype=np.int64)
+        # Longest possible snake: every cell, plus a tail that just grew
+        self.capacity = grid_size * grid_size + 1
+        self.rng = np.random.default_rng(seed)
+
+        self.occupancy = np.zeros((num_games, self.stride * self.stride), dtype=np.uint8)
+        self.bodies = np.zeros((2, num_games, self.capacity), dtype=np.int32)
+        # Ring slot of each snake's head; segment i is i slots before it
+        self.heads = np.zeros((2, num_games), dtype=np.int64)
+        self.lengths = np.zeros((2, num_games), dtype=np.int64)
+        self.directions = np.zeros((2, num_games), dtype=np.int64)
+        self.food = np.zeros((num_games, get_fruit_count(grid_size)), dtype=np.int64)
+        self.scores = np.zeros((2, num_games), dtype=np.int64)
+        self.alive = np.zeros(num_games, dtype=bool)
+        self.winner = np.zeros(num_games, dtype=np.int8)
+        self.ticks = np.zeros(num_games, dtype=np.int64)
+        self.reset()
+
+    def cell(self, x, y):
+        return (x + 1) * self.stride + y + 1
+
+    def coordinates(self, cells: np.ndarray):
+        """Lists of the x and y coordinates of an array of cells."""
+        xs, ys = np.divmod(cells, self.stride)
+        return (xs - 1).tolist(), (ys - 1).tolist()
+
+    def reset(self, games: Optional[np.ndarray] = None) -> None:
+        """Start the given games (indexes or a mask; default all) over."""
+        games = np.arange(self.num_games) if games is None else self._indexes(games)
+        size = self.grid_size
+        player_x, ai_x, start_y = size // 4, (size * 3) // 4, size // 2
+        self.occupancy[games] = 0
+        self.heads[:, games] = 2
+        self.lengths[:, games] = 3
+        for segment in range(3):
+            for side, x in ((PLAYER, player_x - segment), (AI, ai_x + segment)):
+                cell = self.cell(x, start_y)
+                self.bodies[side, games, 2 - segment] = cell
+                self.occupancy[games, cell] += 1
+        self.directions[PLAYER, games] = RIGHT
+        self.directions[AI, games] = LEFT
+        self.scores[:, games] = 0
+        self.alive[games] = True
+        self.winner[games] = NO_WINNER
+        self.ticks[games] = 0
+        slots = self.food.shape[1]
+        self._spawn_food(np.repeat(games, slots), np.tile(np.arange(slots), len(games)))
+
+    def _indexes(self, games: np.ndarray) -> np.ndarray:
+        games = np.asarray(games)
+        return np.flatnonzero(games) if games.dtype == bool else games
+
+    def head_cells(self, side: int, games: np.ndarray) -> np.ndarray:
+        return self.bodies[side, games, self.heads[side, games]]
+
+    def tail_cells(self, side: int, games: np.ndarray) -> np.ndarray:
+        tails = (self.heads[side, games] - self.lengths[side, games] + 1) % self.capacity
+        return self.bodies[side, games, tails]
+
+    def _move(self, side: int, games: np.ndarray, directions: np.ndarray) -> np.ndarray:
+        """Move one side's snakes one cell; returns the new head cells."""
+        bodies, occupancy = self.bodies[side], self.occupancy
+        heads = self.head_cells(side, games) + self.offsets[directions]
+        occupancy[games, self.tail_cells(side, games)] -= 1
+        slots = (self.heads[side, games] + 1) % self.capacity
+        bodies[games, slots] = heads
+        self.heads[side, games] = slots
+        occupancy[games, heads] += 1
+        return heads
+
+    def _grow(self, side: int, games: np.ndarray) -> None:
+        """Duplicate the tail of the given games' snakes."""
+        self.lengths[side, games] += 1
+        tails = (self.heads[side, games] - self.lengths[side, games] + 1) % self.capacity
+        cells = self.bodies[side, games, (tails + 1) % self.capacity]
+        self.bodies[side, games, tails] = cells
+        self.occupancy[games, cells] += 1
+        self.scores[side, games] += 1
+
+    def _spawn_food(self, games: np.ndarray, slots: np.ndarray) -> None:
+        """Refill food slots like generateMultipleFruits: up to 100 tries per fruit."""
+        pending = np.arange(len(games))
+        for _ in range(FOOD_ATTEMPTS):
+            rows, columns = games[pending], slots[pending]
+            cells = self.cell(self.rng.integers(self.grid_size, size=len(pending)),
+                              self.rng.integers(self.grid_size, size=len(pending)))
+            self.food[rows, columns] = cells
+            # Fruits drawn together retry when they land on each other
+            taken = (self.occupancy[rows, cells] > 0) | ((self.food[rows] == cells[:, None]).sum(axis=1) > 1)
+            pending = pending[taken]
+            if not len(pending):
+                break
+
+    def move_player(self, actions: np.ndarray) -> None:
+        """First half of a tick: the player turns, unless into its neck, and moves."""
+        games = np.flatnonzero(self.alive)
+        actions = np.asarray(actions, dtype=np.int64)[games]
+        directions = self.directions[PLAYER, games]
+        # UP/DOWN and LEFT/RIGHT are pairs of adjacent indexes
+        directions = np.where(actions != directions ^ 1, actions, directions)
+        self.directions[PLAYER, games] = directions
+        self._move(PLAYER, games, directions)
+
+    def advance(self, actions: np.ndarray) -> None:
+        """Second half of a tick: move the AI and settle collisions and food."""
+        games = np.flatnonzero(self.alive)
+        directions = np.asarray(actions, dtype=np.int64)[games]
+        self.directions[AI, games] = directions
+        ai = self._move(AI, games, directions)
+        player = self.head_cells(PLAYER, games)
+        self.ticks[games] += 1
+
+        # Both heads and bodies are in place, so a head covered twice hit a
+        # body or the other head; tails that moved on no longer count
+        occupancy = self.occupancy
+        player_died = self.walls[player] | (occupancy[games, player] > 1)
+        ai_died = self.walls[ai] | (occupancy[games, ai] > 1)
+        ended = player_died | ai_died
+        self.winner[games[ended]] = np.where(player_died & ai_died, TIE,
+                                             np.where(player_died, AI_WON, PLAYER_WON))[ended]
+        self.alive[games[ended]] = False
+
+        playing = ~ended
+        games, player, ai = games[playing], player[playing], ai[playing]
+        food = self.food[games]
+        eaten = np.zeros(food.shape, dtype=bool)
+        for side, heads in ((PLAYER, player), (AI, ai)):
+            ate = food == heads[:, None]
+            self._grow(side, games[ate.any(axis=1)])
+            eaten |= ate
+        rows, slots = np.nonzero(eaten)
+        if len(rows):
+            self._spawn_food(games[rows], slots)
+
+    def step(self, player_actions: np.ndarray, ai_actions: np.ndarray) -> None:
+        """Play one tick with moves already picked for both sides."""
+        self.move_player(player_actions)
+        self.advance(ai_actions)
+
+    def play(self, player_policy: BatchPolicy, ai_policy: BatchPolicy,
+             max_ticks: int = 5000) -> List[Optional[str]]:
+        """Play every game until it ends or ``max_ticks`` pass; returns the winners,
+        None for timeouts."""
+        while self.alive.any():
+            self.alive &= self.ticks < max_ticks
+            if not self.alive.any():
+                break
+            self.move_player(player_policy(self, PLAYER))
+            self.advance(ai_policy(self, AI))
+        return self.winners()
+
+    def winners(self) -> List[Optional[str]]:
+        return [WINNERS[code] for code in self.winner.tolist()]
+
+    def snakes(self, side: int, games: np.ndarray) -> List[List[Coord]]:
+        """Body coordinates of one side's snake in each of the given games, head first."""
+        lengths = self.lengths[side, games]
+        slots = (self.heads[side, games][:, None] - np.arange(lengths.max(initial=0))) % self.capacity
+        xs, ys = self.coordinates(self.bodies[side, games[:, None], slots])
+        return [list(zip(x[:length], y[:length]))
+                for x, y, length in zip(xs, ys, lengths.tolist())]
+
+    def boards(self, side: int, games: np.ndarray) -> List[Board]:
+        """``Board`` of each given game from ``side``'s point of view: its snake is
+        the board's ``ai_snake``, the other one its ``player_snake``."""
+        xs, ys = self.coordinates(self.food[games])
+        food = [list(zip(x, y)) for x, y in zip(xs, ys)]
+        own, other = self.snakes(side, games), self.snakes(1 - side, games)
+        return [Board(self.grid_size, *snakes) for snakes in zip(own, other, food)]
+
+
+def greedy_policy(env: VecEnv, side: int) -> np.ndarray:
+    """``PathfindingAlgorithms.greedy_move`` for every game at once.
+
+    Where greedy_move picks randomly among the safe moves, this takes the
+    first of them, in ``DIRECTION_NAMES`` order, and UP when none is safe.
+    """
+    # Finished games may have a head on the wall border, with no cells around it
+    actions = env.directions[side].copy()
+    games = np.flatnonzero(env.alive)
+    heads = env.head_cells(side, games)
+    head_x, head_y = np.divmod(heads, env.stride)
+    food_x, food_y = np.divmod(env.food[games], env.stride)
+    distance = np.abs(food_x - head_x[:, None]) + np.abs(food_y - head_y[:, None])
+    rows = np.arange(len(games))
+    nearest = np.argmin(distance, axis=1)
+    dx = food_x[rows, nearest] - head_x
+    dy = food_y[rows, nearest] - head_y
+
+    # As on a Board from this side: its own tail will have moved on
+    neighbors = heads[:, None] + env.offsets[None, :]
+    covered = (env.occupancy[games[:, None], neighbors].astype(np.int64)
+               - (neighbors == env.tail_cells(side, games)[:, None]))
+    safe = (covered == 0) & ~env.walls[neighbors]
+
+    across = np.where(dx > 0, RIGHT, np.where(dx < 0, LEFT, -1))
+    along = np.where(dy > 0, DOWN, np.where(dy < 0, UP, -1))
+    first = np.where(np.abs(dx) > np.abs(dy), across, along)
+    second = np.where(np.abs(dx) > np.abs(dy), along, across)
+    first_safe = (first >= 0) & safe[rows, first]
+    second_safe = (second >= 0) & safe[rows, second]
+    actions[games] = np.where(first_safe, first, np.where(second_safe, second, np.argmax(safe, axis=1)))
+    return actions
+
+
+def algorithm_policy(algorithm: str, avoid_traps: bool = False) -> BatchPolicy:
+    """Batch policy that answers like /api/ai-move: the algorithm plus the safety check."""
+    move = ALGORITHM_MAP[algorithm]
+
+    def policy(env: VecEnv, side: int) -> np.ndarray:
+        actions = env.directions[side].copy()
+        games = np.flatnonzero(env.alive)
+        boards = env.boards(side, games)
+        if algorithm in VECTORIZED_ALGORITHMS and env.grid_size < LARGE_GRID_SIZE:
+            # No path found, head for any food that can be reached
+            directions = [direction or PathfindingAlgorithms.fallback_move(board)
+                          for board, direction in zip(boards, wavefront_moves(boards, algorithm))]
+        else:
+            directions = [move(board) for board in boards]
+        actions[games] = [DIRECTION_INDEX[ensure_safe(board, direction, avoid_traps)]
+                          for board, direction in zip(boards, directions)]
+        return actions
+
+    return policy
+
+
+def make_policy(name: str) -> BatchPolicy:
+    return greedy_policy if name == "greedy" else algorithm_policy(name)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Step many headless games at once and report the rate.")
+    parser.add_argument("--games", type=int, default=4096)
+    parser.add_argument("--grid-size", type=int, default=20)
+    parser.add_argument("--player", default="greedy",
+                        help="algorithm id from ALGORITHM_MAP; greedy runs vectorized")
+    parser.add_argument("--ai", default="greedy", help="as --player")
+    parser.add_argument("--max-ticks", type=int, default=1000, help="ticks before a game counts as a timeout")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for algorithm in (args.player, args.ai):
+        if algorithm not in ALGORITHM_MAP:
+            parser.error(f"Unknown algorithm: {algorithm} (choose from {', '.join(ALGORITHM_MAP)})")
+
+    env = VecEnv(args.games, args.grid_size, args.seed)
+    started = time.perf_counter()
+    winners = env.play(make_policy(args.player), make_policy(args.ai), args.max_ticks)
+    seconds = time.perf_counter() - started
+    steps = int(env.ticks.sum())
+    print(json.dumps({
+        "games": args.games,
+        "grid_size": args.grid_size,
+        "steps": steps,
+        "seconds": round(seconds, 3),
+        "steps_per_minute": round(steps / seconds * 60),
+        "winners": {str(winner): winners.count(winner) for winner in WINNERS},
+        "mean_length": {"player": float(env.lengths[PLAYER].mean()), "ai": float(env.lengths[AI].mean())},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    # Cycle cache warnings would swamp the report
+    logging.disable(logging.WARNING)
+    main()
@@ -0,0 +1,85 @@
+"""Startup warm-up and readiness.
+
+A cold server pays for its first move several times over: the grid tables,
+Hamiltonian cycle and Zobrist keys of the grid size are built, and Pydantic
+and the wire decoders run their first validation. ``precompute`` builds the
+per-grid tables ahead of time and ``synthetic_requests`` gives a request in
+every body format, so the server can run them through its own code path
+while it starts. ``Readiness`` tracks when that finished and when the first
+real move was answered.
+"""
+import time
+from typing import Dict, Iterable, Optional
+
+from board import grid_layout
+from hamiltonian import hamiltonian_cycle
+from models import AIRequest, GameStateInput, Position
+from movecache import zobrist_keys
+from wire import COMPACT_BINARY, COMPACT_JSON, encode_binary, encode_compact_json
+
+# The grid sizes the frontend offers
+GRID_SIZES = (20, 30, 40)
+
+
+def precompute(grid_sizes: Iterable[int] = GRID_SIZES) -> None:
+    """Build the lru_cached tables of each grid size (and, with
+    SNAKE_CYCLE_CACHE_DIR set, load the cycles from disk)."""
+    for grid_size in grid_sizes:
+        grid_layout(grid_size)
+        hamiltonian_cycle(grid_size)
+        zobrist_keys(grid_size)
+
+
+def synthetic_requests(grid_size: int, algorithm: str) -> Dict[str, bytes]:
+    """A small opening position as a body for each request Content-Type."""
+    middle = grid_size // 2
+    request = AIRequest(
+        game_state=GameStateInput(
+            ai_snake=[Position(x=3 - i, y=middle) for i in range(3)],
+            player_snake=[Position(x=grid_size - 4 + i, y=middle) for i in range(3)],
+            food=[Position(x=middle, y=middle - 2)],
+            grid_size=grid_size,
+        ),
+        algorithm=algorithm,
+    )
+    return {
+        "application/json": request.model_dump_json().encode(),
+        COMPACT_JSON: encode_compact_json(request),
+        COMPACT_BINARY: encode_binary(request),
+    }
+
+
+class Readiness:
+    """Whether the server is warm, and how long getting there took.
+
+    Times are measured from ``started``, the moment the server module was
+    imported, which is as close to process start as the app can see.
+    """
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = time.perf_counter() if started is None else started
+        self.warmed_at: Optional[float] = None
+        self.first_move_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed_at is not None
+
+    def mark_warm(self) -> None:
+        self.warmed_at = time.perf_counter()
+
+    def mark_move(self) -> None:
+        if self.first_move_at is None:
+            self.first_move_at = time.perf_counter()
+
+    def _since_start(self, moment: Optional[float]) -> Optional[float]:
+        return None if moment is None else round((moment - self.started) * 1000, 1)
+
+    def status(self) -> Dict:
+        return {
+            "status": "ready" if self.ready else "warming",
+            "warm_ms": self._since_start(self.warmed_at),
+            "first_move_ms": self._since_start(self.first_move_at),
+            "error": self.error,
+        }
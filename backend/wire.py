@@ -0,0 +1,287 @@
+"""Compact encodings of an AI move request.
+
+The standard body spells out every snake cell as ``{"x": .., "y": ..}``
+and turns each one into a ``Position`` model. The compact encodings send
+each snake as its head plus a chain of 2-bit steps, and food as cell
+indices (``y * grid_size + x``), and decode straight into a ``Board``.
+
+Snake ``[head_x, head_y, length, steps, chain]`` (``[]`` when empty):
+``chain`` packs ``steps`` moves, each from one segment to the next toward
+the tail, four per byte starting at the low bits, with the codes of
+``DIRECTION_VECTORS`` (UP=0, DOWN=1, LEFT=2, RIGHT=3). Cells after the
+last step repeat the tail, as ``growSnake`` does, up to ``length``.
+
+Compact JSON (``application/vnd.snake.compact+json``): the fields of
+``AIRequest`` at the top level, with ``grid_size`` beside them, snakes as
+above with ``chain`` in base64 and ``food`` as a list of indices.
+
+Binary (``application/vnd.snake.compact``), little-endian::
+
+    u8 version (1) | u8 algorithm | u16 grid_size | u8 flags
+    [f32 time_budget_ms] [u32 node_budget] [u8 n, n bytes game_id]
+    ai snake | player snake | u16 food count, u16 indices
+
+where a snake is ``u16 length`` followed, if non-zero, by ``i16 head_x,
+i16 head_y, u16 steps`` and the packed chain. Flags: 1 avoid_traps set,
+2 its value, 4 time budget, 8 node budget, 16 game id. Food indices are
+16 bits, so grids over 256x256 need one of the JSON formats. The binary
+response is ``u8 direction | u8 flags (1 success, 2 complete)`` followed
+by the error message when it failed.
+"""
+import base64
+import binascii
+import json
+import struct
+from typing import List, NamedTuple, Optional, Tuple
+
+from board import Board, Coord, DIRECTION_VECTORS
+from models import AIRequest, AIResponse, Algorithm, Direction, MAX_GRID_SIZE
+
+COMPACT_JSON = "application/vnd.snake.compact+json"
+COMPACT_BINARY = "application/vnd.snake.compact"
+BINARY_VERSION = 1
+
+ALGORITHMS: Tuple[str, ...] = Algorithm.__args__
+DIRECTIONS: Tuple[Direction, ...] = tuple(name for name, _, _ in DIRECTION_VECTORS)
+STEPS = tuple((dx, dy) for _, dx, dy in DIRECTION_VECTORS)
+
+# The four steps packed into each possible byte
+BYTE_STEPS = tuple(tuple(STEPS[(byte >> shift) & 3] for shift in (0, 2, 4, 6)) for byte in range(256))
+
+FLAG_AVOID_TRAPS_SET = 1
+FLAG_AVOID_TRAPS = 2
+FLAG_TIME_BUDGET = 4
+FLAG_NODE_BUDGET = 8
+FLAG_GAME_ID = 16
+
+RESPONSE_SUCCESS = 1
+RESPONSE_COMPLETE = 2
+
+
+class MoveRequest(NamedTuple):
+    """A decoded move request, whatever encoding it arrived in."""
+
+    board: Board
+    algorithm: str
+    game_id: Optional[str] = None
+    avoid_traps: Optional[bool] = None
+    time_budget_ms: Optional[float] = None
+    node_budget: Optional[int] = None
+
+    @classmethod
+    def from_ai_request(cls, request: AIRequest) -> "MoveRequest":
+        return cls(Board.from_game_state(request.game_state), request.algorithm, request.game_id,
+                   request.avoid_traps, request.time_budget_ms, request.node_budget)
+
+
+def unpack_snake(head_x: int, head_y: int, length: int, steps: int, chain: bytes) -> List[Coord]:
+    if not 0 <= steps < max(length, 1) or len(chain) != (steps + 3) // 4:
+        raise ValueError("Snake chain does not match its length")
+    x, y = head_x, head_y
+    cells = [(x, y)]
+    append = cells.append
+    for byte in chain:
+        for dx, dy in BYTE_STEPS[byte]:
+            x += dx
+            y += dy
+            append((x, y))
+    del cells[steps + 1:]
+    cells.extend([cells[-1]] * (length - len(cells)))
+    return cells
+
+
+def pack_snake(cells: List[Coord]) -> Tuple[int, int, int, int, bytes]:
+    """Inverse of unpack_snake; raises ValueError if the body is not a chain of steps."""
+    steps = len(cells) - 1
+    while steps > 0 and cells[steps] == cells[steps - 1]:
+        steps -= 1
+    chain = bytearray((steps + 3) // 4)
+    for index in range(steps):
+        (x1, y1), (x2, y2) = cells[index], cells[index + 1]
+        try:
+            code = STEPS.index((x2 - x1, y2 - y1))
+        except ValueError:
+            raise ValueError("Snake cells are not adjacent") from None
+        chain[index >> 2] |= code << ((index & 3) * 2)
+    head_x, head_y = cells[0]
+    return head_x, head_y, len(cells), steps, bytes(chain)
+
+
+def check_grid_size(grid_size: int) -> None:
+    """The same bound as ``GameStateInput.grid_size``."""
+    if not 1 <= grid_size <= MAX_GRID_SIZE:
+        raise ValueError(f"Grid size must be between 1 and {MAX_GRID_SIZE}")
+
+
+def unpack_food(indices: List[int], grid_size: int) -> List[Coord]:
+    area = grid_size * grid_size
+    food = []
+    for index in indices:
+        if not isinstance(index, int) or not 0 <= index < area:
+            raise ValueError(f"Food index out of range: {index}")
+        y, x = divmod(index, grid_size)
+        food.append((x, y))
+    return food
+
+
+def pack_state(grid_size: int, ai_snake: List[Coord], player_snake: List[Coord], food: List[Coord]) -> bytes:
+    """Both snakes and the food in the binary layout; ValueError if a snake
+    is not a chain of steps, food lies off the grid or the grid is too large
+    for 16-bit food indices (over 256x256)."""
+    if grid_size * grid_size > 0x10000:
+        raise ValueError(f"Grid size {grid_size} is too large for the binary format")
+    parts = []
+    for cells in (ai_snake, player_snake):
+        if cells:
+            head_x, head_y, length, steps, chain = pack_snake(cells)
+            parts.append(struct.pack("<HhhH", length, head_x, head_y, steps) + chain)
+        else:
+            parts.append(struct.pack("<H", 0))
+    if any(not (0 <= x < grid_size and 0 <= y < grid_size) for x, y in food):
+        raise ValueError("Food off the grid")
+    indices = [y * grid_size + x for x, y in food]
+    parts.append(struct.pack(f"<H{len(indices)}H", len(indices), *indices))
+    return b"".join(parts)
+
+
+def unpack_state(body: bytes, offset: int, grid_size: int) -> Tuple[List[Coord], List[Coord], List[Coord], int]:
+    """Inverse of pack_state: the snakes, the food and the offset after them."""
+    snakes = []
+    for _ in range(2):
+        (length,) = struct.unpack_from("<H", body, offset)
+        offset += 2
+        if not length:
+            snakes.append([])
+            continue
+        head_x, head_y, steps = struct.unpack_from("<hhH", body, offset)
+        offset += 6
+        chain = body[offset:offset + (steps + 3) // 4]
+        offset += len(chain)
+        snakes.append(unpack_snake(head_x, head_y, length, steps, chain))
+    (count,) = struct.unpack_from("<H", body, offset)
+    offset += 2
+    indices = struct.unpack_from(f"<{count}H", body, offset)
+    return snakes[0], snakes[1], unpack_food(list(indices), grid_size), offset + 2 * count
+
+
+def decode_compact_json(body: bytes) -> MoveRequest:
+    try:
+        data = json.loads(body)
+        grid_size = data["grid_size"]
+        algorithm = data["algorithm"]
+        snakes = []
+        for key in ("ai_snake", "player_snake"):
+            snake = data[key]
+            if snake:
+                head_x, head_y, length, steps, chain = snake
+                snakes.append(unpack_snake(head_x, head_y, length, steps, base64.b64decode(chain)))
+            else:
+                snakes.append([])
+        food = unpack_food(data["food"], grid_size)
+    except (KeyError, TypeError, binascii.Error) as e:
+        raise ValueError(f"Invalid compact request: {e!r}") from None
+    if not isinstance(grid_size, int) or algorithm not in ALGORITHMS:
+        raise ValueError("Invalid compact request: bad grid_size or algorithm")
+    check_grid_size(grid_size)
+    time_budget_ms, node_budget = data.get("time_budget_ms"), data.get("node_budget")
+    game_id, avoid_traps = data.get("game_id"), data.get("avoid_traps")
+    # The same types AIRequest accepts; bool is an int subclass, so rule it out
+    if not (time_budget_ms is None
+            or (isinstance(time_budget_ms, (int, float)) and not isinstance(time_budget_ms, bool))):
+        raise ValueError("Invalid compact request: time_budget_ms must be a number")
+    if not (node_budget is None or (isinstance(node_budget, int) and not isinstance(node_budget, bool))):
+        raise ValueError("Invalid compact request: node_budget must be an integer")
+    if not (game_id is None or isinstance(game_id, str)):
+        raise ValueError("Invalid compact request: game_id must be a string")
+    if not (avoid_traps is None or isinstance(avoid_traps, bool)):
+        raise ValueError("Invalid compact request: avoid_traps must be true or false")
+    if (time_budget_ms is not None and time_budget_ms <= 0) or (node_budget is not None and node_budget <= 0):
+        raise ValueError("Budgets must be positive")
+    return MoveRequest(Board(grid_size, snakes[0], snakes[1], food), algorithm, game_id,
+                       avoid_traps, time_budget_ms, node_budget)
+
+
+def decode_binary(body: bytes) -> MoveRequest:
+    try:
+        version, algorithm, grid_size, flags = struct.unpack_from("<BBHB", body)
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported binary version: {version}")
+        if algorithm >= len(ALGORITHMS):
+            raise ValueError(f"Unknown algorithm id: {algorithm}")
+        check_grid_size(grid_size)
+        offset = 5
+        time_budget_ms = node_budget = game_id = None
+        if flags & FLAG_TIME_BUDGET:
+            (time_budget_ms,) = struct.unpack_from("<f", body, offset)
+            offset += 4
+        if flags & FLAG_NODE_BUDGET:
+            (node_budget,) = struct.unpack_from("<I", body, offset)
+            offset += 4
+        if flags & FLAG_GAME_ID:
+            size = body[offset]
+            game_id = body[offset + 1:offset + 1 + size].decode()
+            offset += 1 + size
+
+        ai_snake, player_snake, food, offset = unpack_state(body, offset, grid_size)
+        if offset != len(body):
+            raise ValueError("Trailing bytes after the food")
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid binary request: {str(e)}") from None
+    if (time_budget_ms is not None and time_budget_ms <= 0) or node_budget == 0:
+        raise ValueError("Budgets must be positive")
+    avoid_traps = bool(flags & FLAG_AVOID_TRAPS) if flags & FLAG_AVOID_TRAPS_SET else None
+    return MoveRequest(Board(grid_size, ai_snake, player_snake, food), ALGORITHMS[algorithm], game_id,
+                       avoid_traps, time_budget_ms, node_budget)
+
+
+def encode_compact_json(request: AIRequest) -> bytes:
+    state = request.game_state
+    grid_size = state.grid_size
+    data = request.model_dump(exclude={"game_state"}, exclude_none=True)
+    data["grid_size"] = grid_size
+    for key, positions in (("ai_snake", state.ai_snake), ("player_snake", state.player_snake)):
+        if positions:
+            head_x, head_y, length, steps, chain = pack_snake([(pos.x, pos.y) for pos in positions])
+            data[key] = [head_x, head_y, length, steps, base64.b64encode(chain).decode()]
+        else:
+            data[key] = []
+    data["food"] = [pos.y * grid_size + pos.x for pos in state.food]
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def encode_binary(request: AIRequest) -> bytes:
+    state = request.game_state
+    flags = 0
+    extra = b""
+    if request.avoid_traps is not None:
+        flags |= FLAG_AVOID_TRAPS_SET | (FLAG_AVOID_TRAPS if request.avoid_traps else 0)
+    if request.time_budget_ms is not None:
+        flags |= FLAG_TIME_BUDGET
+        extra += struct.pack("<f", request.time_budget_ms)
+    if request.node_budget is not None:
+        flags |= FLAG_NODE_BUDGET
+        extra += struct.pack("<I", request.node_budget)
+    if request.game_id is not None:
+        game_id = request.game_id.encode()
+        flags |= FLAG_GAME_ID
+        extra += struct.pack("<B", len(game_id)) + game_id
+
+    header = struct.pack("<BBHB", BINARY_VERSION, ALGORITHMS.index(request.algorithm), state.grid_size, flags)
+    return header + extra + pack_state(
+        state.grid_size, [(pos.x, pos.y) for pos in state.ai_snake],
+        [(pos.x, pos.y) for pos in state.player_snake], [(pos.x, pos.y) for pos in state.food])
+
+
+def encode_binary_response(response: AIResponse) -> bytes:
+    flags = (RESPONSE_SUCCESS if response.success else 0) | (RESPONSE_COMPLETE if response.complete else 0)
+    body = struct.pack("<BB", DIRECTIONS.index(response.direction), flags)
+    return body + (response.error or "").encode()
+
+
+def decode_binary_response(body: bytes) -> AIResponse:
+    direction, flags = struct.unpack_from("<BB", body)
+    response = AIResponse(direction=DIRECTIONS[direction], success=bool(flags & RESPONSE_SUCCESS),
+                          complete=bool(flags & RESPONSE_COMPLETE))
+    if len(body) > 2:
+        response.error = body[2:].decode()
+    return response
@@ -219,6 +219,9 @@ const App = () => {
                     {gameConfig.algorithm === 'dfs' && 'Explores paths using depth-first search'}
                     {gameConfig.algorithm === 'dijkstra' && 'Optimal pathfinding with weighted edges'}
                     {gameConfig.algorithm === 'astar' && 'Heuristic-based optimal pathfinding'}
+                    {gameConfig.algorithm === 'field' && 'Heads for whichever food is truly nearest'}
+                    {gameConfig.algorithm === 'hamiltonian' && 'Follows a cycle over the whole grid, taking safe shortcuts to food'}
+                    {gameConfig.algorithm === 'minimax' && "Searches both snakes' moves a few ticks ahead with alpha-beta pruning"}
                   </div>
                 </div>
               </div>
@@ -43,6 +43,24 @@ const ALGORITHM_INFO: Record<Algorithm, AlgorithmInfo> = {
     difficulty: 'Expert',
     color: 'bg-red-500',
   },
+  field: {
+    name: 'Distance Field',
+    description: 'Heads for whichever food is truly nearest',
+    difficulty: 'Hard',
+    color: 'bg-teal-500',
+  },
+  hamiltonian: {
+    name: 'Hamiltonian Cycle',
+    description: 'Follows a cycle over the whole grid, taking safe shortcuts to food',
+    difficulty: 'Expert',
+    color: 'bg-pink-500',
+  },
+  minimax: {
+    name: 'Minimax',
+    description: "Searches both snakes' moves a few ticks ahead with alpha-beta pruning",
+    difficulty: 'Expert+',
+    color: 'bg-indigo-500',
+  },
 };
 
 export const AlgorithmSelector = ({
@@ -76,7 +94,8 @@ export const AlgorithmSelector = ({
                 ${info.difficulty === 'Easy' ? 'bg-green-600 text-green-100' :
                   info.difficulty === 'Medium' ? 'bg-yellow-600 text-yellow-100' :
                   info.difficulty === 'Hard' ? 'bg-orange-600 text-orange-100' :
-                  'bg-red-600 text-red-100'}
+                  info.difficulty === 'Expert' ? 'bg-red-600 text-red-100' :
+                  'bg-fuchsia-700 text-fuchsia-100'}
               `}>
                 {info.difficulty}
               </span>
@@ -1,5 +1,5 @@
 import { useState, useEffect, useCallback, useRef } from 'react';
-import { GameState, Direction, GameConfig, Position } from '../types';
+import { GameState, Direction, GameConfig, Position, RoomState } from '../types';
 import { 
   createInitialGameState, 
   moveSnake, 
@@ -12,7 +12,23 @@ import {
   isValidDirection,
   getFruitCount
 } from '../utils/gameLogic';
-import { ApiService } from '../services';
+import { ApiService, GameChannel, GameRoom } from '../services';
+
+// Identifies one game to the backend so it can reuse the previous tick's plan
+const newGameId = () => `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
+
+const toPositions = (cells: [number, number][]): Position[] => cells.map(([x, y]) => ({ x, y }));
+
+// A server room's broadcast as the client's game state
+const fromRoomState = (state: RoomState): GameState => ({
+  playerSnake: { positions: toPositions(state.player_snake), direction: state.player_direction },
+  aiSnake: { positions: toPositions(state.ai_snake), direction: state.ai_direction },
+  food: toPositions(state.food),
+  gridSize: state.grid_size,
+  score: state.score,
+  gameStatus: state.game_over ? 'gameOver' : 'playing',
+  winner: state.winner ?? undefined,
+});
 
 export const useGameLogic = (config: GameConfig) => {
   const [gameState, setGameState] = useState<GameState>(() => 
@@ -23,34 +39,138 @@ export const useGameLogic = (config: GameConfig) => {
   const gameLoopRef = useRef<number | null>(null);
   const currentDirectionRef = useRef<Direction>('RIGHT');
   const gameStateRef = useRef<GameState>(gameState);
+  const gameIdRef = useRef<string>(newGameId());
+  const channelRef = useRef<GameChannel | null>(null);
+  const channelConnectingRef = useRef(false);
+  // Server room playing this game when ApiService.serverRooms is on
+  const roomRef = useRef<GameRoom | null>(null);
+  // What the backend's copy of the game holds; null until a start message is sent
+  const syncedRef = useRef<{ playerLength: number; aiLength: number; food: Position[]; algorithm: string } | null>(null);
+  // The AI's answers for the next tick, asked for as soon as the state they follow was rendered
+  const speculativeRef = useRef<{
+    state: GameState;
+    algorithm: string;
+    moves: Promise<Partial<Record<Direction, Direction>>>;
+  } | null>(null);
 
   // Update ref when state changes
   useEffect(() => {
     gameStateRef.current = gameState;
   }, [gameState]);
 
+  // Ask for the next tick's AI move for every way the player may turn, in the background
+  useEffect(() => {
+    if (gameState.gameStatus !== 'playing' || !isAPIConnected || !ApiService.speculativeMoves
+        || roomRef.current) {
+      speculativeRef.current = null;
+      return;
+    }
+    const moves = ApiService.getSpeculativeAIMoves(gameState, config.algorithm);
+    moves.catch(() => {}); // Reported by the tick that needs the answer
+    speculativeRef.current = { state: gameState, algorithm: config.algorithm, moves };
+  }, [gameState, isAPIConnected, config.algorithm]);
+
+  const connectChannel = useCallback(() => {
+    if (channelConnectingRef.current || channelRef.current?.isOpen) return;
+    channelConnectingRef.current = true;
+    GameChannel.connect().then(channel => {
+      channelRef.current = channel;
+      channelConnectingRef.current = false;
+    });
+  }, []);
+
   // Check API connection on mount
   useEffect(() => {
     const checkConnection = async () => {
-      const connected = await ApiService.checkHealthStatus();
+      const connected = await ApiService.waitForBackend();
       setIsAPIConnected(connected);
+      if (connected) {
+        connectChannel();
+      }
     };
     checkConnection();
+  }, [connectChannel]);
+
+  // Ask the game channel for the AI move, sending only what changed since the last tick
+  const getChannelMove = useCallback(async (
+    channel: GameChannel,
+    currentState: GameState,
+    gameStateForAI: GameState
+  ): Promise<Direction> => {
+    const synced = syncedRef.current;
+    const samePosition = (a: Position) => (b: Position) => a.x === b.x && a.y === b.y;
+    try {
+      let direction: Direction;
+      if (!synced || synced.algorithm !== config.algorithm) {
+        direction = await channel.start(gameStateForAI, config.algorithm);
+      } else {
+        const head = gameStateForAI.playerSnake.positions[0];
+        direction = await channel.tick({
+          player_head: [head.x, head.y],
+          player_grew: currentState.playerSnake.positions.length > synced.playerLength,
+          ai_grew: currentState.aiSnake.positions.length > synced.aiLength,
+          food_added: currentState.food
+            .filter(f => !synced.food.some(samePosition(f)))
+            .map(f => [f.x, f.y] as [number, number]),
+          food_removed: synced.food
+            .filter(f => !currentState.food.some(samePosition(f)))
+            .map(f => [f.x, f.y] as [number, number]),
+        });
+      }
+      syncedRef.current = {
+        playerLength: gameStateForAI.playerSnake.positions.length,
+        aiLength: currentState.aiSnake.positions.length,
+        food: currentState.food,
+        algorithm: config.algorithm,
+      };
+      return direction;
+    } catch (error) {
+      // The backend's copy may be out of date now; resend the full state next tick
+      syncedRef.current = null;
+      throw error;
+    }
+  }, [config.algorithm]);
+
+  const closeRoom = useCallback(() => {
+    roomRef.current?.close().catch(() => undefined);
+    roomRef.current = null;
   }, []);
 
+  // The answer for this tick from the speculative table, if one was asked for this state.
+  // A table still on its way is awaited: it was sent before any new request could be
+  const getSpeculativeMove = useCallback(async (
+    currentState: GameState,
+    playerDirection: Direction
+  ): Promise<Direction | undefined> => {
+    const speculative = speculativeRef.current;
+    if (!speculative || speculative.state !== currentState || speculative.algorithm !== config.algorithm) {
+      return undefined;
+    }
+    try {
+      return (await speculative.moves)[playerDirection];
+    } catch (error) {
+      console.error('Failed to get speculative AI moves:', error);
+      return undefined;
+    }
+  }, [config.algorithm]);
+
   const resetGame = useCallback(() => {
     if (gameLoopRef.current) {
       clearTimeout(gameLoopRef.current);
       gameLoopRef.current = null;
     }
+    closeRoom();
     setGameState(createInitialGameState(config.gridSize));
     currentDirectionRef.current = 'RIGHT';
-  }, [config.gridSize]);
+    gameIdRef.current = newGameId();
+    syncedRef.current = null;
+  }, [config.gridSize, closeRoom]);
 
   const updatePlayerDirection = useCallback((direction: Direction) => {
     if (gameState.gameStatus === 'playing' && 
         isValidDirection(gameState.playerSnake.direction, direction)) {
       currentDirectionRef.current = direction;
+      roomRef.current?.steer(direction);
     }
   }, [gameState.gameStatus, gameState.playerSnake.direction]);
 
@@ -62,14 +182,15 @@ export const useGameLogic = (config: GameConfig) => {
     }
 
     // Move player snake first
-    const newPlayerSnake = moveSnake(currentState.playerSnake, currentDirectionRef.current);
+    const playerDirection = currentDirectionRef.current;
+    const newPlayerSnake = moveSnake(currentState.playerSnake, playerDirection);
     
     // Create updated game state for AI calculation
     const gameStateForAI = {
       ...currentState,
       playerSnake: {
         ...newPlayerSnake,
-        direction: currentDirectionRef.current,
+        direction: playerDirection,
       },
     };
 
@@ -77,7 +198,20 @@ export const useGameLogic = (config: GameConfig) => {
     let aiDirection: Direction = 'UP';
     if (isAPIConnected) {
       try {
-        aiDirection = await ApiService.getAIMove(gameStateForAI, config.algorithm);
+        const channel = channelRef.current;
+        const speculativeMove = await getSpeculativeMove(currentState, playerDirection);
+        if (speculativeMove) {
+          // The channel won't see this tick, so it needs the full state again
+          syncedRef.current = null;
+          aiDirection = speculativeMove;
+        } else if (channel?.isOpen) {
+          aiDirection = await getChannelMove(channel, currentState, gameStateForAI);
+        } else {
+          // The channel won't see this tick, so it needs the full state again
+          syncedRef.current = null;
+          connectChannel();
+          aiDirection = await ApiService.getAIMove(gameStateForAI, config.algorithm, gameIdRef.current);
+        }
       } catch (error) {
         console.error('Failed to get AI move:', error);
         // Fallback to simple direction
@@ -188,9 +322,33 @@ export const useGameLogic = (config: GameConfig) => {
         winner,
       };
     });
-  }, [config.algorithm, isAPIConnected]);
+  }, [config.algorithm, isAPIConnected, getChannelMove, getSpeculativeMove, connectChannel]);
+
+  const onRoomState = useCallback((state: RoomState) => {
+    setGameState(fromRoomState(state));
+  }, []);
+
+  const startGame = useCallback(async () => {
+    if (ApiService.serverRooms && isAPIConnected) {
+      const resuming = gameState.gameStatus === 'paused' && roomRef.current !== null;
+      try {
+        if (resuming) {
+          roomRef.current = await GameRoom.join(roomRef.current!.roomId, onRoomState);
+        } else {
+          closeRoom();
+          roomRef.current = await GameRoom.open(
+            config.algorithm, config.gridSize, config.gameSpeed, onRoomState
+          );
+          currentDirectionRef.current = 'RIGHT';
+        }
+        setGameState(prev => ({ ...prev, gameStatus: 'playing' }));
+        return;
+      } catch (error) {
+        console.warn('Server room unavailable, playing locally:', error);
+        roomRef.current = null;
+      }
+    }
 
-  const startGame = useCallback(() => {
     if (gameState.gameStatus === 'waiting' || gameState.gameStatus === 'paused') {
       setGameState(prev => ({ ...prev, gameStatus: 'playing' }));
     } else if (gameState.gameStatus === 'gameOver') {
@@ -198,6 +356,8 @@ export const useGameLogic = (config: GameConfig) => {
       const newGameState = createInitialGameState(config.gridSize);
       setGameState({ ...newGameState, gameStatus: 'playing' });
       currentDirectionRef.current = 'RIGHT';
+      gameIdRef.current = newGameId();
+      syncedRef.current = null;
     }
     
     const runGameLoop = () => {
@@ -209,13 +369,16 @@ export const useGameLogic = (config: GameConfig) => {
       clearTimeout(gameLoopRef.current);
     }
     runGameLoop();
-  }, [gameState.gameStatus, gameLoop, config.gameSpeed, config.gridSize]);
+  }, [gameState.gameStatus, gameLoop, config.algorithm, config.gameSpeed, config.gridSize,
+      isAPIConnected, onRoomState, closeRoom]);
 
   const pauseGame = useCallback(() => {
     if (gameLoopRef.current) {
       clearTimeout(gameLoopRef.current);
       gameLoopRef.current = null;
     }
+    // The room stops ticking once nobody is subscribed; its state is kept for resuming
+    roomRef.current?.leave();
     setGameState(prev => ({ ...prev, gameStatus: 'paused' }));
   }, []);
 
@@ -225,6 +388,8 @@ export const useGameLogic = (config: GameConfig) => {
       if (gameLoopRef.current) {
         clearTimeout(gameLoopRef.current);
       }
+      channelRef.current?.close();
+      roomRef.current?.close().catch(() => undefined);
     };
   }, []);
 
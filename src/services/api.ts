@@ -1,26 +1,62 @@
 import axios from 'axios';
-import { GameState, Direction, Algorithm, ApiResponse } from '../types';
+import {
+  GameState, Direction, Algorithm, ApiResponse, SpeculativeApiResponse, TickDelta, ChannelReply, RoomState,
+} from '../types';
+import { COMPACT_BINARY, encodeMoveRequest } from './wire';
 
 // Use your Render backend URL for production
 const API_BASE_URL = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1'
   ? '/api'  // Local development
   : 'https://snake-ai-arena.onrender.com/api';  // Production
 
+const WS_BASE_URL = API_BASE_URL.startsWith('/')
+  ? `${window.location.protocol === 'https:' ? 'wss' : 'ws'}://${window.location.host}${API_BASE_URL}`
+  : API_BASE_URL.replace(/^http/, 'ws');
+
+const CHANNEL_URL = `${WS_BASE_URL}/ws`;
+
+// Give up on a channel reply after this long and fall back for the tick
+const CHANNEL_TIMEOUT_MS = 1000;
+
+// How long to keep checking for a backend that is still starting
+const HEALTH_WAIT_MS = 90000;
+
 export class ApiService {
+  // Send move requests in the compact binary format instead of JSON
+  static compactRequests = true;
+
+  // Play in a server-run room (GameRoom) instead of the client's own tick loop.
+  // The client then only sends turns, but the room's algorithm and speed are
+  // fixed when it opens, and every game keeps a WebSocket and a server task busy
+  static serverRooms = false;
+
+  // Ask for each tick's AI answers a tick ahead, for every move the player may make.
+  // Off by default: it takes the round trip out of the tick, but costs three
+  // searches per tick, sends full JSON states and bypasses the game channel's
+  // deltas and per-game plan, which have to resync after every speculative tick
+  static speculativeMoves = false;
+
   static async getAIMove(
     gameState: GameState,
-    algorithm: Algorithm
+    algorithm: Algorithm,
+    gameId?: string
   ): Promise<Direction> {
     try {
-      const response = await axios.post<ApiResponse>(`${API_BASE_URL}/ai-move`, {
-        game_state: {
-          ai_snake: gameState.aiSnake.positions,
-          player_snake: gameState.playerSnake.positions,
-          food: gameState.food,
-          grid_size: gameState.gridSize,
-        },
-        algorithm,
-      });
+      const compact = ApiService.compactRequests ? encodeMoveRequest(gameState, algorithm, gameId) : null;
+      const response = compact
+        ? await axios.post<ApiResponse>(`${API_BASE_URL}/ai-move`, compact, {
+            headers: { 'Content-Type': COMPACT_BINARY },
+          })
+        : await axios.post<ApiResponse>(`${API_BASE_URL}/ai-move`, {
+            game_state: {
+              ai_snake: gameState.aiSnake.positions,
+              player_snake: gameState.playerSnake.positions,
+              food: gameState.food,
+              grid_size: gameState.gridSize,
+            },
+            algorithm,
+            game_id: gameId,
+          });
 
       if (response.data.success) {
         return response.data.direction;
@@ -34,6 +70,27 @@ export class ApiService {
     }
   }
 
+  // The AI's answer to each move the player can make from gameState, which is
+  // the state before the player moves. Rejects on failure so callers can fall back
+  static async getSpeculativeAIMoves(
+    gameState: GameState,
+    algorithm: Algorithm
+  ): Promise<Partial<Record<Direction, Direction>>> {
+    const response = await axios.post<SpeculativeApiResponse>(`${API_BASE_URL}/ai-move/speculative`, {
+      game_state: {
+        ai_snake: gameState.aiSnake.positions,
+        player_snake: gameState.playerSnake.positions,
+        food: gameState.food,
+        grid_size: gameState.gridSize,
+      },
+      algorithm,
+    });
+    if (!response.data.success) {
+      throw new Error(response.data.error || 'Speculative AI moves failed');
+    }
+    return response.data.moves;
+  }
+
   static async checkHealthStatus(): Promise<boolean> {
     try {
       const response = await axios.get(`${API_BASE_URL}/health`);
@@ -43,4 +100,144 @@ export class ApiService {
       return false;
     }
   }
+
+  // A sleeping backend can take most of a minute to start, so keep checking
+  // with growing delays instead of giving up after the first failure
+  static async waitForBackend(maxWaitMs = HEALTH_WAIT_MS): Promise<boolean> {
+    const started = Date.now();
+    let delay = 500;
+    while (!(await ApiService.checkHealthStatus())) {
+      if (Date.now() - started + delay > maxWaitMs) return false;
+      await new Promise(resolve => setTimeout(resolve, delay));
+      delay = Math.min(delay * 2, 8000);
+    }
+    return true;
+  }
+}
+
+// Persistent WebSocket to the backend: the full state is sent once per game,
+// then only per-tick deltas, so message size does not grow with the snakes
+export class GameChannel {
+  private pending: Array<{ resolve: (direction: Direction) => void; reject: (error: Error) => void }> = [];
+
+  private constructor(private socket: WebSocket) {
+    socket.onmessage = (event) => {
+      const request = this.pending.shift();
+      if (!request) return;
+      const reply: ChannelReply = JSON.parse(event.data);
+      if (reply.direction) {
+        request.resolve(reply.direction);
+      } else {
+        request.reject(new Error(reply.error ?? 'Invalid channel reply'));
+      }
+    };
+    socket.onclose = () => {
+      this.pending.forEach(request => request.reject(new Error('Channel closed')));
+      this.pending = [];
+    };
+  }
+
+  static connect(): Promise<GameChannel | null> {
+    return new Promise(resolve => {
+      try {
+        const socket = new WebSocket(CHANNEL_URL);
+        socket.onopen = () => resolve(new GameChannel(socket));
+        socket.onerror = () => resolve(null);
+      } catch (error) {
+        console.error('Failed to open game channel:', error);
+        resolve(null);
+      }
+    });
+  }
+
+  get isOpen(): boolean {
+    return this.socket.readyState === WebSocket.OPEN;
+  }
+
+  start(gameState: GameState, algorithm: Algorithm): Promise<Direction> {
+    return this.send({
+      type: 'start',
+      game_state: {
+        ai_snake: gameState.aiSnake.positions,
+        player_snake: gameState.playerSnake.positions,
+        food: gameState.food,
+        grid_size: gameState.gridSize,
+      },
+      algorithm,
+    });
+  }
+
+  tick(delta: TickDelta): Promise<Direction> {
+    return this.send(delta);
+  }
+
+  close(): void {
+    this.socket.close();
+  }
+
+  private send(message: object): Promise<Direction> {
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        // Replies arrive in order, so a late reply would be matched to the
+        // wrong request; drop the channel instead
+        this.socket.close();
+        reject(new Error('Channel timed out'));
+      }, CHANNEL_TIMEOUT_MS);
+      this.pending.push({
+        resolve: direction => { clearTimeout(timer); resolve(direction); },
+        reject: error => { clearTimeout(timer); reject(error); },
+      });
+      this.socket.send(JSON.stringify(message));
+    });
+  }
+}
+
+// A game run by the backend: states arrive after every server tick and the
+// client only sends the player's turns, so AI latency can't slow the game
+export class GameRoom {
+  private constructor(readonly roomId: string, private socket: WebSocket) {}
+
+  static async open(
+    algorithm: Algorithm,
+    gridSize: number,
+    tickMs: number,
+    onState: (state: RoomState) => void
+  ): Promise<GameRoom> {
+    const response = await axios.post(`${API_BASE_URL}/rooms`, {
+      algorithm,
+      grid_size: gridSize,
+      tick_ms: tickMs,
+    });
+    return GameRoom.join(response.data.room_id, onState);
+  }
+
+  // Subscribe to a room that is already open; its clock runs while anyone is subscribed
+  static async join(roomId: string, onState: (state: RoomState) => void): Promise<GameRoom> {
+    const socket = new WebSocket(`${WS_BASE_URL}/rooms/${roomId}/ws`);
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'state') onState(message);
+    };
+    await new Promise<void>((resolve, reject) => {
+      socket.onopen = () => resolve();
+      socket.onerror = () => reject(new Error('Failed to join room'));
+    });
+    return new GameRoom(roomId, socket);
+  }
+
+  steer(direction: Direction): void {
+    if (this.socket.readyState === WebSocket.OPEN) {
+      this.socket.send(JSON.stringify({ direction }));
+    }
+  }
+
+  // Unsubscribe but keep the room, e.g. to pause it
+  leave(): void {
+    this.socket.close();
+  }
+
+  async close(): Promise<void> {
+    this.socket.close();
+    await axios.delete(`${API_BASE_URL}/rooms/${this.roomId}`).catch(() => undefined);
+  }
 }
@@ -0,0 +1,85 @@
+import { Algorithm, GameState, Position } from '../types';
+
+// Binary move request format; see backend/wire.py for the layout
+export const COMPACT_BINARY = 'application/vnd.snake.compact';
+const BINARY_VERSION = 1;
+const FLAG_GAME_ID = 16;
+
+// Same order as the backend's Algorithm literal
+const ALGORITHM_IDS: Algorithm[] = ['random', 'greedy', 'bfs', 'dfs', 'dijkstra', 'astar', 'field', 'hamiltonian', 'minimax'];
+
+// Step codes for (dx, dy): UP, DOWN, LEFT, RIGHT
+const STEP_CODES: Record<string, number> = { '0,-1': 0, '0,1': 1, '-1,0': 2, '1,0': 3 };
+
+interface PackedSnake {
+  head: Position;
+  length: number;
+  steps: number;
+  chain: Uint8Array;
+}
+
+// Head plus 2-bit steps toward the tail; trailing repeats of the tail
+// (left by growSnake) are implied by the length
+function packSnake(positions: Position[]): PackedSnake | null {
+  let steps = positions.length - 1;
+  while (steps > 0 && positions[steps].x === positions[steps - 1].x && positions[steps].y === positions[steps - 1].y) {
+    steps--;
+  }
+  const chain = new Uint8Array(Math.ceil(steps / 4));
+  for (let i = 0; i < steps; i++) {
+    const code = STEP_CODES[`${positions[i + 1].x - positions[i].x},${positions[i + 1].y - positions[i].y}`];
+    if (code === undefined) return null;
+    chain[i >> 2] |= code << ((i & 3) * 2);
+  }
+  return { head: positions[0], length: positions.length, steps, chain };
+}
+
+// Encode a move request in the binary format, or return null if the state
+// can't be expressed in it (then the caller sends plain JSON)
+export function encodeMoveRequest(gameState: GameState, algorithm: Algorithm, gameId?: string): ArrayBuffer | null {
+  const gameIdBytes = gameId ? new TextEncoder().encode(gameId) : null;
+  const snakes = [gameState.aiSnake.positions, gameState.playerSnake.positions].map(packSnake);
+  const food = gameState.food.map(pos => pos.y * gameState.gridSize + pos.x);
+  if ((gameIdBytes && gameIdBytes.length > 255) || snakes.some(snake => snake === null) ||
+      food.some(index => index < 0 || index > 0xffff)) {
+    return null;
+  }
+
+  let size = 5 + (gameIdBytes ? 1 + gameIdBytes.length : 0) + 2 + food.length * 2;
+  for (const snake of snakes as PackedSnake[]) {
+    size += snake.length ? 8 + snake.chain.length : 2;
+  }
+  const buffer = new ArrayBuffer(size);
+  const view = new DataView(buffer);
+  const bytes = new Uint8Array(buffer);
+  let offset = 0;
+
+  view.setUint8(offset++, BINARY_VERSION);
+  view.setUint8(offset++, ALGORITHM_IDS.indexOf(algorithm));
+  view.setUint16(offset, gameState.gridSize, true);
+  offset += 2;
+  view.setUint8(offset++, gameIdBytes ? FLAG_GAME_ID : 0);
+  if (gameIdBytes) {
+    view.setUint8(offset++, gameIdBytes.length);
+    bytes.set(gameIdBytes, offset);
+    offset += gameIdBytes.length;
+  }
+  for (const snake of snakes as PackedSnake[]) {
+    view.setUint16(offset, snake.length, true);
+    offset += 2;
+    if (!snake.length) continue;
+    view.setInt16(offset, snake.head.x, true);
+    view.setInt16(offset + 2, snake.head.y, true);
+    view.setUint16(offset + 4, snake.steps, true);
+    offset += 6;
+    bytes.set(snake.chain, offset);
+    offset += snake.chain.length;
+  }
+  view.setUint16(offset, food.length, true);
+  offset += 2;
+  for (const index of food) {
+    view.setUint16(offset, index, true);
+    offset += 2;
+  }
+  return buffer;
+}
@@ -29,12 +29,15 @@ export type Algorithm =
   | 'bfs'
   | 'dfs'
   | 'dijkstra'
-  | 'astar';
+  | 'astar'
+  | 'field'
+  | 'hamiltonian'
+  | 'minimax';
 
 export interface AlgorithmInfo {
   name: string;
   description: string;
-  difficulty: 'Easy' | 'Medium' | 'Hard' | 'Expert';
+  difficulty: 'Easy' | 'Medium' | 'Hard' | 'Expert' | 'Expert+';
   color: string;
 }
 
@@ -58,4 +61,46 @@ export interface ApiResponse {
   direction: Direction;
   success: boolean;
   error?: string;
+  // False when the search ran out of budget and returned its best move so far
+  complete?: boolean;
+}
+
+// AI direction for each move the player can make next
+export interface SpeculativeApiResponse {
+  moves: Partial<Record<Direction, Direction>>;
+  success: boolean;
+  error?: string;
+  complete?: boolean;
+}
+
+// What changed since the previous game channel message
+export interface TickDelta {
+  player_head: [number, number];
+  player_grew: boolean;
+  ai_grew: boolean;
+  food_added: [number, number][];
+  food_removed: [number, number][];
+}
+
+export interface ChannelReply {
+  direction?: Direction;
+  tick: number;
+  complete?: boolean;
+  error?: string;
+}
+
+// State pushed by a server-run room after every tick
+export interface RoomState {
+  type: 'state';
+  room_id: string;
+  tick: number;
+  grid_size: number;
+  player_snake: [number, number][];
+  ai_snake: [number, number][];
+  food: [number, number][];
+  player_direction: Direction;
+  ai_direction: Direction;
+  score: { player: number; ai: number };
+  game_over: boolean;
+  winner: 'player' | 'ai' | 'tie' | null;
 }